@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+The Jury - 記事生成結果のスキーマ
+構造化生成モード（--structured）で Gemini の responseSchema として送るスキーマと、同じスキーマによる手元の検証
+
+  news        タイトル・リード・サマリ・タグ（記事内容）
+  overview    背景・詳細の説明文
+  reviews     6名のスコア（1〜10の整数）とレビュー
+  roundtable  座談会（[キャラID, left/right, 発言]）と格言
+
+スキーマは responseSchema が受け付けるキーワード（type / properties / required / items / enum /
+minItems / maxItems / minimum / maximum / propertyOrdering）だけで書き、validate() も同じキーワードを解釈する
+必須の文字列は空文字も不可として扱う
+"""
+from prompts import CHARACTERS
+
+CHAR_IDS = [cid for cid, *_ in CHARACTERS]
+CHAR_SIDES = {cid: side for cid, _, _, side, *_ in CHARACTERS}
+MIN_TURNS = 12  # これより短い座談会は作り直す（プロンプト上は16ターン以上を指示）
+
+STRING = {"type": "STRING"}
+SCORE = {"type": "INTEGER", "minimum": 1, "maximum": 10}
+
+
+def _object(properties: dict, required: list = None) -> dict:
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": list(properties) if required is None else required,
+        "propertyOrdering": list(properties),
+    }
+
+
+def _strings(min_items: int = None, max_items: int = None) -> dict:
+    schema = {"type": "ARRAY", "items": STRING}
+    if min_items is not None:
+        schema["minItems"] = min_items
+    if max_items is not None:
+        schema["maxItems"] = max_items
+    return schema
+
+
+NEWS = _object({
+    "title": STRING,
+    "title_html": STRING,
+    "hero_lead": STRING,
+    "summary_items": _strings(3, 3),
+    "tags": {"type": "ARRAY", "items": _strings(2, 2), "minItems": 1, "maxItems": 3},
+    "news_summary_short": STRING,
+    "source_name": STRING,
+    "source_url": STRING,
+}, required=["title", "title_html", "hero_lead", "summary_items", "tags", "news_summary_short"])
+
+OVERVIEW = STRING
+
+REVIEWS = _object({
+    "scores": _object({cid: SCORE for cid in CHAR_IDS}),
+    "reviews": _object({cid: STRING for cid in CHAR_IDS}),
+})
+
+ROUNDTABLE = _object({
+    # 各発言は [キャラID, "left" または "right", 発言内容]
+    "chat_log": {"type": "ARRAY", "items": _strings(3, 3), "minItems": MIN_TURNS},
+    "quote": STRING,
+})
+
+SECTIONS = {"news": NEWS, "overview": OVERVIEW, "reviews": REVIEWS, "roundtable": ROUNDTABLE}
+
+
+def article_schema(sections: list = None) -> dict:
+    """1回の呼び出しで生成するセクションをまとめたスキーマ（並び順は生成順。レビューの後に座談会を書かせる）"""
+    return _object({name: SECTIONS[name] for name in (sections or SECTIONS)})
+
+
+# ===== 検証 =====
+_TYPES = {
+    "STRING": str,
+    "INTEGER": int,
+    "NUMBER": (int, float),
+    "BOOLEAN": bool,
+    "ARRAY": list,
+    "OBJECT": dict,
+}
+
+
+def validate(value, schema: dict, path: str = "$") -> list:
+    """スキーマに合わない箇所を ["パス: 内容", ...] で返す（空なら合格）"""
+    expected = _TYPES[schema["type"]]
+    if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+        return [f"{path}: {schema['type']} ではありません（{type(value).__name__}）"]
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} は {schema['enum']} のいずれでもありません")
+    if isinstance(value, (int, float)):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: {value} < {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: {value} > {schema['maximum']}")
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: 要素が {len(value)} 件（{schema['minItems']} 件以上必要）")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: 要素が {len(value)} 件（{schema['maxItems']} 件まで）")
+        for i, item in enumerate(value):
+            errors += validate(item, schema["items"], f"{path}[{i}]")
+    elif isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: ありません")
+            elif value[key] == "":
+                errors.append(f"{path}.{key}: 空です")
+        for key, sub in schema["properties"].items():
+            if key in value:
+                errors += validate(value[key], sub, f"{path}.{key}")
+    return errors
+
+
+def invalid_sections(article: dict, sections: list = None) -> dict:
+    """{セクション名: エラー一覧}（スキーマに合わないセクションだけ）"""
+    failed = {}
+    for name in sections or SECTIONS:
+        if article.get(name) in (None, ""):
+            failed[name] = [f"$.{name}: ありません"]
+            continue
+        errors = validate(article[name], SECTIONS[name], f"$.{name}")
+        if errors:
+            failed[name] = errors
+    return failed
+
+
+# ===== 手元での修復 =====
+def _to_score(value):
+    """"7" や 7.4 のような値を 1〜10 の整数にそろえる（数値として読めなければそのまま返す）"""
+    try:
+        return min(10, max(1, round(float(value))))
+    except (TypeError, ValueError):
+        return value
+
+
+def repair(article: dict) -> dict:
+    """
+    作り直さなくても直せる崩れを手元で直す
+      スコアの型・範囲 / 座談会の不正な発言（未知のキャラID・要素数違い）の除去と left/right の補正 / 前後の空白
+    """
+    reviews = article.get("reviews")
+    if isinstance(reviews, dict) and isinstance(reviews.get("scores"), dict):
+        reviews["scores"] = {cid: _to_score(v) for cid, v in reviews["scores"].items()}
+    roundtable = article.get("roundtable")
+    if isinstance(roundtable, dict) and isinstance(roundtable.get("chat_log"), list):
+        turns = []
+        for turn in roundtable["chat_log"]:
+            if not (isinstance(turn, list) and len(turn) == 3 and turn[0] in CHAR_SIDES and isinstance(turn[2], str)):
+                continue
+            side = turn[1] if turn[1] in ("left", "right") else CHAR_SIDES[turn[0]]
+            turns.append([turn[0], side, turn[2].strip()])
+        roundtable["chat_log"] = turns
+    if isinstance(article.get("overview"), str):
+        article["overview"] = article["overview"].strip()
+    return article
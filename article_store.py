@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+The Jury - 記事データストア
+生成した記事の唯一の正本。1記事 = articles/volXXX.json（ニュース・レビュー・スコア・レーダー・座談会）
+HTMLはここから何度でも再生成できる
+
+ビルドマニフェスト（articles/build_manifest.json）には、各記事HTMLを最後に書き出したときの
+記事データのハッシュとレンダリング条件のハッシュを記録し、変わった記事だけを再ビルドする
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+ARTICLES_DIR = Path(__file__).parent / "articles"
+BUILD_MANIFEST_PATH = ARTICLES_DIR / "build_manifest.json"
+
+_manifest_lock = threading.Lock()
+
+
+def article_slug(vol_num: int) -> str:
+    """記事HTML・記事データのファイル名（拡張子なし）"""
+    return f"vol{vol_num:03d}"
+
+
+def article_path(vol_num: int) -> Path:
+    return ARTICLES_DIR / f"{article_slug(vol_num)}.json"
+
+
+def _write_json(path: Path, data, indent=2):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=indent) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ===== 記事データ =====
+def save_article(article: dict) -> Path:
+    """記事データを保存する（書き込み途中で落ちても壊れないよう置き換えで保存）"""
+    path = article_path(article["vol_num"])
+    _write_json(path, article)
+    return path
+
+
+def load_article(vol_num: int) -> dict:
+    return json.loads(article_path(vol_num).read_text(encoding="utf-8"))
+
+
+def list_articles() -> list:
+    """保存済みの記事番号を昇順で返す"""
+    nums = []
+    for p in ARTICLES_DIR.glob("vol*.json"):
+        try:
+            nums.append(int(p.stem[3:]))
+        except ValueError:
+            continue
+    return sorted(nums)
+
+
+def iter_articles():
+    """保存済みの記事データを番号順に返す"""
+    for vol_num in list_articles():
+        yield load_article(vol_num)
+
+
+def data_hash(article: dict) -> str:
+    """記事データの内容ハッシュ（キーの順序や整形には依存しない）"""
+    blob = json.dumps(article, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# ===== ビルドマニフェスト =====
+def load_build_manifest() -> dict:
+    """{slug: {"data": 記事データのハッシュ, "render": レンダリング条件のハッシュ, "output": ファイル名}}"""
+    try:
+        return json.loads(BUILD_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def is_fresh(manifest: dict, article: dict, render_hash: str, out_path: Path) -> bool:
+    """記事HTMLが現在の記事データ・レンダリング条件で書き出し済みなら True"""
+    entry = manifest.get(article_slug(article["vol_num"]))
+    return (entry is not None and out_path.exists()
+            and entry.get("data") == data_hash(article)
+            and entry.get("render") == render_hash)
+
+
+def record_builds(builds: list):
+    """書き出した記事をマニフェストに記録する
+    builds: [(article, render_hash, out_path), ...]"""
+    with _manifest_lock:
+        manifest = load_build_manifest()
+        for article, render_hash, out_path in builds:
+            manifest[article_slug(article["vol_num"])] = {
+                "data": data_hash(article),
+                "render": render_hash,
+                "output": Path(out_path).name,
+            }
+        _write_json(BUILD_MANIFEST_PATH, dict(sorted(manifest.items())), indent=1)
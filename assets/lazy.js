@@ -0,0 +1,111 @@
+/*
+ * The Jury - 下の方のセクションの遅延読み込み（lazy_sections.py がテンプレートを書き換えて組み込む）
+ * セクションが画面に近づいたら（IntersectionObserver）分割したファイルを読み込んで差し込む
+ *
+ *   <template data-lazy="chat" data-src="...">   座談会の残りの発言を目印の位置に差し込む
+ *
+ * 分割ファイルはJSなしでも読める完全なページなので、本文（[data-lazy-fragment] の中身）だけを取り出して使う
+ *
+ * 読み込むと document に "jury:lazy" イベント（detail.name）を出す。印刷の前にはすべて読み込む
+ * 失敗したら RETRY_DELAYS の間隔を空けて見張り直し（最大 RETRY_DELAYS.length 回）、オフラインなら online になってから試す
+ * 設定は window.JURY_LAZY = {rootMargin}
+ */
+(function () {
+  "use strict";
+
+  var config = window.JURY_LAZY || {};
+  var pending = [];   // [{name, el, anchor, state, failures}]
+  var observer = null;
+  var RETRY_DELAYS = [2000, 10000, 60000];   // 失敗してから見張り直すまで（ms）
+
+  window.JuryLazy = {load: loadAll};
+
+  function fetchFragment(url) {
+    return fetch(url).then(function (resp) {
+      if (!resp.ok) throw new Error("HTTP " + resp.status);
+      return resp.text();
+    }).then(function (html) {
+      var doc = new DOMParser().parseFromString(html, "text/html");
+      var body = doc.querySelector("[data-lazy-fragment]");
+      if (!body) throw new Error("fragment body not found");
+      return body.innerHTML;
+    });
+  }
+
+  var loaders = {
+    chat: function (el) {
+      return fetchFragment(el.getAttribute("data-src")).then(function (html) {
+        el.insertAdjacentHTML("beforebegin", html);
+        el.parentNode.removeChild(el);
+      });
+    }
+  };
+
+  function load(item) {
+    if (item.state) return;
+    item.state = "loading";
+    if (observer) observer.unobserve(item.anchor);
+    loaders[item.name](item.el).then(function () {
+      item.state = "done";
+      if (window.CustomEvent) {
+        document.dispatchEvent(new CustomEvent("jury:lazy", {detail: {name: item.name}}));
+      }
+    }).catch(function () {
+      // 失敗したら元の表示（先頭の発言）のまま。すぐに見張り直すと画面内にあるため読み込みが繰り返されるので、間を空ける
+      item.failures += 1;
+      if (item.failures > RETRY_DELAYS.length) {
+        item.state = "failed";
+        return;
+      }
+      item.state = "waiting";
+      if (navigator.onLine === false) {
+        window.addEventListener("online", function retry() {
+          window.removeEventListener("online", retry);
+          rearm(item);
+        });
+      } else {
+        setTimeout(function () { rearm(item); }, RETRY_DELAYS[item.failures - 1]);
+      }
+    });
+  }
+
+  function rearm(item) {
+    if (item.state !== "waiting") return;
+    item.state = null;
+    if (observer) observer.observe(item.anchor);
+  }
+
+  function loadAll() {
+    pending.forEach(load);
+  }
+
+  function init() {
+    var els = document.querySelectorAll("template[data-lazy]");
+    for (var i = 0; i < els.length; i++) {
+      var name = els[i].getAttribute("data-lazy");
+      // <template> は表示されないので、入っている要素が画面に入るのを見張る
+      if (loaders[name]) pending.push({name: name, el: els[i], anchor: els[i].parentNode, state: null, failures: 0});
+    }
+    if (!pending.length) return;
+    if (!window.IntersectionObserver) {
+      window.addEventListener("load", loadAll);
+      return;
+    }
+    observer = new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (!entry.isIntersecting) return;
+        pending.forEach(function (item) {
+          if (item.anchor === entry.target) load(item);
+        });
+      });
+    }, {rootMargin: config.rootMargin || "400px 0px"});
+    pending.forEach(function (item) { observer.observe(item.anchor); });
+    window.addEventListener("beforeprint", loadAll);
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+  } else {
+    init();
+  }
+})();
@@ -0,0 +1,241 @@
+/*
+ * The Jury - 投票のまとめ送信と票数の表示
+ * クリックのたびに RPC を呼ばず、(記事, キャラクター) ごとの票数を手元でまとめて
+ * FLUSH_MS ごと・ページを離れるときに increment_votes へ1回で送る
+ * 票数はページを開くたびにDBを読まず、ビルド時のスナップショット（埋め込み → votes.json）を使う
+ *
+ *   JuryVotes.vote(articleId, character)  1票を加える（送信は後でまとめて）
+ *   JuryVotes.flush()                     溜まっている票をすぐ送る
+ *   JuryVotes.tallies(articleId)          {キャラID: 票数}（スナップショット + まだ反映されていない自分の票）
+ *   JuryVotes.select(articleId)           supabase-js の from(...).select() と同じ形 {data: [{character, count}], error}
+ *
+ * 票数が変わると [data-vote-count="キャラID"] の要素を書き換え、document に "jury:votes" イベントを出す
+ * 送れなかった票は sessionStorage に残し、次の送信（同じタブの次のページを含む）で再送する
+ * 設定は window.JURY_VOTES = {url, key, rpc, view, snapshotUrl, articleId, flushMs, maxItems, snapshot}
+ * （votes.py が埋め込む）
+ */
+(function () {
+  "use strict";
+
+  var config = window.JURY_VOTES || {};
+  var RPC = config.rpc || "increment_votes";
+  var VIEW = config.view || "vote_totals";
+  var FLUSH_MS = config.flushMs || 2000;
+  var MAX_ITEMS = config.maxItems || 64;
+  var MAX_BACKOFF_MS = 60000;
+  var STORAGE_KEY = "jury-votes-pending";
+  var MINE_KEY = "jury-votes-mine";
+
+  var pending = load(STORAGE_KEY, {});   // {"記事ID\tキャラID": 票数}
+  var mine = load(MINE_KEY, []);         // 自分の票 [{k: "記事ID\tキャラID", sent: 送信した時刻(ms) または 0}]
+  var snapshot = {
+    at: parseTime(config.snapshot && config.snapshot.generated_at),
+    votes: (config.snapshot && config.snapshot.votes) || {}
+  };
+  var timer = null;
+  var backoff = FLUSH_MS;
+  var inflight = null;
+  var refreshed = null;
+
+  function load(key, fallback) {
+    try {
+      return JSON.parse(sessionStorage.getItem(key)) || fallback;
+    } catch (e) {
+      return fallback;
+    }
+  }
+
+  function save() {
+    try {
+      sessionStorage.setItem(STORAGE_KEY, JSON.stringify(pending));
+      sessionStorage.setItem(MINE_KEY, JSON.stringify(mine));
+    } catch (e) { /* プライベートモードなどでは保存しない */ }
+  }
+
+  function parseTime(iso) {
+    var t = iso ? Date.parse(iso) : NaN;
+    return isNaN(t) ? 0 : t;
+  }
+
+  function headers(extra) {
+    extra.apikey = config.key;
+    extra.Authorization = "Bearer " + config.key;
+    return extra;
+  }
+
+  function schedule(delay) {
+    if (!timer) timer = setTimeout(function () { flush(false); }, delay);
+  }
+
+  // ===== 送信 =====
+  function vote(articleId, character, delta) {
+    var key = articleId + "\t" + character;
+    delta = delta || 1;
+    pending[key] = (pending[key] || 0) + delta;
+    for (var i = 0; i < delta; i++) mine.push({k: key, sent: 0});
+    save();
+    schedule(FLUSH_MS);
+    changed(articleId);
+    // supabase-js の rpc() と同じ形で返す（書き換え前の呼び出し側が {error} を見ているため）
+    return Promise.resolve({data: null, error: null});
+  }
+
+  function restore(batch) {
+    batch.forEach(function (v) {
+      var key = v.article_id + "\t" + v.character;
+      pending[key] = (pending[key] || 0) + v.delta;
+    });
+    save();
+  }
+
+  function markSent(batch, at) {
+    var left = {};
+    batch.forEach(function (v) { left[v.article_id + "\t" + v.character] = v.delta; });
+    mine.forEach(function (e) {
+      if (!e.sent && left[e.k]) {
+        e.sent = at;
+        left[e.k]--;
+      }
+    });
+    save();
+  }
+
+  function flush(keepalive) {
+    clearTimeout(timer);
+    timer = null;
+    var keys = Object.keys(pending);
+    if (!keys.length || !config.url) return Promise.resolve();
+    if (inflight && !keepalive) return inflight;
+
+    var batch = keys.slice(0, MAX_ITEMS).map(function (key) {
+      var parts = key.split("\t");
+      var v = {article_id: parts[0], character: parts[1], delta: pending[key]};
+      delete pending[key];
+      return v;
+    });
+    save();
+
+    var request = fetch(config.url + "/rest/v1/rpc/" + RPC, {
+      method: "POST",
+      keepalive: !!keepalive,  // ページを閉じた後も送信を続ける
+      headers: headers({"Content-Type": "application/json"}),
+      body: JSON.stringify({p_votes: batch})
+    }).then(function (resp) {
+      if (!resp.ok) throw new Error("HTTP " + resp.status);
+      backoff = FLUSH_MS;
+      markSent(batch, Date.now());
+      if (!keepalive) readBack(batch);
+    }).catch(function () {
+      restore(batch);
+      backoff = Math.min(backoff * 2, MAX_BACKOFF_MS);
+    }).then(function () {
+      if (inflight === request) inflight = null;
+      if (Object.keys(pending).length) schedule(backoff);
+    });
+    if (!keepalive) inflight = request;
+    return request;
+  }
+
+  // ===== 票数 =====
+  function tallies(articleId) {
+    var counts = {};
+    var base = snapshot.votes[articleId] || {};
+    Object.keys(base).forEach(function (c) { counts[c] = base[c]; });
+    // スナップショットより後に送った票・まだ送っていない票を足す
+    mine.forEach(function (e) {
+      var parts = e.k.split("\t");
+      if (parts[0] === articleId && (!e.sent || e.sent > snapshot.at)) {
+        counts[parts[1]] = (counts[parts[1]] || 0) + 1;
+      }
+    });
+    return counts;
+  }
+
+  function apply(votes, at) {
+    if (at < snapshot.at) return false;
+    snapshot.at = at;
+    Object.keys(votes).forEach(function (id) { snapshot.votes[id] = votes[id]; });
+    return true;
+  }
+
+  function changed(articleId) {
+    var counts = tallies(articleId);
+    if (articleId === config.articleId) {
+      var els = document.querySelectorAll("[data-vote-count]");
+      for (var i = 0; i < els.length; i++) {
+        els[i].textContent = String(counts[els[i].getAttribute("data-vote-count")] || 0);
+      }
+    }
+    if (window.CustomEvent) {
+      document.dispatchEvent(new CustomEvent("jury:votes", {detail: {articleId: articleId, counts: counts}}));
+    }
+  }
+
+  // 最新のビルドの votes.json（静的ファイル）で埋め込みのスナップショットを更新する（1ページにつき1回）
+  function refresh() {
+    if (refreshed) return refreshed;
+    if (!config.snapshotUrl || !window.fetch) return Promise.resolve();
+    refreshed = fetch(config.snapshotUrl, {cache: "no-cache"}).then(function (resp) {
+      if (!resp.ok) throw new Error("HTTP " + resp.status);
+      return resp.json();
+    }).then(function (data) {
+      if (apply(data.votes || {}, parseTime(data.generated_at)) && config.articleId) changed(config.articleId);
+    }).catch(function () { /* 埋め込みのスナップショットのまま */ });
+    return refreshed;
+  }
+
+  // 投票した記事だけ、送信後にDBから読み直して自分の票の反映を確かめる
+  function readBack(batch) {
+    var started = Date.now();
+    var ids = {};
+    batch.forEach(function (v) { ids[v.article_id] = true; });
+    Object.keys(ids).forEach(function (articleId) {
+      var url = config.url + "/rest/v1/" + VIEW + "?select=character,count&article_id=eq." + encodeURIComponent(articleId);
+      fetch(url, {headers: headers({})}).then(function (resp) {
+        if (!resp.ok) throw new Error("HTTP " + resp.status);
+        return resp.json();
+      }).then(function (rows) {
+        var votes = {};
+        votes[articleId] = {};
+        rows.forEach(function (r) { votes[articleId][r.character] = r.count; });
+        // 読み出しを始めた時点までに送った票は rows に含まれている
+        if (apply(votes, started)) changed(articleId);
+      }).catch(function () { /* 手元の集計のまま */ });
+    });
+  }
+
+  function select(articleId) {
+    return refresh().then(function () {
+      var counts = tallies(articleId);
+      return {
+        data: Object.keys(counts).map(function (c) { return {character: c, count: counts[c]}; }),
+        error: null
+      };
+    });
+  }
+
+  document.addEventListener("visibilitychange", function () {
+    if (document.visibilityState === "hidden") flush(true);
+  });
+  window.addEventListener("pagehide", function () { flush(true); });
+
+  window.JuryVotes = {
+    vote: vote,
+    flush: function () { return flush(false); },
+    tallies: tallies,
+    select: select,
+    refresh: refresh
+  };
+
+  // 前のページで送りきれなかった票
+  if (Object.keys(pending).length) schedule(FLUSH_MS);
+  // 埋め込みの票数をすぐ表示し、votes.json はブラウザが空いてから取りに行く
+  document.addEventListener("DOMContentLoaded", function () {
+    if (config.articleId) changed(config.articleId);
+    if (window.requestIdleCallback) {
+      window.requestIdleCallback(refresh);
+    } else {
+      setTimeout(refresh, 1);
+    }
+  });
+})();
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+記事ビルド・サイト再ビルド・インデックス更新のベンチマーク
+リポジトリを一時ディレクトリに複製し、各シナリオを別プロセスで実行して
+実時間・ピークRSS・書き出したファイル数とバイト数を表示する（ネットワーク不要）
+
+  rebuild-cold   --volumes 件（既定500）の記事データから全記事HTML・インデックス・scores.json・votes.json を生成
+  rebuild-noop   何も変えずにもう一度 rebuild（マニフェストで全件スキップされる経路）
+  single         build_html で記事1本を生成（記事データ保存 + HTML書き出し）
+  index-update   記事が1本増えた状態で update_index
+  index-full     index.html・archive/・feed.json を消してから update_index
+  pipeline       generate_article.main() を偽サーバー（fake_services.py）に向けて最後まで実行
+  pipeline-structured  同じく --structured（記事全体を1回の呼び出しで生成）で実行
+
+使い方: python benchmarks/bench_build.py [--volumes N] [--scenarios a,b] [--json out.json]
+template.html が無ければ bench_template.py と同じ合成テンプレート（--template-kb で大きさを指定）を使う
+pipeline は既定でレート制限を外して実行する（--throttle で本番と同じ設定）
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_template import synthetic_template  # noqa: E402
+from fake_services import FakeServices  # noqa: E402
+
+SCENARIOS = ["rebuild-cold", "rebuild-noop", "single", "index-update", "index-full", "pipeline", "pipeline-structured"]
+RESULT_PREFIX = "BENCH_RESULT "
+# 作業ディレクトリに複製しないもの
+COPY_IGNORE = shutil.ignore_patterns(".git", ".cache", "__pycache__", "benchmarks", "requests.jsonl", "vol*.html",
+                                     "fragments")
+TAG_POOL = [["tag-hot", "衝撃"], ["tag-copyright", "著作権"], ["tag-regulation", "AI規制"], ["tag-tech", "LLM"],
+            ["tag-biz", "投資"], ["tag-tech", "半導体"], ["tag-biz", "雇用"], ["tag-hot", "炎上"]]
+
+
+# ===== 作業ディレクトリの準備 =====
+def prepare_workspace(workspace: Path, volumes: int, template_kb: int):
+    """リポジトリを複製し、vol001 の記事データを元に volumes 件の記事データを作る"""
+    shutil.copytree(ROOT, workspace, ignore=COPY_IGNORE)
+    if not (workspace / "template.html").exists():
+        (workspace / "template.html").write_text(synthetic_template(template_kb * 1024), encoding="utf-8")
+    articles = workspace / "articles"
+    base = json.loads((articles / "vol001.json").read_text(encoding="utf-8"))
+    for path in articles.glob("vol*.json"):
+        path.unlink()
+    (articles / "build_manifest.json").unlink(missing_ok=True)
+    for vol_num in range(1, volumes + 1):
+        save_sample_article(articles, base, vol_num)
+    # アイコンの派生ファイルは先に作っておく（初回だけの変換コストを最初のシナリオに含めない）
+    subprocess.run([sys.executable, "-c", "import icon_assets; icon_assets.build_icon_assets()"],
+                   cwd=workspace, check=True, capture_output=True)
+    return base
+
+
+def save_sample_article(articles: Path, base: dict, vol_num: int):
+    # 2日おきに公開した想定で日付とタグをずらし、月別・タグ別アーカイブが実際の規模で生成されるようにする
+    # スコアも記事ごとにずらす（scores.json の分布・相関が実データに近い形になるように）
+    day = time.gmtime(time.mktime((2022, 1, 1, 0, 0, 0, 0, 0, 0)) + vol_num * 2 * 86400)
+    article = dict(base, vol_num=vol_num, article_id=f"vol{vol_num:03d}",
+                   publish_date=f"{day.tm_year}年{day.tm_mon}月{day.tm_mday}日",
+                   title=f"{base['title']}（その{vol_num}）",
+                   tags=[TAG_POOL[vol_num % len(TAG_POOL)], TAG_POOL[(vol_num * 3 + 1) % len(TAG_POOL)]],
+                   scores={cid: (score + vol_num * (i + 1) // 3) % 10 + 1 for i, (cid, score) in enumerate(base["scores"].items())})
+    (articles / f"vol{vol_num:03d}.json").write_text(json.dumps(article, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def sample_votes(volumes: int) -> dict:
+    """偽サーバーに持たせる票数 {記事ID: {キャラID: 票数}}（記事ごとにずらす）"""
+    chars = ["ishibashi", "zero", "kokuji", "packet", "pure", "kitsu"]
+    return {f"vol{n:03d}": {cid: (n * (i + 3)) % 97 for i, cid in enumerate(chars)} for n in range(1, volumes + 1)}
+
+
+def snapshot(workspace: Path) -> dict:
+    """{相対パス: (サイズ, mtime_ns)}（.cache は出力に数えない）"""
+    files = {}
+    for path in workspace.rglob("*"):
+        rel = path.relative_to(workspace)
+        if rel.parts[0] in (".cache", "__pycache__") or not path.is_file():
+            continue
+        st = path.stat()
+        files[str(rel)] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def diff_outputs(before: dict, after: dict) -> dict:
+    written = [p for p, v in after.items() if before.get(p) != v]
+    return {
+        "files_written": len(written),
+        "bytes_written": sum(after[p][0] for p in written),
+        "files_removed": len(before.keys() - after.keys()),
+    }
+
+
+# ===== 子プロセス側（各シナリオの本体） =====
+def article_parts(article: dict) -> tuple:
+    """記事データを build_html の引数（各ステージの結果）に戻す"""
+    source_name, source_url = article["sources"][0]
+    news = {k: article[k] for k in ("title", "title_html", "hero_lead", "news_summary_short", "tags", "summary_items")}
+    news.update(source_name=source_name, source_url=source_url)
+    reviews = {"scores": article["scores"], "reviews": article["reviews"], "radar": article["radar"]}
+    roundtable = {"chat_log": article["chat_log"], "quote": article["quote"]}
+    return news, article["overview"], reviews, roundtable
+
+
+def run_scenario(scenario: str, volumes: int, throttle: bool) -> dict:
+    sys.path.insert(0, os.getcwd())
+    extra = {}
+    if scenario in ("rebuild-cold", "rebuild-noop"):
+        import renderer
+        import score_analytics
+        import site_index
+        import votes
+        started = time.perf_counter()
+        built, skipped = renderer.rebuild()
+        stats = site_index.build_index()
+        extra = {"built": len(built), "skipped": skipped, **stats, "scores_json": score_analytics.build_scores_json(),
+                 "votes_json": votes.build_votes_json()}
+    elif scenario == "single":
+        import article_store
+        import generate_article
+        parts = article_parts(article_store.load_article(1))
+        started = time.perf_counter()
+        generate_article.build_html(volumes + 1, *parts)
+    elif scenario in ("index-update", "index-full"):
+        import generate_article
+        if scenario == "index-full":
+            shutil.rmtree("archive", ignore_errors=True)
+            for name in ("index.html", "feed.json"):
+                Path(name).unlink(missing_ok=True)
+        started = time.perf_counter()
+        generate_article.update_index()
+    elif scenario in ("pipeline", "pipeline-structured"):
+        import http_client
+        if not throttle:
+            for config in http_client.ENDPOINTS.values():
+                config.update(rate=1e6, burst=1e6)
+        import generate_article
+        import llm_metrics
+        sys.argv = ["generate_article.py"] + (["--structured"] if scenario == "pipeline-structured" else [])
+        started = time.perf_counter()
+        generate_article.main()
+        extra = {"llm_calls": len(llm_metrics.calls())}
+    else:
+        raise ValueError(f"不明なシナリオ: {scenario}")
+    wall = time.perf_counter() - started
+    # Linux の ru_maxrss は KiB 単位
+    return {"wall_s": wall, "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, **extra}
+
+
+def child_main(args):
+    result = run_scenario(args.child, args.volumes, args.throttle)
+    sys.stdout.flush()
+    print(RESULT_PREFIX + json.dumps(result))
+
+
+# ===== 親プロセス側 =====
+def run_child(scenario: str, workspace: Path, args, env: dict) -> dict:
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", scenario, "--volumes", str(args.volumes)]
+    if args.throttle:
+        cmd.append("--throttle")
+    before = snapshot(workspace)
+    proc = subprocess.run(cmd, cwd=workspace, env=env, capture_output=True, text=True)
+    if args.verbose or proc.returncode != 0:
+        sys.stdout.write(proc.stdout)
+        sys.stderr.write(proc.stderr)
+    if proc.returncode != 0:
+        raise SystemExit(f"❌ シナリオ {scenario} が失敗しました（終了コード {proc.returncode}）")
+    line = next(line for line in reversed(proc.stdout.splitlines()) if line.startswith(RESULT_PREFIX))
+    return {"scenario": scenario, **json.loads(line[len(RESULT_PREFIX):]), **diff_outputs(before, snapshot(workspace))}
+
+
+def print_results(results: list):
+    print(f"\n{'シナリオ':<16}{'実時間':>10}{'ピークRSS':>12}{'書出':>7}{'出力バイト':>14}  備考")
+    for r in results:
+        notes = {k: v for k, v in r.items() if k not in ("scenario", "wall_s", "peak_rss_kb", "files_written",
+                                                         "bytes_written", "files_removed")}
+        if r["files_removed"]:
+            notes["removed"] = r["files_removed"]
+        note = " ".join(f"{k}={v}" for k, v in notes.items())
+        print(f"{r['scenario']:<16}{r['wall_s']:>9.3f}s{r['peak_rss_kb'] / 1024:>9.1f}MiB{r['files_written']:>7}"
+              f"{r['bytes_written']:>14,}  {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--volumes", type=int, default=500, help="再ビルドする記事数（既定: 500）")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"実行するシナリオ（既定: {','.join(SCENARIOS)}）")
+    parser.add_argument("--template-kb", type=int, default=64, help="合成テンプレートの大きさ（KiB）")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="偽Geminiの1回あたりの応答時間（秒）")
+    parser.add_argument("--throttle", action="store_true", help="pipeline でも本番と同じレート制限をかける")
+    parser.add_argument("--json", type=Path, help="結果をJSONで保存する（変更前後の比較用）")
+    parser.add_argument("--keep", action="store_true", help="作業ディレクトリを削除せずに残す")
+    parser.add_argument("--verbose", action="store_true", help="各シナリオのログを表示する")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child_main(args)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"不明なシナリオ: {', '.join(sorted(unknown))}")
+
+    workspace = Path(tempfile.mkdtemp(prefix="the-jury-bench-")) / "site"
+    print(f"🧪 作業ディレクトリ: {workspace}")
+    started = time.perf_counter()
+    prepare_workspace(workspace, args.volumes, args.template_kb)
+    print(f"   記事データ {args.volumes}件を用意（{time.perf_counter() - started:.1f}s）")
+
+    results = []
+    with FakeServices(latency=args.gemini_latency, votes=sample_votes(args.volumes)) as services:
+        feeds_path = workspace / ".cache" / "bench_feeds.json"
+        feeds_path.parent.mkdir(parents=True, exist_ok=True)
+        feeds_path.write_text(json.dumps([{"name": "Fixture News", "url": f"{services.url}/feeds/ai.xml", "weight": 1.0}]),
+                              encoding="utf-8")
+        env = dict(os.environ, GEMINI_API_KEY="bench", GEMINI_BASE_URL=f"{services.url}/v1beta/models",
+                   NEWS_FEEDS=str(feeds_path), SLACK_WEBHOOK_URL=f"{services.url}/slack",
+                   SUPABASE_URL=services.url, SUPABASE_ANON_KEY="bench", PYTHONDONTWRITEBYTECODE="1")
+        env.pop("LLM_METRICS_PATH", None)
+        for scenario in scenarios:
+            print(f"   ▶ {scenario}")
+            results.append(run_child(scenario, workspace, args, env))
+        print(f"   偽サーバーへのリクエスト: {services.requests}")
+
+    print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps({"volumes": args.volumes, "template_kb": args.template_kb,
+                                         "python": sys.version.split()[0], "results": results}, indent=2),
+                             encoding="utf-8")
+        print(f"\n💾 {args.json} に保存しました")
+    if args.keep:
+        print(f"\n📁 作業ディレクトリを残しました: {workspace}")
+    else:
+        shutil.rmtree(workspace.parent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+記事ページの初回表示のベンチマーク（変更前: グラフのJS・座談会の全文をページに入れる / 変更後: SVGのグラフ・座談会の遅延読み込み）
+リポジトリを一時ディレクトリに複製して記事1本を書き出し、最初の描画（FCP）までに読むもの・後から読むものを数える
+
+  - HTML（縮小後・gzip）と要素数
+  - 描画を止めるリソース（<head> の defer / async の無い <script src> とスタイルシート）
+  - 後から読むもの（fragments/ の分割ファイル）
+
+ブラウザは使わず、ミドルレンジのスマートフォン相当の回線・CPU（Lighthouse のモバイル設定: RTT 150ms・下り 1.6Mbps・
+CPU 4倍遅延）のモデルで FCP を見積もる（MODEL の値）。外部のライブラリは手元に無いので大きさは EXTERNAL_SIZES の目安を使う
+実機での値は、書き出したページ（--keep で残る）を Lighthouse のモバイル設定で計測する
+
+使い方: python benchmarks/bench_page.py [--vol N] [--template-kb N] [--json out.json] [--keep]
+template.html が無ければ bench_template.py と同じ合成テンプレートを使う
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_build import prepare_workspace  # noqa: E402
+
+RESULT_PREFIX = "BENCH_RESULT "
+MODES = {"before": "0", "after": "1"}   # LAZY_SECTIONS・SVG_CHARTS の値
+
+# ミドルレンジのスマートフォン（Lighthouse のモバイル設定に合わせた概算モデル）
+MODEL = {
+    "rtt_ms": 150,
+    "down_bytes_per_ms": 1.6 * 1024 * 1024 / 8 / 1000,
+    "cpu_slowdown": 4,
+    "connect_rtts": 3,              # 新しいオリジンへの接続（DNS・TCP・TLS）
+    "html_ms_per_kb": 0.1,          # HTMLの解析（デスクトップ相当。cpu_slowdown 倍する）
+    "js_ms_per_kb": 0.3,            # スクリプトの解析・実行
+    "css_ms_per_kb": 0.05,
+    "layout_ms_per_element": 0.004,
+}
+# 外部ライブラリの大きさの目安（縮小後, gzip）。URLにキーを含むものに使う
+EXTERNAL_SIZES = {"chart": (205_000, 71_000)}
+
+_HEAD_RE = re.compile(r"<head\b.*?</head\s*>", re.S | re.I)
+_SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.S | re.I)
+_STYLESHEET_RE = re.compile(r"""<link\b[^>]*\brel=["']?stylesheet[^>]*\bhref=["']([^"']+)["']""", re.I)
+_ELEMENT_RE = re.compile(r"<[a-zA-Z]")
+
+
+# ===== 子プロセス側（記事1本の書き出し） =====
+def child_main(vol_num: int):
+    sys.path.insert(0, os.getcwd())
+    import article_store
+    import renderer
+    article = article_store.load_article(vol_num)
+    page = renderer.write_article(article)
+    print(RESULT_PREFIX + json.dumps({"page": str(page), "article_id": article["article_id"]}))
+
+
+# ===== 親プロセス側（書き出したページの解析） =====
+def _sizes(url: str, workspace: Path) -> tuple:
+    """(縮小後のバイト数, gzipのバイト数, 外部か)"""
+    if re.match(r"(https?:)?//", url):
+        for key, sizes in EXTERNAL_SIZES.items():
+            if key in url:
+                return (*sizes, True)
+        return 0, 0, True
+    path = workspace / url.split("?")[0].lstrip("./")
+    data = path.read_bytes()
+    gz = path.with_name(path.name + ".gz")
+    return len(data), (gz.stat().st_size if gz.exists() else len(gzip.compress(data, mtime=0))), False
+
+
+def analyze_page(page: Path, workspace: Path, article_id: str) -> dict:
+    html = page.read_text(encoding="utf-8")
+    raw = html.encode("utf-8")
+    head = (_HEAD_RE.search(html) or re.match("", html)).group(0)
+    blocking, inline_js = [], 0
+    for attrs, body in _SCRIPT_RE.findall(head):
+        src = re.search(r"""\bsrc=["']([^"']+)["']""", attrs)
+        if src and not re.search(r"\b(defer|async)\b|type=[\"']module", attrs):
+            blocking.append(("js", src.group(1)))
+        elif not src and "type=" not in attrs:
+            inline_js += len(body.encode("utf-8"))
+    blocking += [("css", href) for href in _STYLESHEET_RE.findall(head)]
+
+    # 後から読むもの: 分割ファイル
+    deferred = [str(p.relative_to(workspace)) for p in sorted((workspace / "fragments").glob(f"{article_id}.*"))
+                if p.suffix != ".gz"]
+
+    resources = [(kind, url, *_sizes(url, workspace)) for kind, url in blocking]
+    later = [(url, *_sizes(url, workspace)) for url in deferred]
+    result = {
+        "html_bytes": len(raw),
+        "html_gzip": len(gzip.compress(raw, mtime=0)),
+        "elements": len(_ELEMENT_RE.findall(_SCRIPT_RE.sub("", html))),
+        "blocking": [{"kind": k, "url": u, "bytes": b, "gzip": g} for k, u, b, g, _ in resources],
+        "deferred": [{"url": u, "bytes": b, "gzip": g} for u, b, g, _ in later],
+        "inline_js_bytes": inline_js,
+    }
+    result["critical_gzip"] = result["html_gzip"] + sum(r["gzip"] for r in result["blocking"])
+    result["deferred_gzip"] = sum(r["gzip"] for r in result["deferred"])
+    result["fcp_ms"] = estimate_fcp(result, any(external for *_, external in resources))
+    return result
+
+
+def estimate_fcp(page: dict, external: bool) -> float:
+    """FCPの概算（ms）: 接続 + HTML + 描画を止めるリソース（並列・帯域は共有）+ CPU（解析・実行・レイアウト）"""
+    m = MODEL
+    network = (m["connect_rtts"] + 1) * m["rtt_ms"] + page["html_gzip"] / m["down_bytes_per_ms"]
+    if page["blocking"]:
+        setup = (m["connect_rtts"] + 1 if external else 1) * m["rtt_ms"]
+        network += setup + sum(r["gzip"] for r in page["blocking"]) / m["down_bytes_per_ms"]
+    js_kb = (page["inline_js_bytes"] + sum(r["bytes"] for r in page["blocking"] if r["kind"] == "js")) / 1024
+    css_kb = sum(r["bytes"] for r in page["blocking"] if r["kind"] == "css") / 1024
+    cpu = (page["html_bytes"] / 1024 * m["html_ms_per_kb"] + js_kb * m["js_ms_per_kb"]
+           + css_kb * m["css_ms_per_kb"] + page["elements"] * m["layout_ms_per_element"])
+    return network + cpu * m["cpu_slowdown"]
+
+
+def run_mode(mode: str, root: Path, args) -> dict:
+    workspace = root / mode
+    prepare_workspace(workspace, args.vol, args.template_kb)
+    env = dict(os.environ, LAZY_SECTIONS=MODES[mode], SVG_CHARTS=MODES[mode], VOTE_SNAPSHOT="0",
+               PYTHONDONTWRITEBYTECODE="1")
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--child", str(args.vol)]
+    proc = subprocess.run(cmd, cwd=workspace, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stdout.write(proc.stdout)
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"❌ {mode} の書き出しに失敗しました（終了コード {proc.returncode}）")
+    line = next(line for line in reversed(proc.stdout.splitlines()) if line.startswith(RESULT_PREFIX))
+    info = json.loads(line[len(RESULT_PREFIX):])
+    return analyze_page(Path(info["page"]), workspace, info["article_id"])
+
+
+def print_results(results: dict):
+    rows = [
+        ("HTML（縮小後）", "html_bytes", "{:,}B"),
+        ("HTML（gzip）", "html_gzip", "{:,}B"),
+        ("要素数", "elements", "{:,}"),
+        ("描画を止めるリソース", None, None),
+        ("初回に読む（gzip）", "critical_gzip", "{:,}B"),
+        ("後から読む（gzip）", "deferred_gzip", "{:,}B"),
+        ("推定FCP", "fcp_ms", "{:,.0f}ms"),
+    ]
+    before, after = results["before"], results["after"]
+    print(f"\n{'':<20}{'変更前':>14}{'変更後':>14}{'差':>12}")
+    for label, key, fmt in rows:
+        if key is None:
+            a, b = (f"{len(r['blocking'])}件 {sum(x['gzip'] for x in r['blocking']):,}B" for r in (before, after))
+            print(f"{label:<20}{a:>14}{b:>14}")
+            continue
+        diff = after[key] - before[key]
+        print(f"{label:<20}{fmt.format(before[key]):>14}{fmt.format(after[key]):>14}"
+              f"{('+' if diff > 0 else '') + fmt.format(diff):>12}")
+    for mode, label in (("before", "変更前"), ("after", "変更後")):
+        for r in results[mode]["blocking"]:
+            print(f"   {label} 描画を止める: {r['url']}（gzip {r['gzip']:,}B）")
+        for r in results[mode]["deferred"]:
+            print(f"   {label} 後から読む: {r['url']}（gzip {r['gzip']:,}B）")
+    print(f"\n   モデル: RTT {MODEL['rtt_ms']}ms / 下り {MODEL['down_bytes_per_ms'] * 8:.1f}kbps"
+          f" / CPU {MODEL['cpu_slowdown']}倍遅延（外部ライブラリの大きさは目安）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vol", type=int, default=1, help="書き出す記事（vol001 の記事データを元に作る。既定: 1）")
+    parser.add_argument("--template-kb", type=int, default=0, help="合成テンプレートに足す大きさ（KiB）")
+    parser.add_argument("--json", type=Path, help="結果をJSONで保存する")
+    parser.add_argument("--keep", action="store_true", help="作業ディレクトリを削除せずに残す")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child_main(args.child)
+
+    root = Path(tempfile.mkdtemp(prefix="the-jury-page-"))
+    results = {mode: run_mode(mode, root, args) for mode in MODES}
+    print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps({"model": MODEL, "results": results}, indent=2, ensure_ascii=False),
+                             encoding="utf-8")
+        print(f"\n💾 {args.json} に保存しました")
+    if args.keep:
+        print(f"\n📁 作業ディレクトリを残しました: {root}")
+    else:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
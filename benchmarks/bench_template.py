@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+テンプレート描画のベンチマーク
+旧方式（プレースホルダごとに str.replace で全文を走査）と template_engine の1パス描画を比較し、
+1回あたりの所要時間と tracemalloc によるピークメモリを表示する
+
+使い方: python benchmarks/bench_template.py [--renders N] [--pad-mb M]
+template.html があればそれを使い、無ければ同じプレースホルダ構成の合成テンプレートを使う
+--pad-mb で以前のBase64アイコン埋め込み相当の固定文字列を足して大きなテンプレートを再現できる
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from template_engine import PLACEHOLDER_RE, compile_template  # noqa: E402
+
+SLOTS = [
+    "ARTICLE_TITLE", "ARTICLE_TITLE_HTML", "ARTICLE_ID", "VOL_NUMBER", "PUBLISH_DATE",
+    "NEWS_SUMMARY_SHORT", "HERO_LEAD", "TAGS_HTML", "TOTAL_SCORE",
+    *[f"SCORE_{c}" for c in ("ISHIBASHI", "ZERO", "KOKUJI", "PACKET", "PURE", "KITSU")],
+    *[f"SCORE_{c}_PCT" for c in ("ISHIBASHI", "ZERO", "KOKUJI", "PACKET", "PURE", "KITSU")],
+    *[f"REVIEW_{c}" for c in ("ISHIBASHI", "ZERO", "KOKUJI", "PACKET", "PURE", "KITSU")],
+    "OVERVIEW", "SUMMARY_ITEMS", "CHAT_LOG_HTML", "QUOTE_TEXT",
+    "SOURCE_LINKS", "SOURCE_BADGE", "SUPABASE_URL", "SUPABASE_ANON_KEY",
+]
+# レーダーチャートは本番のテンプレートと同じく、<head> のグラフライブラリと <canvas> + 描画スクリプトで組む
+CHART_LIB_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"
+RADAR_BLOCK = """<section><canvas id="radarChart"></canvas></section>
+<script>
+new Chart(document.getElementById('radarChart'), {
+  type: 'radar',
+  data: {labels: ['技術革新性', 'ビジネス影響', 'リスク度', '社会的影響', '現場実用性', '倫理・法的問題'],
+         datasets: {{RADAR_DATA_JSON}}},
+  options: {scales: {r: {min: 0, max: 10}}}
+});
+</script>
+"""
+
+
+def synthetic_template(pad_bytes: int) -> str:
+    block = "<section><p>{{%s}}</p></section>\n"
+    body = "".join(block % name for name in SLOTS) + RADAR_BLOCK
+    pad = "A" * pad_bytes
+    return (f'<html><head><title>{{{{ARTICLE_TITLE}}}}</title><script src="{CHART_LIB_URL}"></script></head>'
+            f"<body>\n{body}<!--{pad}--></body></html>")
+
+
+def sample_values(names) -> dict:
+    return {name: f"<span>{name.lower()} " + "テキスト" * 100 + "</span>" for name in names}
+
+
+def render_replace(template: str, values: dict) -> str:
+    html = template
+    for k, v in values.items():
+        html = html.replace("{{" + k + "}}", v)
+    return html
+
+
+def measure(label: str, func, renders: int):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(renders):
+        out = func()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed / renders * 1000:8.3f} ms/render   peak {peak / 1024 / 1024:7.2f} MiB   "
+          f"output {len(out.encode('utf-8')):,} bytes")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--pad-mb", type=float, default=0.0)
+    args = parser.parse_args()
+
+    template_path = ROOT / "template.html"
+    if template_path.exists():
+        template = template_path.read_text(encoding="utf-8")
+        template += "<!--" + "A" * int(args.pad_mb * 1024 * 1024) + "-->"
+        print(f"テンプレート: {template_path}")
+    else:
+        template = synthetic_template(int(args.pad_mb * 1024 * 1024))
+        print("テンプレート: 合成（template.html が見つからないため）")
+    names = sorted(set(PLACEHOLDER_RE.findall(template)))
+    values = sample_values(names)
+    print(f"サイズ {len(template.encode('utf-8')):,} bytes / スロット {len(names)}種類 / {args.renders}回描画\n")
+
+    compiled = compile_template(template)
+    a = measure("str.replace ループ", lambda: render_replace(template, values), args.renders)
+    b = measure("template_engine (解析済み)", lambda: compiled.render(values), args.renders)
+    measure("template_engine (解析込み)", lambda: compile_template(template).render(values), args.renders)
+    assert a == b, "描画結果が一致しません"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用のローカル偽サーバー（Gemini / RSS / Slack / Supabase）
+fixtures/ に保存した応答を返すだけなので、ネットワークに出ずに記事生成の全経路を動かせる
+
+  POST /v1beta/models/<model>:generateContent         fixtures/gemini.json の応答（一括）
+  POST /v1beta/models/<model>:streamGenerateContent   同じ応答をSSEのチャンクに分けて返す
+  GET  /feeds/<name>.xml                               fixtures/feed.xml（ETag付き。If-None-Match が一致すれば304）
+  POST /slack                                          Slack Incoming Webhook の代わり（"ok" を返す）
+  POST /rest/v1/rpc/vote_snapshot                      全記事の票数 {記事ID: {キャラID: 票数}}（PostgREST互換）
+  POST /rest/v1/rpc/increment_votes                    {"p_votes": [{article_id, character, delta}, ...]} を加算
+  GET  /rest/v1/vote_totals?article_id=eq.<記事ID>     記事1本分の票数 [{character, count}, ...]
+
+Supabase の各エンドポイントは apikey ヘッダーが無ければ401を返す（ブラウザから試せるようCORSも許可する）
+
+Geminiの応答はプロンプトに gemini.json の "match" 文字列が含まれる最初の項目を使う
+"""
+import hashlib
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+STREAM_CHUNK_CHARS = 200  # SSE 1チャンクあたりの文字数
+
+
+def load_gemini_fixtures() -> list:
+    fixtures = json.loads((FIXTURES_DIR / "gemini.json").read_text(encoding="utf-8"))
+    for f in fixtures:
+        if not isinstance(f["response"], str):
+            f["response"] = json.dumps(f["response"], ensure_ascii=False)
+    return fixtures
+
+
+class FakeServices:
+    """偽サーバーをバックグラウンドスレッドで起動する。latency は Gemini 1回あたりの擬似応答時間（秒）"""
+
+    def __init__(self, latency: float = 0.0, votes: dict = None):
+        self.latency = latency
+        self.votes = {aid: dict(counts) for aid, counts in (votes or {}).items()}  # {記事ID: {キャラID: 票数}}
+        self.gemini = load_gemini_fixtures()
+        self.feed = (FIXTURES_DIR / "feed.xml").read_bytes()
+        self.feed_etag = '"%s"' % hashlib.sha1(self.feed).hexdigest()[:16]
+        self.requests = {"gemini": 0, "rss": 0, "rss_not_modified": 0, "slack": 0,
+                         "vote_read": 0, "vote_write": 0}
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def gemini_response(self, prompt: str) -> dict:
+        for f in self.gemini:
+            if f["match"] in prompt:
+                return f
+        raise KeyError(f"プロンプトに一致する fixture がありません: {prompt[:80]!r}")
+
+    def _handler(self):
+        services = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if self.path.startswith("/rest/"):
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_OPTIONS(self):
+                self._send(204, headers={"Access-Control-Allow-Methods": "GET, POST",
+                                         "Access-Control-Allow-Headers": "apikey, authorization, content-type"})
+
+            def do_GET(self):
+                if self.path.startswith("/rest/"):
+                    return self._rest("GET", None)
+                if not self.path.startswith("/feeds/"):
+                    return self._send(404)
+                if self.headers.get("If-None-Match") == services.feed_etag:
+                    services.count("rss_not_modified")
+                    return self._send(304, headers={"ETag": services.feed_etag})
+                services.count("rss")
+                self._send(200, services.feed, "application/rss+xml; charset=utf-8", {"ETag": services.feed_etag})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.startswith("/slack"):
+                    services.count("slack")
+                    return self._send(200, b"ok", "text/plain")
+                payload = json.loads(body) if body else {}
+                if self.path.startswith("/rest/"):
+                    return self._rest("POST", payload)
+                if "/models/" not in self.path:
+                    return self._send(404)
+                services.count("gemini")
+                prompt = "".join(p.get("text", "") for c in payload["contents"] for p in c["parts"])
+                try:
+                    fixture = services.gemini_response(prompt)
+                except KeyError as e:
+                    return self._send(400, json.dumps({"error": {"message": str(e)}}, ensure_ascii=False).encode("utf-8"))
+                if services.latency:
+                    time.sleep(services.latency)
+                text, usage = fixture["response"], fixture.get("usage")
+                if ":streamGenerateContent" in self.path:
+                    return self._stream(text, usage)
+                self._send(200, json.dumps({
+                    "candidates": [{"content": {"parts": [{"text": text}]}, "finishReason": "STOP"}],
+                    "usageMetadata": usage,
+                }, ensure_ascii=False).encode("utf-8"))
+
+            def _rest(self, method: str, payload):
+                if not self.headers.get("apikey"):
+                    return self._send(401, b'{"message": "No API key found in request"}')
+                url = urllib.parse.urlsplit(self.path)
+                if method == "POST" and url.path == "/rest/v1/rpc/vote_snapshot":
+                    services.count("vote_read")
+                    with services._lock:
+                        body = json.dumps(services.votes)
+                    return self._send(200, body.encode("utf-8"))
+                if method == "POST" and url.path == "/rest/v1/rpc/increment_votes":
+                    services.count("vote_write")
+                    with services._lock:
+                        for v in payload.get("p_votes", []):
+                            counts = services.votes.setdefault(v["article_id"], {})
+                            counts[v["character"]] = counts.get(v["character"], 0) + max(0, int(v["delta"]))
+                    return self._send(204)
+                if method == "GET" and url.path == "/rest/v1/vote_totals":
+                    services.count("vote_read")
+                    query = urllib.parse.parse_qs(url.query)
+                    article_id = query.get("article_id", ["eq."])[0].removeprefix("eq.")
+                    with services._lock:
+                        rows = [{"character": c, "count": n} for c, n in services.votes.get(article_id, {}).items()]
+                    return self._send(200, json.dumps(rows).encode("utf-8"))
+                self._send(404, b'{"message": "not found"}')
+
+            def _stream(self, text: str, usage: dict):
+                chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, chunk in enumerate(chunks):
+                    candidate = {"content": {"parts": [{"text": chunk}]}}
+                    event = {"candidates": [candidate]}
+                    if i == len(chunks) - 1:
+                        candidate["finishReason"] = "STOP"
+                        event["usageMetadata"] = usage
+                    data = b"data: " + json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\r\n\r\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with FakeServices() as services:
+        print(f"🧪 偽サーバー起動: {services.url}（Ctrl+C で終了）")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -1,42 +1,41 @@
 #!/usr/bin/env python3
 """
-アイコン画像をBase64に変換してHTMLのsrc属性を書き換えるスクリプト
-ローカルでもGitHub Pagesでも確実に表示されるようにする
+テンプレート内のアイコン参照を assets/icons/{name}.png の素のパスに戻し、最適化済みアセットを生成するスクリプト
+以前のバージョンで埋め込んだBase64データURIは元のPNGと照合して差し戻す
+ビルド時に rewrite_icon_tags() が素のパスをレスポンシブな <picture> に展開する
 """
 import base64
 import re
 from pathlib import Path
 
-icons_dir = Path("/home/ubuntu/the-jury/assets/icons")
-template_path = Path("/home/ubuntu/the-jury/template.html")
-
-# 対象アイコン一覧
-icon_files = {
-    "ishibashi": icons_dir / "ishibashi.png",
-    "zero":      icons_dir / "zero.png",
-    "kokuji":    icons_dir / "kokuji.png",
-    "packet":    icons_dir / "packet.png",
-    "pure":      icons_dir / "pure.png",
-    "kitsu":     icons_dir / "kitsu.png",
-}
-
-# Base64変換
-b64 = {}
-for name, path in icon_files.items():
-    if path.exists():
-        data = path.read_bytes()
-        b64[name] = "data:image/png;base64," + base64.b64encode(data).decode()
-        print(f"✅ {name}: {len(data):,} bytes → base64 {len(b64[name]):,} chars")
-    else:
-        print(f"❌ {name}: ファイルが見つかりません: {path}")
+from icon_assets import ICON_NAMES, ICONS_DIR, build_icon_assets, report_savings
+
+template_path = Path(__file__).parent / "template.html"
 
-# テンプレートのsrc属性を置換
 template = template_path.read_text(encoding="utf-8")
+before_size = len(template)
+
+# 埋め込み済みのBase64データURIを元画像と突き合わせてキャラIDを特定する
+originals = {}
+for name in ICON_NAMES:
+    path = ICONS_DIR / f"{name}.png"
+    if path.exists():
+        originals[path.read_bytes()] = name
 
-for name, data_uri in b64.items():
-    # assets/icons/{name}.png を data URI に置換
-    template = template.replace(f'src="assets/icons/{name}.png"', f'src="{data_uri}"')
 
+def _replace_data_uri(m):
+    name = originals.get(base64.b64decode(m.group(1)))
+    if name is None:
+        return m.group(0)
+    return f'src="assets/icons/{name}.png"'
+
+
+template = re.sub(r'src="data:image/png;base64,([A-Za-z0-9+/=]+)"', _replace_data_uri, template)
 template_path.write_text(template, encoding="utf-8")
-print(f"\n✅ テンプレート更新完了: {template_path}")
-print(f"   ファイルサイズ: {len(template):,} bytes")
+print(f"✅ テンプレート更新完了: {template_path}")
+print(f"   ファイルサイズ: {before_size:,} → {len(template):,} bytes")
+
+# 最適化済みアセットを生成
+manifest = build_icon_assets()
+print("\n🖼️  アイコン最適化結果（チャット表示2xサイズ）:")
+report_savings(manifest)
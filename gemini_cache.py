@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+The Jury - Gemini応答キャッシュ
+モデル・プロンプト・generationConfig をキーにした内容アドレス方式のディスクキャッシュ
+TTLで期限切れを判定し、合計サイズが上限を超えたら最終アクセスが古い順（LRU）に削除する
+（合計サイズは最初の保存で1回だけ数え、以降は書き込んだ分を足していく。上限を超えたときだけ全体を走査する）
+
+リプレイモード（--replay）では期限を無視してキャッシュだけから応答を返し、ネットワークには一切出ない
+プロンプトが前回と微妙に変わっていても（日付や候補の並びなど）、前回実行のジャーナルから
+同じステージ・同じ順番の応答を引き当てて記事を再構築する
+ジャーナルには記事番号も残し、リプレイは新しい番号を採らずに同じ番号の記事を作り直す
+チェックポイントから再開した実行は前回までのジャーナルに今回実行したステージを上書きで足す（全ステージをリプレイできるように）
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from pipeline import current_stage
+
+CACHE_DIR = Path(os.environ.get("GEMINI_CACHE_DIR", Path(__file__).parent / ".cache" / "gemini"))
+JOURNAL_PATH = CACHE_DIR / "journal.json"
+CACHE_TTL = int(os.environ.get("GEMINI_CACHE_TTL", 7 * 24 * 3600))  # 秒
+CACHE_MAX_BYTES = int(os.environ.get("GEMINI_CACHE_MAX_MB", 50)) * 1024 * 1024
+
+# "normal": 読み書きする / "replay": キャッシュのみ（ミスはエラー） / "off": 使わない
+_mode = "off" if os.environ.get("GEMINI_CACHE", "1") == "0" else "normal"
+_lock = threading.Lock()
+_journal = {}         # 今回の実行で使ったキー {ラベル: [key, ...]}
+_journal_vol = None   # 今回の実行で生成している記事番号
+_journal_base = {}    # 同じ記事番号の前回までのジャーナル（再開時に今回実行しないステージの分）
+_cache_bytes = None   # キャッシュの合計サイズ（最初の put で数える）
+_replay_journal = {}  # リプレイ元のジャーナル
+_replay_vol = None
+_replay_pos = {}
+
+
+class CacheMiss(Exception):
+    """リプレイモードでキャッシュに応答が無い"""
+
+
+def set_mode(mode: str):
+    """キャッシュモードを切り替える。replay の場合は前回実行のジャーナルを読み込む"""
+    global _mode, _replay_journal, _replay_vol
+    if mode not in ("normal", "replay", "off"):
+        raise ValueError(f"不明なキャッシュモード: {mode}")
+    _mode = mode
+    if mode == "replay" and JOURNAL_PATH.exists():
+        journal = json.loads(JOURNAL_PATH.read_text(encoding="utf-8"))
+        _replay_journal = journal.get("stages", journal)  # 記事番号を残す前の形式はステージの辞書だけ
+        _replay_vol = journal.get("vol_num")
+
+
+def set_journal_vol(vol_num: int):
+    """今回の実行で生成する記事番号をジャーナルに残す（リプレイで同じ番号に作り直すため）
+    前回のジャーナルが同じ記事番号なら引き継ぐ（チェックポイントから再開して実行しないステージの応答を残す）"""
+    global _journal_vol, _journal_base
+    _journal_vol = vol_num
+    _journal_base = {}
+    try:
+        journal = json.loads(JOURNAL_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return
+    if journal.get("vol_num") == vol_num:
+        _journal_base = journal.get("stages", {})
+
+
+def replay_vol_num():
+    """リプレイ元のジャーナルに記録された記事番号（無ければ None）"""
+    return _replay_vol
+
+
+def is_replay() -> bool:
+    return _mode == "replay"
+
+
+def cache_key(*parts) -> str:
+    """キー要素（JSON化できる値）から内容アドレスを作る"""
+    blob = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _read(key: str, ttl: int = None):
+    path = _path(key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if ttl is not None and time.time() - entry["created"] > ttl:
+        return None
+    os.utime(path)  # LRU用に最終アクセス時刻を更新
+    return entry["value"]
+
+
+def _label() -> str:
+    return current_stage()
+
+
+def _record(key: str):
+    """今回の実行でどのステージがどのキーを使ったかをジャーナルに残す"""
+    with _lock:
+        _journal.setdefault(_label(), []).append(key)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = JOURNAL_PATH.with_suffix(".tmp")
+        stages = {**_journal_base, **_journal}  # 今回実行したステージは前回の記録を置き換える
+        tmp.write_text(json.dumps({"vol_num": _journal_vol, "stages": stages}, indent=2), encoding="utf-8")
+        os.replace(tmp, JOURNAL_PATH)
+
+
+def get(key: str):
+    """キャッシュから値を返す。無ければ None（リプレイモードでは CacheMiss）"""
+    if _mode == "off":
+        return None
+    if _mode == "normal":
+        return _read(key, CACHE_TTL)
+
+    # ヒット・ミスにかかわらずジャーナル上の位置を進め、前回実行と呼び出し順を揃える
+    label = _label()
+    with _lock:
+        pos = _replay_pos.get(label, 0)
+        _replay_pos[label] = pos + 1
+    value = _read(key)
+    if value is None:
+        # プロンプトが変わっていても前回実行の同じステージ・同じ順番の応答を使う
+        keys = _replay_journal.get(label, [])
+        if pos < len(keys):
+            value = _read(keys[pos])
+    if value is None:
+        raise CacheMiss(f"リプレイ用のキャッシュがありません（ステージ: {_label()}）")
+    return value
+
+
+def put(key: str, value):
+    """値を保存してジャーナルに記録し、上限を超えていれば古いものから削除する"""
+    if _mode != "normal":
+        return
+    path = _path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    size = tmp.write_bytes(json.dumps({"created": time.time(), "value": value}, ensure_ascii=False).encode("utf-8"))
+    os.replace(tmp, path)
+    _record(key)
+    _evict(size)
+
+
+def touch(key: str):
+    """キャッシュヒットした応答もジャーナルに記録する（次回のリプレイ対象にするため）"""
+    if _mode == "normal":
+        _record(key)
+
+
+def _scan() -> list:
+    return [(p.stat(), p) for p in CACHE_DIR.glob("??/*.json")]
+
+
+def _evict(added: int):
+    """合計サイズが上限を超えたら最終アクセスが古い順に削除する（added: 今回書き込んだバイト数）"""
+    global _cache_bytes
+    with _lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(st.st_size for st, _ in _scan())  # 書き込んだ分も含まれる
+        else:
+            _cache_bytes += added  # 同じキーの上書きは多めに数えるが、超えたら数え直すので問題ない
+        if _cache_bytes <= CACHE_MAX_BYTES:
+            return
+        files = _scan()
+        total = sum(st.st_size for st, _ in files)
+        for st, p in sorted(files, key=lambda f: f[0].st_mtime):
+            if total <= CACHE_MAX_BYTES:
+                break
+            p.unlink(missing_ok=True)
+            total -= st.st_size
+        _cache_bytes = total
@@ -5,69 +5,192 @@ The Jury - 自動記事生成スクリプト（Gemini API版）
 """
 import os
 import json
+import argparse
 import re
 import sys
-import base64
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import datetime
 import time
-import urllib.request
-import urllib.parse
 import urllib.error
-import xml.etree.ElementTree as ET
-import html as html_module
+import http.client
 from pathlib import Path
 
+from renderer import load_render_context, make_article, total_score, write_article
+from article_store import save_article
+from site_index import build_index, index_entries
+from pipeline import run_stages, save_artifact
+from score_analytics import build_scores_json, radar_from_scores
+from votes import build_votes_json
+import article_schema
+import gemini_cache
+import http_client
+import llm_metrics
+import news_dedup
+import news_feeds
+import news_ranking
+import prompts
+from json_stream import IncrementalJSON
+
 # ===== 設定 =====
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
-SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://jyikdveqhvimtyovkgbs.supabase.co")
-SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY", "sb_publishable_LQ-cUMnaam3q1muTdmqtVg_18H23SHM")
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL", "")
 
 # ===== Gemini API呼び出し =====
-def call_gemini(prompt: str, model: str = "gemini-2.0-flash") -> str:
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/models")
+# JSON出力はstreamGenerateContentで逐次受信する（GEMINI_STREAM=0 で一括受信に戻す）
+GEMINI_STREAM = os.environ.get("GEMINI_STREAM", "1") != "0"
+# 記事全体を responseSchema 付きの1回の呼び出しで生成する（--structured / GEMINI_STRUCTURED=1）
+GEMINI_STRUCTURED = os.environ.get("GEMINI_STRUCTURED", "0") == "1"
+# JSON応答が途中で切れ、救済した内容も使えないときに送り直す回数
+JSON_SALVAGE_RETRIES = 2
+# 同時に実行するGemini呼び出しの上限（バッチ生成時は --concurrency で変更）
+_gemini_slots = threading.BoundedSemaphore(int(os.environ.get("GEMINI_CONCURRENCY", 4)))
+
+def set_gemini_concurrency(limit: int):
+    global _gemini_slots
+    _gemini_slots = threading.BoundedSemaphore(limit)
+
+def _gemini_stream(payload: dict, model: str, parser: IncrementalJSON) -> tuple:
+    """streamGenerateContent（SSE）で受信しながらパーサに流し込み、(全文, finishReason, usageMetadata, 試行回数) を返す"""
+    url = f"{GEMINI_BASE_URL}/{model}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    resp = http_client.post_json(url, payload, endpoint="gemini", stream=True)
+    parts = []
+    finish = None
+    usage = None
+    try:
+        for line in resp.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[5:])
+            usage = chunk.get("usageMetadata") or usage  # 最後のチャンクに合計が入る
+            candidate = chunk.get("candidates", [{}])[0]
+            for part in candidate.get("content", {}).get("parts", []):
+                parts.append(part.get("text", ""))
+                parser.feed(parts[-1])
+            finish = candidate.get("finishReason") or finish
+    except (OSError, http.client.HTTPException) as e:
+        # 受信途中で切断された。ここまでの内容は呼び出し元で救済する
+        print(f"⚠️ ストリーミング受信が途中で切断されました: {e}")
+        finish = "DISCONNECTED"
+    return "".join(parts), finish, usage, resp.attempts
+
+def _gemini_send(payload: dict, model: str, parser: IncrementalJSON, streamed: bool) -> tuple:
+    """1回のリクエストを送り (全文, finishReason, usageMetadata, 試行回数) を返す"""
+    if streamed:
+        return _gemini_stream(payload, model, parser)
+    url = f"{GEMINI_BASE_URL}/{model}:generateContent?key={GEMINI_API_KEY}"
+    resp = http_client.post_json(url, payload, endpoint="gemini")
+    body = resp.json()
+    candidate = body["candidates"][0]
+    text = candidate["content"]["parts"][0]["text"]
+    if parser is not None:
+        parser.feed(text)
+    return text, candidate.get("finishReason", "STOP"), body.get("usageMetadata"), resp.attempts
+
+def _gemini_generate(payload: dict, model: str, parser: IncrementalJSON = None) -> str:
+    """
+    Gemini APIを呼び出して応答テキストを返す（同じリクエストはディスクキャッシュから返す）
+    parser を渡すと応答テキストを逐次流し込む（JSON要素の到着通知・途中切れの救済用）
+    途中で切れた応答もそのまま返すが、キャッシュには完結した応答だけを保存する
+    """
+    prompt_chars = sum(len(p.get("text", "")) for c in payload["contents"] for p in c["parts"])
+    prompt_chars += sum(len(p.get("text", "")) for p in payload.get("systemInstruction", {}).get("parts", []))
+    started = time.perf_counter()
+    key = gemini_cache.cache_key(model, payload)
+    cached = gemini_cache.get(key)
+    if cached is not None:
+        gemini_cache.touch(key)
+        if parser is not None:
+            parser.feed(cached)
+        llm_metrics.record_call(model, latency=time.perf_counter() - started, cached=True,
+                                prompt_chars=prompt_chars, output_chars=len(cached))
+        return cached
+
+    streamed = parser is not None and GEMINI_STREAM
+    with _gemini_slots:
+        sent = time.perf_counter()
+        text, finish, usage, attempts = _gemini_send(payload, model, parser, streamed)
+        latency = time.perf_counter() - sent
+    llm_metrics.record_call(model, latency=latency, wait=sent - started, usage=usage, finish=finish,
+                            attempts=attempts, streamed=streamed,
+                            prompt_chars=prompt_chars, output_chars=len(text))
+
+    complete = finish == "STOP"
+    if complete and payload["generationConfig"].get("response_mime_type") == "application/json":
+        try:
+            json.loads(text)
+        except json.JSONDecodeError:
+            complete = False
+    if complete:
+        gemini_cache.put(key, text)
+    return text
+
+def _system_instruction(payload: dict, system: str) -> dict:
+    """全記事で共通の指示（キャラクター設定など）は systemInstruction として本文と分けて送る"""
+    if system:
+        payload["systemInstruction"] = {"parts": [{"text": system}]}
+    return payload
+
+def call_gemini(prompt: str, model: str = "gemini-2.0-flash", system: str = None) -> str:
     """Gemini APIを呼び出してテキストを生成する"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
-    payload = {
+    payload = _system_instruction({
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
             "temperature": 0.85,
             "maxOutputTokens": 8192,
         }
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    }, system)
     try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
-            return result["candidates"][0]["content"]["parts"][0]["text"]
+        return _gemini_generate(payload, model)
     except urllib.error.HTTPError as e:
         print(f"❌ Gemini API エラー: {e.code} {e.read().decode()}")
         sys.exit(1)
 
-def call_gemini_json(prompt: str, model: str = "gemini-2.0-flash") -> dict:
-    """Gemini APIをJSON出力モードで呼び出す（途中切れ防止）"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
-    payload = {
+def call_gemini_json(prompt: str, model: str = "gemini-2.0-flash", on_item: dict = None, system: str = None,
+                     schema: dict = None, expect: dict = None) -> dict:
+    """
+    Gemini APIをJSON出力モードで呼び出す（途中切れ防止）
+    on_item: {パス: コールバック} 配列・オブジェクトの要素が届くたびに呼ばれる（json_stream.IncrementalJSON参照）
+    system: 全記事で共通のシステム指示（prompts.SHARED_SYSTEM）
+    schema: 出力のJSONスキーマ（responseSchema。article_schema 参照）
+    expect: 途中で切れた応答を救済して使うための条件（article_schema のスキーマ。必須キーと件数がそろっていること）
+    応答が途中で切れた場合は、最後に完結した要素までを救済して返す
+    救済した内容が expect を満たさなければ（呼び出し元が使うキーが欠けている・途中のキャラクターが抜けている）送り直す
+    """
+    payload = _system_instruction({
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
             "temperature": 0.85,
             "maxOutputTokens": 8192,
             "response_mime_type": "application/json",
         }
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
-            text = result["candidates"][0]["content"]["parts"][0]["text"]
+    }, system)
+    if schema is not None:
+        payload["generationConfig"]["responseSchema"] = schema
+    for attempt in range(JSON_SALVAGE_RETRIES + 1):
+        parser = IncrementalJSON(on_item)
+        try:
+            text = _gemini_generate(payload, model, parser)
             return json.loads(text)
-    except urllib.error.HTTPError as e:
-        print(f"❌ Gemini API エラー: {e.code} {e.read().decode()}")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON解析エラー: {e}")
-        sys.exit(1)
+        except urllib.error.HTTPError as e:
+            print(f"❌ Gemini API エラー: {e.code} {e.read().decode()}")
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            salvaged = parser.salvage()
+            if not (isinstance(salvaged, dict) and salvaged):
+                print(f"❌ JSON解析エラー: {e}")
+                sys.exit(1)
+            errors = article_schema.validate(salvaged, expect) if expect is not None else []
+            if not errors:
+                print(f"⚠️ 応答が途中で切れたため、最後に完結した要素までを使用します（{len(text):,}文字受信）")
+                return salvaged
+            more = f" ほか{len(errors) - 1}件" if len(errors) > 1 else ""
+            print(f"⚠️ 応答が途中で切れ、救済した内容が不完全です: {errors[0]}{more}"
+                  f"（{len(text):,}文字受信、{attempt + 1}/{JSON_SALVAGE_RETRIES + 1}回目）")
+    print("❌ 途中で切れた応答しか得られませんでした")
+    sys.exit(1)
 
 # ===== 使用済みニュースの重複チェック =====
 def load_used_news() -> list:
@@ -77,113 +200,108 @@ def load_used_news() -> list:
         return json.loads(used_file.read_text(encoding="utf-8"))
     return []
 
-def save_used_news(used: list, title: str):
-    """使用したニュースタイトルを記録する（50件まで保持）"""
-    used_file = Path(__file__).parent / "used_news.json"
-    used.append(title)
-    used_file.write_text(json.dumps(used[-50:], ensure_ascii=False, indent=2), encoding="utf-8")
+_used_news_lock = threading.Lock()
 
-# ===== Google News RSS取得 =====
+def save_used_news(used: list, title: str, *aliases: str):
+    """使用したニュースタイトルを記録する（used_news.json は50件まで、重複判定インデックスには全履歴）
+    aliases: 元になったRSS候補のタイトルなど、同じニュースの別表記"""
+    used_file = Path(__file__).parent / "used_news.json"
+    with _used_news_lock:
+        used.append(title)
+        used_file.write_text(json.dumps(used[-50:], ensure_ascii=False, indent=2), encoding="utf-8")
+        index = news_dedup.get_index()
+        index.add(title, *aliases)
+        index.save()
+
+# ===== ニュース候補の取得 =====
 def fetch_rss_candidates() -> list:
-    """Google News RSSからAI関連ニュースを取得する"""
-    query = urllib.parse.quote("AI 人工知能 生成AI LLM")
-    url = f"https://news.google.com/rss/search?q={query}&hl=ja&gl=JP&ceid=JP:ja"
+    """feeds.json のRSS/Atomフィードを並列に取得し、既出ニュースを除いた候補を新しい順に返す"""
+    key = gemini_cache.cache_key("rss", [f["url"] for f in news_feeds.load_feeds()])
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            content = resp.read()
-        root = ET.fromstring(content)
-        items = root.findall(".//item")
-        candidates = []
-        for item in items[:20]:  # 上位20件を候補に
-            title = html_module.unescape(item.findtext("title", ""))
-            link = item.findtext("link", "")
-            pub = item.findtext("pubDate", "")
-            source_el = item.find("source")
-            source = source_el.text if source_el is not None else "不明"
-            source_url = source_el.get("url", "") if source_el is not None else ""
-            candidates.append({
-                "title": title,
-                "link": link,
-                "pub": pub,
-                "source": source,
-                "source_url": source_url,
-            })
-        print(f"✅ Google News RSS取得完了: {len(candidates)}件")
+        if gemini_cache.is_replay():
+            # リプレイ時は前回取得した候補をそのまま使う（選抜結果の番号と対応させるため）
+            candidates = gemini_cache.get(key)
+            print(f"✅ ニュース候補（キャッシュ）: {len(candidates)}件")
+            return candidates
+        candidates = news_feeds.refresh_pool()
+        # 既出ニュースとの重複はGeminiに渡す前に除く（リプレイで同じ候補を再現できるよう除外後の候補を保存）
+        candidates = news_dedup.filter_new(candidates)
+        gemini_cache.put(key, candidates)
         return candidates
+    except gemini_cache.CacheMiss:
+        raise  # リプレイで候補が無ければフォールバックせずに止める（前回と違う記事になるため）
     except Exception as e:
         print(f"⚠️ RSS取得失敗（Geminiフォールバックに切り替え）: {e}")
         return []
 
 # ===== ニュース選抜（RSS + Gemini） =====
-def fetch_top_ai_news() -> dict:
-    """グーグルニュースRSSから候補を取得し、Geminiが最適な1件を選抜して記事内容を生成する"""
+def select_news(candidates: list) -> dict:
+    """事前ランキング上位の候補からGeminiに1件だけ選ばせる（記事内容の生成は別の呼び出しで行う）"""
     today = datetime.date.today().strftime("%Y年%m月%d日")
-    used_titles = load_used_news()
-
-    # RSSから候補取得
-    candidates = fetch_rss_candidates()
-
-    # 重複除去
-    candidates = [c for c in candidates if c["title"] not in used_titles]
-
-    if candidates:
-        # RSS候補をGeminiに渡して最適な1件を選抜させる
-        candidate_list = "\n".join(
-            [f"{i+1}. [{c['source']}] {c['title']} ({c['pub'][:16]})" for i, c in enumerate(candidates[:15])]
-        )
-        prompt = f"""
-以下は今日（{today}）のAI関連ニュース一覧です。
-日本のエンジニア・パーソンマネージャーが最も議論したくなる、賛否が分かれるトピックを1件選んで、記事内容を生成してください。
+    candidate_list = "\n".join(
+        f"{i + 1}. [{c['source']}] {c['title']} ({c['pub'][:16]})" for i, c in enumerate(candidates)
+    )
+    prompt = f"""
+以下は今日（{today}）のAI関連ニュース候補です。
+日本のエンジニア・パーソンマネージャーが最も議論したくなる、賛否が分かれるトピックを1件選んでください。
 
 候補ニュース：
 {candidate_list}
 
-選抜したニュースの番号（selected_index）と記事内容を以下のJSON形式のみで回答：
-{{
-  "selected_index": 1,
-  "title": "ニュースタイトル（日本語、30文字以内）",
-  "title_html": "HTMLタイトル（キーワードを<span class=\\"ハイライト\\">tagで強調）",
-  "hero_lead": "リード文（2〜3行、HTMLの<br>タグ使用可）",
-  "summary_items": [
-    "サマリ1（1〜2文で要点を簡潔に）",
-    "サマリ2（1〜2文で要点を簡潔に）",
-    "サマリ3（1〜2文で要点を簡潔に）"
-  ],
-  "tags": [
-    ["tag-hot", "タグ名1"],
-    ["tag-tech", "タグ名2"],
-    ["tag-biz", "タグ名3"]
-  ],
-  "news_summary_short": "Slack通知用の短い説明（50文字以内）"
-}}
+選んだ番号のみを以下のJSON形式で回答：
+{{"selected_index": 1}}
 """
-        result = call_gemini_json(prompt)
-
-        # overviewを別途生成（トークン節約のため分離）
-        selected_title = result.get("title", "")
-        overview_prompt = f"""以下のAIニュースについて、読者が内容を十分に理解できるよう背景・詳細を3〜5文で日本語で説明してください。説明文のみを返してください（JSONは不要）。\n\nニュース：{selected_title}"""
-        result["overview"] = call_gemini(overview_prompt).strip()
-
-        # 選抜された候補のソース情報をマージ
-        idx = result.get("selected_index", 1) - 1
-        if 0 <= idx < len(candidates):
-            selected = candidates[idx]
-            result["source_name"] = selected["source"]
-            result["source_url"] = selected["link"]
-        else:
-            result["source_name"] = candidates[0]["source"]
-            result["source_url"] = candidates[0]["link"]
+    result = call_gemini_json(prompt)
+    idx = result.get("selected_index", 1) - 1
+    return candidates[idx] if 0 <= idx < len(candidates) else candidates[0]
+
+def pick_news_candidate() -> tuple:
+    """
+    RSS候補を手元で採点して上位だけをGeminiに選抜させる
+    (選ばれた候補, 選抜の記録) を返す。RSS候補が無ければ (None, None)
+    """
+    # RSSから候補取得（既出ニュースは除外済み）
+    candidates = fetch_rss_candidates()
+    if not candidates:
+        return None, None
+    # 新しさ・媒体・議論性・目新しさで事前に絞り込み、上位だけを選抜プロンプトに載せる
+    top = news_ranking.top_candidates(candidates)
+    selected = select_news(top)
+    print(f"🎯 選抜: [{selected['source']}] {selected['title']}")
+    selection = {
+        "selected": selected["title"],
+        "ranking": [{"title": c["title"], "source": c["source"], "score": c["rank_score"],
+                     **c["rank_detail"]} for c in top],
+    }
+    return selected, selection
 
-        # 使用済みに記録
-        save_used_news(used_titles, result["title"])
+def fetch_top_ai_news() -> dict:
+    """ニュース候補を手元で採点して上位だけをGeminiに選抜させ、選ばれた1件の記事内容を生成する"""
+    used_titles = load_used_news()
+    selected, selection = pick_news_candidate()
+
+    if selected is not None:
+        result = generate_news_content(selected)
+        result["selection"] = selection
+
+        # 使用済みに記録（リプレイ時は初回実行で記録済み）
+        if not gemini_cache.is_replay():
+            save_used_news(used_titles, result["title"], selected["title"])
         return result
 
     else:
         # RSSが使えない場合はGemini単独で生成（フォールバック）
         print("⚠️ RSS候補なし。Gemini単独でニュース生成。")
-        used_str = "\n".join([f"- {t}" for t in used_titles[-10:]]) if used_titles else "なし"
-        prompt = f"""
+        result = generate_news_fallback(used_titles)
+        if not gemini_cache.is_replay():
+            save_used_news(used_titles, result["title"])
+        return result
+
+def generate_news_fallback(used_titles: list) -> dict:
+    """RSS候補が無いときに、Gemini自身にニュースを1件選ばせて記事内容を生成する"""
+    today = datetime.date.today().strftime("%Y年%m月%d日")
+    used_str = "\n".join([f"- {t}" for t in used_titles[-10:]]) if used_titles else "なし"
+    prompt = f"""
 今日（{today}）時点で最もホットなAI関連ニュースを1件選んでください。
 条件：直近1週間以内、日本のエンジニア・パーソンマネージャーが関心を持つ話題、議論を呼ぶトピック。
 
@@ -202,323 +320,146 @@ JSON形式のみで回答：
   "source_url": "情報源URL"
 }}
 """
-        result = call_gemini_json(prompt)
-        # overviewを別途生成（トークン節約のため分離）
-        selected_title = result.get("title", "")
-        overview_prompt = f"""以下のAIニュースについて、読者が内容を十分に理解できるよう背景・詳細を3〜5文で日本語で説明してください。説明文のみを返してください（JSONは不要）。\n\nニュース：{selected_title}"""
-        result["overview"] = call_gemini(overview_prompt).strip()
-        save_used_news(used_titles, result["title"])
-        return result
+    return call_gemini_json(prompt, expect=article_schema.NEWS)
 
-# ===== クロスレビュー生成 =====
-def generate_reviews(news: dict) -> dict:
-    """6名のキャラクターによるクロスレビューを生成する"""
+# ===== 記事内容生成（候補指定） =====
+def generate_news_content(candidate: dict) -> dict:
+    """選抜済みのRSS候補1件について記事内容（タイトル・リード・サマリ・タグ）を生成する"""
+    today = datetime.date.today().strftime("%Y年%m月%d日")
     prompt = f"""
-あなたは「The Jury」というAIニュースレビューブログの編集AIです。
-以下のAIニュースについて、6名のキャラクターそれぞれの視点でレビューを生成してください。
-
-【ニュース】
-タイトル: {news['title']}
-要約: {' '.join(news['summary_items'])}
-
-【キャラクター設定】
-1. 石橋 叩（いしばし たたく）: 守旧派PM/50代。「昔はよかった」が口癖。新技術に懐疑的だが、現場視点では一理ある意見を言う。
-2. コード・ゼロ: 天才ハッカー/20代。技術オタク。「技術は止まらない」。石橋を老害と思っている。
-3. 黒字 策（くろじ はかる）: 冷徹コンサル/30代。「金になるか？」が判断基準。市場・ROI視点。
-4. パケット守（ぱけっと まもる）: NW職人/40代。インフラ・現場実装の観点。「インフラが死んだら全部終わり」。
-5. ピュア: 新人社員/20代女性。直感的に反応。「怖い」「便利そう」。読者の素朴な疑問を代弁。
-6. 規律 正（きりつ ただし）: コンプラ担当/40代。法的リスクに敏感。「著作権」「情報漏洩」「GDPR/AI Act」。
-
-【出力形式】
-以下のJSON形式のみで回答してください（radarは不要、scoresとreviewsのみ）：
+以下は今日（{today}）のAI関連ニュースです。
+日本のエンジニア・パーソンマネージャーが議論したくなるよう、記事内容を生成してください。
+
+ニュース：[{candidate['source']}] {candidate['title']} ({candidate['pub'][:16]})
+
+以下のJSON形式のみで回答：
 {{
-  "scores": {{
-    "ishibashi": 点数(1-10の整数),
-    "zero": 点数(1-10の整数),
-    "kokuji": 点数(1-10の整数),
-    "packet": 点数(1-10の整数),
-    "pure": 点数(1-10の整数),
-    "kitsu": 点数(1-10の整数)
-  }},
-  "reviews": {{
-    "ishibashi": "石橋のレビュー（350〜400文字、口語体、辛口）",
-    "zero": "ゼロのレビュー（350〜400文字、口語体、技術的）",
-    "kokuji": "黒字のレビュー（350〜400文字、口語体、ビジネス視点）",
-    "packet": "パケットのレビュー（350〜400文字、口語体、インフラ視点）",
-    "pure": "ピュアのレビュー（350〜400文字、口語体、素朴な疑問）",
-    "kitsu": "規律のレビュー（350〜400文字、口語体、法的視点）"
-  }}
+  "title": "ニュースタイトル（日本語、30文字以内）",
+  "title_html": "HTMLタイトル（キーワードを<span class=\\"ハイライト\\">tagで強調）",
+  "hero_lead": "リード文（2〜3行、HTMLの<br>タグ使用可）",
+  "summary_items": [
+    "サマリ1（1〜2文で要点を簡潔に）",
+    "サマリ2（1〜2文で要点を簡潔に）",
+    "サマリ3（1〜2文で要点を簡潔に）"
+  ],
+  "tags": [
+    ["tag-hot", "タグ名1"],
+    ["tag-tech", "タグ名2"],
+    ["tag-biz", "タグ名3"]
+  ],
+  "news_summary_short": "Slack通知用の短い説明（50文字以内）"
 }}
 """
-    result = call_gemini_json(prompt)
+    result = call_gemini_json(prompt, expect=article_schema.NEWS)
+    result["source_name"] = candidate["source"]
+    result["source_url"] = candidate["link"]
+    return result
 
-    # radarデータはスコアから自動生成（APIに頼らず確実に生成）
-    scores = result.get("scores", {})
-    char_configs = [
-        # (id, name, color, [技術革新性係数, ビジネス影響係数, リスク度係数, 社会的影響係数, 現場実用性係数, 倫理法的問題係数])
-        # 各キャラクターの視点に応じた係数でスコアを変換
-        ("ishibashi", "石橋 叩",   "#a1887f", [0.6, 0.8, 1.2, 0.9, 1.1, 0.8]),
-        ("zero",      "コード・ゼロ", "#00d4ff", [1.3, 0.9, 0.7, 0.8, 1.1, 0.6]),
-        ("kokuji",    "黒字 策",    "#ffd166", [0.8, 1.3, 0.9, 0.9, 0.9, 0.7]),
-        ("packet",    "パケット守",  "#06d6a0", [1.0, 0.7, 1.1, 0.8, 1.3, 0.9]),
-        ("pure",      "ピュア",     "#c77dff", [1.0, 1.0, 1.0, 1.1, 1.0, 0.9]),
-        ("kitsu",     "規律 正",    "#4361ee", [0.7, 0.8, 1.3, 1.0, 0.8, 1.4]),
-    ]
-    radar = []
-    for cid, cname, color, factors in char_configs:
-        base = scores.get(cid, 5)
-        data = [min(10, max(1, round(base * f))) for f in factors]
-        radar.append({"name": cname, "color": color, "data": data})
-    result["radar"] = radar
+# ===== ニュース概要生成 =====
+def generate_overview(news: dict) -> str:
+    """ニュースの背景・詳細説明を生成する（タイトルだけに依存するのでレビュー生成と並列実行できる）"""
+    overview_prompt = f"""以下のAIニュースについて、読者が内容を十分に理解できるよう背景・詳細を3〜5文で日本語で説明してください。説明文のみを返してください（JSONは不要）。\n\nニュース：{news.get("title", "")}"""
+    return call_gemini(overview_prompt).strip()
+
+# ===== クロスレビュー生成 =====
+def generate_reviews(news: dict) -> dict:
+    """6名のキャラクターによるクロスレビューを生成する（キャラクター設定は共有のシステム指示で送る）"""
+    prompt = prompts.reviews_prompt(news)
+    prompts.log_sizes(prompt, prompts.SHARED_SYSTEM)
+
+    # レビューは届いた順にログへ出す（ストリーミング受信）
+    def on_review(cid, text):
+        print(f"   ✍️  {cid} のレビュー受信（{len(text)}文字）")
+    result = call_gemini_json(prompt.text(), on_item={("reviews",): on_review}, system=prompts.SHARED_SYSTEM.text(),
+                              expect=article_schema.REVIEWS)
+
+    # radarデータはスコアから自動生成（APIに頼らず確実に生成。係数は score_analytics.RADAR_FACTORS）
+    result["radar"] = radar_from_scores(result.get("scores", {}))
     return result
 
 # ===== 座談会生成 =====
 def generate_roundtable(news: dict, reviews: dict) -> dict:
     """6名による座談会（チャット形式）と格言を生成する"""
-    # 各キャラクターのレビュー内容を座談会プロンプトに注入して姿勢の一貫性を保つ
-    char_map = {
-        "ishibashi": "石橋 叩",
-        "zero":      "コード・ゼロ",
-        "kokuji":    "黒字 策",
-        "packet":    "パケット守",
-        "pure":      "ピュア",
-        "kitsu":     "規律 正",
-    }
-    scores = reviews.get("scores", {})
-    review_texts = reviews.get("reviews", {})
-    stance_summary = ""
-    for cid, cname in char_map.items():
-        score = scores.get(cid, "?")
-        review = review_texts.get(cid, "")
-        # レビューの先頭100文字を姿勢要約として使用
-        summary = review[:100].replace('\n', '') + "…" if len(review) > 100 else review
-        stance_summary += f"- {cname}（スコア{score}/10）: {summary}\n"
-
-    prompt = f"""
-あなたは「The Jury」というAIニュースレビューブログの編集AIです。
-以下のニュースについて、6名による激論座談会（チャット形式）と格言を生成してください。
-
-【ニュース】{news['title']}
-
-【各キャラクターがレビューで表明した立場（必ずこの姿勢を座談会でも一貫させること）】
-{stance_summary}
-【ルール】
-- 16ターン以上
-- 上記の各キャラクターの立場を座談会でも必ず引き継ぐこと（レビューと矛盾しない）
-- 意見の対立構造を作ること（特に「石橋 vs ゼロ」「黒字 vs 規律」）
-- 石橋（老害）の意見は一見理不尽だが現場視点では一理ある内容にすること
-- 最後はコンサル（黒字）かハッカー（ゼロ）が未来への示唆で強引に締めること
-- 口語体で感情的に
-
-【キャラID】ishibashi=石橋叩, zero=コードゼロ, kokuji=黒字策, packet=パケット守, pure=ピュア, kitsu=規律正
-
-【出力形式】JSON形式のみで回答：
-{{
-  "chat_log": [
-    ["キャラID", "left または right", "発言内容"],
-    ...
-  ],
-  "quote": "本日の格言（読者の行動を促す一言、HTMLの<br>タグ使用可）"
-}}
-
-※ leftは左寄り（石橋・パケット・規律）、rightは右寄り（ゼロ・黒字・ピュア）
-"""
-    return call_gemini_json(prompt)
+    # 各キャラクターのレビュー内容（スコアと冒頭）だけを記事ごとの差分として注入し、姿勢の一貫性を保つ
+    prompt = prompts.roundtable_prompt(news, reviews)
+    prompts.log_sizes(prompt, prompts.SHARED_SYSTEM)
+
+    # 発言は届いた順にログへ出す（ストリーミング受信）
+    def on_turn(i, turn):
+        if len(turn) == 3:
+            print(f"   💬 [{i + 1}] {prompts.CHAR_NAMES.get(turn[0], turn[0])}: {turn[2][:30]}…")
+    return call_gemini_json(prompt.text(), on_item={("chat_log",): on_turn}, system=prompts.SHARED_SYSTEM.text(),
+                            expect=article_schema.ROUNDTABLE)
+
+# ===== 構造化生成モード（記事全体を1回で生成） =====
+def generate_article_structured(candidate: dict, used_titles: list) -> dict:
+    """
+    記事の全セクション（news / overview / reviews / roundtable）を responseSchema 付きの1回の呼び出しで生成する
+    手元でスキーマ検証し、直せない崩れが残ったセクションだけを従来の個別プロンプトで作り直す
+    candidate が None の場合はGemini自身にニュースを選ばせる
+    """
+    prompt = prompts.article_prompt(candidate, used_titles=used_titles)
+    prompts.log_sizes(prompt, prompts.SHARED_SYSTEM)
+
+    def on_review(cid, text):
+        print(f"   ✍️  {cid} のレビュー受信（{len(text)}文字）")
+
+    def on_turn(i, turn):
+        if len(turn) == 3:
+            print(f"   💬 [{i + 1}] {prompts.CHAR_NAMES.get(turn[0], turn[0])}: {turn[2][:30]}…")
+
+    draft = call_gemini_json(prompt.text(), system=prompts.SHARED_SYSTEM.text(),
+                             schema=article_schema.article_schema(),
+                             on_item={("reviews", "reviews"): on_review, ("roundtable", "chat_log"): on_turn})
+    draft = article_schema.repair(draft if isinstance(draft, dict) else {})
+    failed = article_schema.invalid_sections(draft)
+    if "reviews" in failed:
+        failed.setdefault("roundtable", ["レビューを作り直すため、座談会も作り直します"])
+    for name, errors in failed.items():
+        more = f" ほか{len(errors) - 1}件" if len(errors) > 1 else ""
+        print(f"⚠️ {name} がスキーマに合いません（このセクションだけ作り直します）: {errors[0]}{more}")
+
+    # 作り直しは依存順（news → overview・reviews → roundtable）
+    if "news" in failed:
+        draft["news"] = generate_news_content(candidate) if candidate else generate_news_fallback(used_titles)
+    if candidate is not None:
+        draft["news"]["source_name"] = candidate["source"]
+        draft["news"]["source_url"] = candidate["link"]
+    if "overview" in failed:
+        draft["overview"] = generate_overview(draft["news"])
+    if "reviews" in failed:
+        draft["reviews"] = generate_reviews(draft["news"])
+    if "roundtable" in failed:
+        draft["roundtable"] = generate_roundtable(draft["news"], draft["reviews"])
+
+    still = article_schema.invalid_sections(article_schema.repair(draft))
+    if still:
+        raise ValueError(f"作り直してもスキーマに合いません: {still}")
+    draft["reviews"]["radar"] = radar_from_scores(draft["reviews"]["scores"])
+    return draft
+
+# ===== 総合スコア =====
+def calc_total_score(reviews: dict) -> float:
+    """6名のスコアの平均（小数1桁）"""
+    return total_score(reviews["scores"])
 
 # ===== HTMLビルド =====
-def build_html(vol_num: int, news: dict, reviews: dict, roundtable: dict) -> Path:
-    """全データをテンプレートに埋め込んでHTMLを生成する"""
-    template_path = Path(__file__).parent / "template.html"
-    template = template_path.read_text(encoding="utf-8")
-
-    # アイコンをBase64に変換
-    icons_dir = Path(__file__).parent / "assets" / "icons"
-    icon_b64 = {}
-    for name in ["ishibashi", "zero", "kokuji", "packet", "pure", "kitsu"]:
-        p = icons_dir / f"{name}.png"
-        if p.exists():
-            icon_b64[name] = "data:image/png;base64," + base64.b64encode(p.read_bytes()).decode()
-        else:
-            icon_b64[name] = f"assets/icons/{name}.png"
-
-    scores = reviews["scores"]
-    total = round(sum(scores.values()) / len(scores), 1)
-    today = datetime.date.today().strftime("%Y年%m月%d日")
-    vol_str = f"Vol.{vol_num:03d}"
-    article_id = f"vol{vol_num:03d}"
-
-    # タグHTML
-    tags_html = "\n    ".join(
-        f'<span class="tag {cls}">{label}</span>'
-        for cls, label in news.get("tags", [])
-    )
-
-    def pct(v): return int(v / 10 * 100)
-
-    # 概要テキスト
-    overview_html = news.get("overview", "")
-
-    # サマリーアイテム
-    summary_html = "\n      ".join(
-        f"<li>{item}</li>" for item in news.get("summary_items", [])
-    )
-
-    # チャットログHTML
-    char_names = {
-        "ishibashi": "石橋 叩", "zero": "コード・ゼロ",
-        "kokuji": "黒字 策", "packet": "パケット守",
-        "pure": "ピュア", "kitsu": "規律 正",
-    }
-    chat_html_parts = []
-    for char, side, text in roundtable.get("chat_log", []):
-        name = char_names.get(char, char)
-        icon_src = icon_b64.get(char, f"assets/icons/{char}.png")
-        chat_html_parts.append(f"""      <div class="chat-msg {char} {side}">
-        <img src="{icon_src}" alt="{name}" class="chat-icon">
-        <div class="chat-bubble-wrap">
-          <span class="chat-name">{name}</span>
-          <div class="chat-bubble">{text}</div>
-        </div>
-      </div>""")
-    chat_html = "\n".join(chat_html_parts)
-
-    # レーダーチャートデータ
-    radar_datasets = []
-    for r in reviews.get("radar", []):
-        radar_datasets.append({
-            "label": r["name"],
-            "data": r["data"],
-            "borderColor": r["color"],
-            "backgroundColor": r["color"] + "22",
-            "borderWidth": 2,
-            "pointBackgroundColor": r["color"],
-            "pointRadius": 3,
-        })
-
-    # ソースリンク
-    source_links = f'<a href="{news.get("source_url", "#")}" target="_blank" rel="noopener">{news.get("source_name", "参考記事")}</a>'
-    source_badge = f'<a href="{news.get("source_url", "#")}" target="_blank" rel="noopener">{news.get("source_name", "参考記事")}</a>'
-
-    # テンプレート置換
-    html = template
-    replacements = {
-        "{{ARTICLE_TITLE}}": news["title"],
-        "{{ARTICLE_TITLE_HTML}}": news.get("title_html", news["title"]),
-        "{{ARTICLE_ID}}": article_id,
-        "{{VOL_NUMBER}}": vol_str,
-        "{{PUBLISH_DATE}}": today,
-        "{{NEWS_SUMMARY_SHORT}}": news.get("news_summary_short", ""),
-        "{{HERO_LEAD}}": news.get("hero_lead", ""),
-        "{{TAGS_HTML}}": tags_html,
-        "{{TOTAL_SCORE}}": str(total),
-        "{{SCORE_ISHIBASHI}}": str(scores.get("ishibashi", 5)),
-        "{{SCORE_ZERO}}": str(scores.get("zero", 5)),
-        "{{SCORE_KOKUJI}}": str(scores.get("kokuji", 5)),
-        "{{SCORE_PACKET}}": str(scores.get("packet", 5)),
-        "{{SCORE_PURE}}": str(scores.get("pure", 5)),
-        "{{SCORE_KITSU}}": str(scores.get("kitsu", 5)),
-        "{{SCORE_ISHIBASHI_PCT}}": str(pct(scores.get("ishibashi", 5))),
-        "{{SCORE_ZERO_PCT}}": str(pct(scores.get("zero", 5))),
-        "{{SCORE_KOKUJI_PCT}}": str(pct(scores.get("kokuji", 5))),
-        "{{SCORE_PACKET_PCT}}": str(pct(scores.get("packet", 5))),
-        "{{SCORE_PURE_PCT}}": str(pct(scores.get("pure", 5))),
-        "{{SCORE_KITSU_PCT}}": str(pct(scores.get("kitsu", 5))),
-        "{{REVIEW_ISHIBASHI}}": reviews["reviews"].get("ishibashi", ""),
-        "{{REVIEW_ZERO}}": reviews["reviews"].get("zero", ""),
-        "{{REVIEW_KOKUJI}}": reviews["reviews"].get("kokuji", ""),
-        "{{REVIEW_PACKET}}": reviews["reviews"].get("packet", ""),
-        "{{REVIEW_PURE}}": reviews["reviews"].get("pure", ""),
-        "{{REVIEW_KITSU}}": reviews["reviews"].get("kitsu", ""),
-        "{{OVERVIEW}}": overview_html,
-        "{{SUMMARY_ITEMS}}": summary_html,
-        "{{CHAT_LOG_HTML}}": chat_html,
-        "{{RADAR_DATA_JSON}}": json.dumps(radar_datasets, ensure_ascii=False),
-        "{{QUOTE_TEXT}}": roundtable.get("quote", ""),
-        "{{SOURCE_LINKS}}": source_links,
-        "{{SOURCE_BADGE}}": source_badge,
-        "{{SUPABASE_URL}}": SUPABASE_URL,
-        "{{SUPABASE_ANON_KEY}}": SUPABASE_ANON_KEY,
-    }
-    for k, v in replacements.items():
-        html = html.replace(k, v)
-
-    out_path = Path(__file__).parent / f"vol{vol_num:03d}.html"
-    out_path.write_text(html, encoding="utf-8")
-    return out_path
+def build_html(vol_num: int, news: dict, overview: str, reviews: dict, roundtable: dict) -> Path:
+    """各ステージの結果を記事データ（articles/volXXX.json）にまとめて保存し、共有レンダラーでHTMLを生成する
+    レーダーチャートとOG画像のカードは svg_charts が描く（データのハッシュでキャッシュ）"""
+    article = make_article(vol_num, news, overview, reviews, roundtable)
+    save_article(article)
+    return write_article(article)
 
 # ===== 記事インデックス更新 =====
-def update_index(vol_num: int, news: dict, total_score: float):
-    """index.htmlの記事一覧に新しい記事を追加する"""
-    index_path = Path(__file__).parent / "index.html"
-    today = datetime.date.today().strftime("%Y年%m月%d日")
-    vol_str = f"Vol.{vol_num:03d}"
-    article_id = f"vol{vol_num:03d}"
-
-    new_entry = f"""      <article class="article-card latest">
-        <a href="{article_id}.html">
-          <div class="card-top">
-            <span class="card-vol">{vol_str}</span>
-            <span class="badge-latest">LATEST</span>
-            <span class="card-date">{today}</span>
-          </div>
-          <h2 class="card-title">{news['title']}</h2>
-          <p class="card-summary">{news.get('news_summary_short', '')}</p>
-          <div class="card-score-block">
-            <div class="card-score-num">{total_score}</div>
-            <div class="card-score-denom">/ 10</div>
-            <div class="card-score-label">総合スコア</div>
-          </div>
-        </a>
-      </article>"""
-
-    if not index_path.exists():
-        # index.htmlが存在しない場合は新規作成
-        index_html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>AI News Cross-Review "The Jury"</title>
-  <style>
-    * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-    body {{ background: #0d1117; color: #e6edf3; font-family: 'Noto Sans JP', sans-serif; padding: 40px 20px; }}
-    .header {{ text-align: center; margin-bottom: 60px; }}
-    .header h1 {{ font-size: 2rem; color: #ff4d4d; letter-spacing: 2px; }}
-    .header p {{ color: #8b949e; margin-top: 10px; }}
-    .articles {{ max-width: 900px; margin: 0 auto; display: grid; gap: 20px; }}
-    .article-card {{ background: #161b22; border: 1px solid #30363d; border-radius: 12px; overflow: hidden; transition: transform 0.2s; }}
-    .article-card:hover {{ transform: translateY(-4px); }}
-    .article-card a {{ display: block; padding: 24px; text-decoration: none; color: inherit; }}
-    .card-vol {{ font-size: 12px; color: #ff4d4d; font-weight: 700; margin-bottom: 8px; }}
-    .card-title {{ font-size: 1.2rem; font-weight: 700; margin-bottom: 10px; color: #e6edf3; }}
-    .card-summary {{ font-size: 14px; color: #8b949e; margin-bottom: 16px; line-height: 1.6; }}
-    .card-meta {{ display: flex; justify-content: space-between; font-size: 12px; color: #8b949e; }}
-    .card-score {{ color: #ffd166; font-weight: 700; }}
-  </style>
-</head>
-<body>
-  <div class="header">
-    <h1>AI NEWS CROSS-REVIEW "THE JURY"</h1>
-    <p>6名のAIキャラクターが最新AIニュースを辛口クロスレビュー</p>
-  </div>
-  <div class="articles">
-{new_entry}
-  </div>
-</body>
-</html>"""
-        index_path.write_text(index_html, encoding="utf-8")
-    else:
-        # 既存のindex.htmlに記事を追加（最新が上に来るよう先頭に挿入）
-        content = index_path.read_text(encoding="utf-8")
-        # 既存のlatestバッジを履歴カードに変更（新しい記事が最新になるため）
-        content = content.replace('article-card latest', 'article-card')
-        content = content.replace('<span class="badge-latest">LATEST</span>', '')
-        # 新しい記事を先頭に挿入
-        content = content.replace(
-            '<div class="articles">',
-            f'<div class="articles">\n{new_entry}'
-        )
-        index_path.write_text(content, encoding="utf-8")
+def update_index():
+    """記事データストアから index.html・アーカイブ・JSONフィード・scores.json・votes.json を生成し直す（変わったファイルだけ書き出す）"""
+    stats = build_index()
+    print(f"   {stats['written']}ファイルを更新（変更なし {stats['unchanged']} / 削除 {stats['removed']}）")
+    if build_scores_json():
+        print("   📊 scores.json を更新")
+    if build_votes_json():
+        print("   🗳️ votes.json を更新")
 
 # ===== Slack通知 =====
 def notify_slack(vol_num: int, news: dict, total_score: float, html_url: str):
@@ -527,7 +468,6 @@ def notify_slack(vol_num: int, news: dict, total_score: float, html_url: str):
         print("⚠️ SLACK_WEBHOOK_URL が未設定のためSlack通知をスキップします")
         return
 
-    import urllib.request
     vol_str = f"Vol.{vol_num:03d}"
     today = datetime.date.today().strftime("%Y/%m/%d")
 
@@ -579,77 +519,251 @@ def notify_slack(vol_num: int, news: dict, total_score: float, html_url: str):
         ]
     }
 
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        SLACK_WEBHOOK_URL,
-        data=data,
-        headers={"Content-Type": "application/json"}
-    )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            print(f"✅ Slack通知送信完了: {resp.status}")
+        resp = http_client.post_json(SLACK_WEBHOOK_URL, payload, endpoint="slack")
+        print(f"✅ Slack通知送信完了: {resp.status}")
     except Exception as e:
         print(f"⚠️ Slack通知失敗（記事生成は成功）: {e}")
 
 # ===== 記事番号の自動採番 =====
+WORK_DIR = Path(__file__).parent / ".cache" / "work"
+# 作業ツリーに書き出すステージ（記事HTML・記事データ・インデックス）。チェックポイントを使わず再開時も実行し直す
+# （CIの再実行では .cache/work だけが復元され、前回書き出したファイルは push されていない）
+ALWAYS_RUN_STAGES = ("html", "index")
+
+def get_unfinished_vol_num():
+    """途中で失敗した記事（チェックポイントはあるが通知まで終わっていない）の番号を返す"""
+    nums = []
+    for d in WORK_DIR.glob("vol*"):
+        m = re.match(r'vol(\d+)$', d.name)
+        if m and not (d / "notify.json").exists():
+            nums.append(int(m.group(1)))
+    return min(nums) if nums else None
+
 def get_next_vol_num() -> int:
-    """既存のvolXXX.htmlファイルを確認して次の番号を返す"""
+    """記事一覧（記事データストア・移行前の記事）・既存のvolXXX.html・作業ディレクトリを確認して次の番号を返す"""
     base = Path(__file__).parent
-    existing = list(base.glob("vol*.html"))
-    if not existing:
-        return 2  # vol001はサンプルとして存在するので002から
-    nums = []
-    for f in existing:
+    nums = [e["vol_num"] for e in index_entries()]
+    for f in base.glob("vol*.html"):
         m = re.match(r'vol(\d+)\.html', f.name)
         if m:
             nums.append(int(m.group(1)))
-    return max(nums) + 1 if nums else 2
+    for d in WORK_DIR.glob("vol*"):
+        m = re.match(r'vol(\d+)$', d.name)
+        if m:
+            nums.append(int(m.group(1)))
+    return max(nums) + 1 if nums else 2  # vol001はサンプルとして存在するので002から
+
+# ===== 記事生成ステージ =====
+def article_stages(vol_num: int, fetch_news, structured: bool = False) -> list:
+    """1記事分のステージ（ニュース取得〜HTML生成）を run_stages 用の形式で返す
+    fetch_news: 引数なしでニュース辞書を返す関数
+    structured=True の場合、fetch_news は (候補, 選抜の記録) を返す関数で、draft ステージが記事全体を1回で生成する"""
+    tag = f"[Vol.{vol_num:03d}] "
+
+    def stage_draft():
+        print(f"\n🔍 {tag}最新AIニュースを検索中...")
+        used_titles = load_used_news()
+        candidate, selection = fetch_news()
+        print(f"\n🧩 {tag}記事全体を1回の呼び出しで生成中...")
+        draft = generate_article_structured(candidate, used_titles)
+        if selection:
+            draft["news"]["selection"] = selection
+        if not gemini_cache.is_replay():
+            save_used_news(used_titles, draft["news"]["title"], *([candidate["title"]] if candidate else []))
+        print(f"✅ {tag}記事生成完了: {draft['news']['title']}（総合スコア: {calc_total_score(draft['reviews'])}/10、"
+              f"座談会 {len(draft['roundtable']['chat_log'])}ターン）")
+        return draft
+
+    def stage_news():
+        print(f"\n🔍 {tag}最新AIニュースを検索中...")
+        news = fetch_news()
+        print(f"✅ {tag}ニュース取得: {news['title']}")
+        return news
+
+    def stage_overview(news):
+        overview = generate_overview(news)
+        print(f"✅ {tag}概要生成完了")
+        return overview
+
+    def stage_reviews(news):
+        print(f"\n✍️  {tag}6名のクロスレビューを生成中...")
+        reviews = generate_reviews(news)
+        print(f"✅ {tag}レビュー生成完了（総合スコア: {calc_total_score(reviews)}/10）")
+        return reviews
+
+    def stage_roundtable(news, reviews):
+        print(f"\n💬 {tag}激論！座談会を生成中...")
+        roundtable = generate_roundtable(news, reviews)
+        print(f"✅ {tag}座談会生成完了（{len(roundtable.get('chat_log', []))}ターン）")
+        return roundtable
+
+    def stage_html(news, overview, reviews, roundtable):
+        print(f"\n🔨 {tag}HTMLを生成中...")
+        out_path = build_html(vol_num, news, overview, reviews, roundtable)
+        print(f"✅ {tag}HTML生成完了: {out_path}")
+        return str(out_path)
+
+    if structured:
+        # draft の各セクションを従来と同じステージ名で取り出す（後続の index / notify はそのまま使える）
+        sections = [("draft", stage_draft, [])] + [
+            (name, lambda draft, name=name: draft[name], ["draft"])
+            for name in ("news", "overview", "reviews", "roundtable")
+        ]
+    else:
+        sections = [
+            ("news",       stage_news,       []),
+            ("overview",   stage_overview,   ["news"]),
+            ("reviews",    stage_reviews,    ["news"]),
+            ("roundtable", stage_roundtable, ["news", "reviews"]),
+        ]
+    return sections + [
+        ("html",       stage_html,       ["news", "overview", "reviews", "roundtable"]),
+    ]
+
+# ===== バッチ生成 =====
+def run_batch(count: int, structured: bool = False):
+    """1回のRSS取得から複数記事をまとめて生成する（バックフィル・A/B検証用）
+    各記事は並列に生成し、テンプレート・アイコンの準備とindex.htmlの更新は1回だけ行う"""
+    used_titles = load_used_news()
+    # 既出ニュースは除外済み。事前ランキングの上位から順に使う
+    candidates = news_ranking.top_candidates(fetch_rss_candidates(), top_k=count)
+    if not candidates:
+        print("❌ 使用可能なRSS候補がありません")
+        sys.exit(1)
+
+    first = get_next_vol_num()
+    jobs = [(first + i, c) for i, c in enumerate(candidates)]
+    print(f"\n📌 生成する記事: Vol.{first:03d}〜Vol.{jobs[-1][0]:03d}（{len(jobs)}件）")
+    load_render_context()  # 全記事で共有するテンプレート・アイコンを先に準備
+
+    def build_one(vol_num, candidate):
+        def fetch_news():
+            if structured:
+                return candidate, None  # 使用済みへの記録は draft ステージで行う
+            news = generate_news_content(candidate)
+            save_used_news(used_titles, news["title"], candidate["title"])
+            return news
+        results = run_stages(article_stages(vol_num, fetch_news, structured),
+                             checkpoint_dir=WORK_DIR / f"vol{vol_num:03d}", always_run=ALWAYS_RUN_STAGES)
+        return vol_num, results["news"], calc_total_score(results["reviews"])
+
+    entries = []
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {pool.submit(build_one, vol_num, c): vol_num for vol_num, c in jobs}
+        for future in as_completed(futures):
+            try:
+                entries.append(future.result())
+            except (Exception, SystemExit) as e:
+                print(f"⚠️ Vol.{futures[future]:03d} の生成に失敗しました（チェックポイントは保存済み）: {e!r}")
+
+    if not entries:
+        print("❌ 1件も生成できませんでした")
+        sys.exit(1)
+
+    # 生成できた記事をまとめてインデックスに追加（通知はバッチでは送らない）
+    print(f"\n📋 記事インデックスを更新中...（{len(entries)}件）")
+    update_index()
+    for vol_num, _, _ in entries:
+        work_dir = WORK_DIR / f"vol{vol_num:03d}"
+        save_artifact(work_dir, "notify", {"skipped": "batch"})
+    print("✅ インデックス更新完了")
+
+    print("\n" + "=" * 50)
+    print(f"🎉 完了！ {len(entries)}/{len(jobs)}件を生成しました")
+    for vol_num, news, total in sorted(entries, key=lambda e: e[0]):
+        print(f"   Vol.{vol_num:03d} {news['title']}（{total}/10）")
+    print("=" * 50)
+    llm_metrics.print_summary()
 
 # ===== メイン処理 =====
 def main():
+    parser = argparse.ArgumentParser(description="The Jury - 自動記事生成")
+    parser.add_argument("--replay", action="store_true",
+                        help="Gemini/RSSを呼ばず、前回実行のキャッシュ済み応答だけで記事を再構築する")
+    parser.add_argument("--no-cache", action="store_true", help="Gemini応答キャッシュを使わない")
+    parser.add_argument("--fresh", action="store_true",
+                        help="途中で失敗した記事を再開せず、新しい番号で最初から生成する")
+    parser.add_argument("--batch", type=int, metavar="N",
+                        help="1回のRSS取得からN件の記事をまとめて生成する（Slack通知なし）")
+    parser.add_argument("--structured", action="store_true", default=GEMINI_STRUCTURED,
+                        help="記事全体を responseSchema 付きの1回の呼び出しで生成する（既定: 環境変数 GEMINI_STRUCTURED=1）")
+    parser.add_argument("--concurrency", type=int, metavar="N",
+                        help="同時に実行するGemini呼び出しの上限（既定: 環境変数 GEMINI_CONCURRENCY または4）")
+    args = parser.parse_args()
+
     print("=" * 50)
-    print("🚀 The Jury - 自動記事生成開始")
+    print("🚀 The Jury - 自動記事生成開始" + ("（リプレイ）" if args.replay else ""))
     print("=" * 50)
 
-    if not GEMINI_API_KEY:
+    if args.replay:
+        gemini_cache.set_mode("replay")
+    elif args.no_cache:
+        gemini_cache.set_mode("off")
+
+    if not GEMINI_API_KEY and not args.replay:
         print("❌ GEMINI_API_KEY が設定されていません")
         sys.exit(1)
 
-    # 1. 次の記事番号を決定
-    vol_num = get_next_vol_num()
-    print(f"\n📌 生成する記事: Vol.{vol_num:03d}")
-
-    # 2. ニュース取得
-    print("\n🔍 最新AIニュースを検索中...")
-    news = fetch_top_ai_news()
-    print(f"✅ ニュース取得: {news['title']}")
-
-    # 3. クロスレビュー生成
-    print("\n✍️  6名のクロスレビューを生成中...")
-    reviews = generate_reviews(news)
-    scores = reviews["scores"]
-    total = round(sum(scores.values()) / len(scores), 1)
-    print(f"✅ レビュー生成完了（総合スコア: {total}/10）")
-
-    # 4. 座談会生成
-    print("\n💬 激論！座談会を生成中...")
-    roundtable = generate_roundtable(news, reviews)
-    print(f"✅ 座談会生成完了（{len(roundtable.get('chat_log', []))}ターン）")
-
-    # 5. HTML生成
-    print("\n🔨 HTMLを生成中...")
-    out_path = build_html(vol_num, news, reviews, roundtable)
-    print(f"✅ HTML生成完了: {out_path}")
-
-    # 6. インデックス更新
-    print("\n📋 記事インデックスを更新中...")
-    update_index(vol_num, news, total)
-    print("✅ インデックス更新完了")
+    if args.concurrency:
+        set_gemini_concurrency(args.concurrency)
+    if args.batch:
+        if args.replay:
+            print("❌ --batch と --replay は同時に指定できません")
+            sys.exit(1)
+        run_batch(args.batch, args.structured)
+        return
 
-    # 7. Slack通知
-    print("\n📣 Slack通知を送信中...")
+    # 1. 次の記事番号を決定（途中で失敗した記事があればその続きから）
+    if args.replay:
+        # リプレイは前回実行の記事を同じ番号で作り直す（新しい番号は採らない）
+        vol_num = gemini_cache.replay_vol_num()
+        if vol_num is None:
+            print("❌ リプレイ用のジャーナルに記事番号がありません（先に通常の実行が必要です）")
+            sys.exit(1)
+        print(f"\n♻️  前回実行の Vol.{vol_num:03d} をキャッシュから作り直します")
+    else:
+        vol_num = None if args.fresh else get_unfinished_vol_num()
+        if vol_num is not None:
+            print(f"\n♻️  前回失敗した Vol.{vol_num:03d} をチェックポイントから再開します")
+        else:
+            if args.fresh:
+                for d in WORK_DIR.glob("vol*"):
+                    if not (d / "notify.json").exists():
+                        shutil.rmtree(d)
+            vol_num = get_next_vol_num()
+        gemini_cache.set_journal_vol(vol_num)
+    # リプレイはチェックポイントを読み書きせず、キャッシュ済みの応答から全ステージを実行し直す
+    work_dir = None if args.replay else WORK_DIR / f"vol{vol_num:03d}"
     blog_url = f"https://siitake-man.github.io/the-jury/vol{vol_num:03d}.html"
-    notify_slack(vol_num, news, total, blog_url)
+    print(f"\n📌 生成する記事: Vol.{vol_num:03d}" + (f"（作業ディレクトリ: {work_dir}）" if work_dir else ""))
+
+    # 記事生成後のステージ（インデックス更新・通知）
+    def stage_index(news, reviews, _html):
+        # 記事HTMLが書き出されてからインデックスに載せる
+        print("\n📋 記事インデックスを更新中...")
+        update_index()
+        print("✅ インデックス更新完了")
+
+    def stage_notify(news, reviews, _index):
+        if args.replay:
+            print("\n📣 リプレイのためSlack通知をスキップします")
+            return
+        print("\n📣 Slack通知を送信中...")
+        notify_slack(vol_num, news, calc_total_score(reviews), blog_url)
+
+    try:
+        fetch_news = pick_news_candidate if args.structured else fetch_top_ai_news
+        run_stages(article_stages(vol_num, fetch_news, args.structured) + [
+            ("index",      stage_index,      ["news", "reviews", "html"]),
+            ("notify",     stage_notify,     ["news", "reviews", "index"]),
+        ], checkpoint_dir=work_dir, always_run=ALWAYS_RUN_STAGES)
+    except gemini_cache.CacheMiss as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        # 失敗した実行でも、どのステージで時間・トークンを使ったかを残す
+        llm_metrics.print_summary()
 
     print("\n" + "=" * 50)
     print(f"🎉 完了！ Vol.{vol_num:03d} を公開しました")
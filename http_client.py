@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+The Jury - 共有HTTPクライアント
+Gemini / RSS / Slack / Supabase への通信をまとめて扱う
+- ホストごとにKeep-Alive接続をプールして再利用する
+- 429/5xx・通信エラーはジッター付き指数バックオフで再試行する（Retry-After を優先）
+  冪等でないリクエスト（Slack への POST など）は、送信後の通信エラーでは再試行しない（二重に処理されるため）
+- エンドポイントごとのトークンバケットでリクエスト数を制限する
+- エンドポイントごとにタイムアウトと再試行回数を設定する
+"""
+import email.utils
+import http.client
+import io
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+# エンドポイントごとの設定
+#   timeout: 1リクエストのタイムアウト（秒） / retries: 最大再試行回数
+#   rate: 1秒あたりの平均リクエスト数 / burst: 連続で送れる最大数
+#   retry_statuses: 再試行するステータス（省略時は RETRY_STATUSES）
+#   idempotent: POST でも送り直してよい（副作用が無い）か。省略時は IDEMPOTENT_METHODS のメソッドだけ
+ENDPOINTS = {
+    "gemini": {"timeout": 120, "retries": 4, "rate": 0.25, "burst": 4, "idempotent": True},
+    "rss":    {"timeout": 15,  "retries": 2, "rate": 2.0,  "burst": 4},
+    # Webhookの5xxは投稿済みのことがあり、送り直すと二重に投稿される。429（受け付けていない）だけ再試行する
+    "slack":  {"timeout": 30,  "retries": 3, "rate": 1.0,  "burst": 1, "retry_statuses": {429}},
+    # ビルドから呼ぶのは票数を読み出すRPCだけ
+    "supabase": {"timeout": 15, "retries": 2, "rate": 2.0, "burst": 2, "idempotent": True},
+    "default": {"timeout": 30, "retries": 2, "rate": 5.0,  "burst": 5},
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+NOT_MODIFIED = 304   # 条件付きGET（If-None-Match / If-Modified-Since）で未更新。エラーにせずそのまま返す
+MAX_REDIRECTS = 5
+BACKOFF_BASE = 1.0   # 秒
+BACKOFF_MAX = 60.0   # 秒
+POOL_SIZE = 4        # ホストごとに保持するアイドル接続数
+
+_pool_lock = threading.Lock()
+_pools = {}     # (scheme, host, port) -> [アイドル接続]
+_buckets = {}   # エンドポイント名 -> TokenBucket
+
+
+class Response:
+    """レスポンス（本文は読み込み済み。ストリーミング時は iter_lines() で逐次読む）"""
+
+    def __init__(self, url: str, status: int, headers, body: bytes = b"", raw=None, release=None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.attempts = 1
+        self._raw = raw
+        self._release = release
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+    def iter_lines(self):
+        """ストリーミングレスポンスを1行ずつ返し、読み終えたら接続をプールに戻す"""
+        try:
+            for line in self._raw:
+                yield line.decode("utf-8").rstrip("\r\n")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._release:
+            self._release()
+            self._release = None
+
+
+class TokenBucket:
+    """平均 rate 回/秒、最大 burst 回まで連続で許可するレートリミッタ"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _config(endpoint: str) -> dict:
+    return ENDPOINTS.get(endpoint, ENDPOINTS["default"])
+
+
+def _bucket(endpoint: str) -> TokenBucket:
+    with _pool_lock:
+        if endpoint not in _buckets:
+            cfg = _config(endpoint)
+            _buckets[endpoint] = TokenBucket(cfg["rate"], cfg["burst"])
+        return _buckets[endpoint]
+
+
+def _checkout(scheme: str, host: str, port: int, timeout: float, pooled: bool = True):
+    """接続を取り出す（pooled=False ならプールの接続を使わず新しく繋ぐ）"""
+    key = (scheme, host, port)
+    with _pool_lock:
+        idle = _pools.setdefault(key, [])
+        if idle and pooled:
+            conn = idle.pop()
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return cls(host, port, timeout=timeout), False
+
+
+def _checkin(scheme: str, host: str, port: int, conn):
+    with _pool_lock:
+        idle = _pools.setdefault((scheme, host, port), [])
+        if len(idle) < POOL_SIZE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _retry_after(headers) -> float:
+    """Retry-After ヘッダ（秒数またはHTTP日付）を秒に変換する。無ければ None"""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):  # 形式の崩れた日付は無視して通常のバックオフにする
+        return None
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def _backoff(attempt: int) -> float:
+    """フルジッター付き指数バックオフ"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _http_error(url: str, resp: Response) -> urllib.error.HTTPError:
+    return urllib.error.HTTPError(url, resp.status, http.client.responses.get(resp.status, ""),
+                                  resp.headers, io.BytesIO(resp.body))
+
+
+def request(method: str, url: str, body: bytes = None, headers: dict = None,
+            endpoint: str = "default", stream: bool = False) -> Response:
+    """
+    HTTPリクエストを送信する。2xx・304以外は再試行し、最終的に失敗したら urllib.error.HTTPError を送出する
+    通信エラーが再試行回数を超えた場合は最後の例外（OSError / http.client.HTTPException）をそのまま送出する
+    冪等でないリクエストは、送信し終えた後の通信エラー（応答待ちのタイムアウト・切断）では再試行せずに送出する
+    （プールの接続が切れていて送信後に失敗しないよう、新しい接続で送る）
+    stream=True の場合は本文を読まずに返す（iter_lines() で読み切るか close() すること）
+    """
+    cfg = _config(endpoint)
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    hdrs = {"Connection": "keep-alive", "User-Agent": "Mozilla/5.0 (The Jury bot)"}
+    hdrs.update(headers or {})
+    idempotent = method in IDEMPOTENT_METHODS or cfg.get("idempotent", False)
+
+    attempt = 0
+    redirects = 0
+    while True:
+        _bucket(endpoint).acquire()
+        conn, reused = _checkout(scheme, parts.hostname, port, cfg["timeout"], pooled=idempotent)
+        sent = False
+        try:
+            conn.request(method, path, body=body, headers=hdrs)
+            sent = True
+            raw = conn.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if sent and not idempotent:
+                # 相手が処理済みかもしれない（Webhookの投稿など）。送り直すと二重になるので再試行しない
+                raise
+            if reused and isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)):
+                # プール内でサーバー側から切られていた接続。再試行回数は消費しない
+                continue
+            if attempt >= cfg["retries"]:
+                raise
+            delay = _backoff(attempt)
+            print(f"⚠️ 通信エラー（{endpoint}）: {e} → {delay:.1f}s後に再試行")
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        def release(conn=conn, raw=raw):
+            if raw.will_close:
+                conn.close()
+            else:
+                raw.read()  # 未読の本文を捨ててから接続を再利用する
+                _checkin(scheme, parts.hostname, port, conn)
+
+        if stream and 200 <= raw.status < 300:
+            resp = Response(url, raw.status, raw.headers, raw=raw, release=release)
+            resp.attempts = attempt + 1
+            return resp
+
+        try:
+            data = raw.read()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if not idempotent or attempt >= cfg["retries"]:
+                raise
+            delay = _backoff(attempt)
+            print(f"⚠️ 受信エラー（{endpoint}）: {e} → {delay:.1f}s後に再試行")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        release()
+        resp = Response(url, raw.status, raw.headers, data)
+        resp.attempts = attempt + 1
+        if 200 <= resp.status < 300 or resp.status == NOT_MODIFIED:
+            return resp
+        if resp.status in REDIRECT_STATUSES and resp.headers.get("Location") and method in ("GET", "HEAD"):
+            if redirects >= MAX_REDIRECTS:
+                raise _http_error(url, resp)
+            # リダイレクト先で改めてリクエストする（urllibと同様にGET/HEADのみ追従）
+            url = urllib.parse.urljoin(url, resp.headers["Location"])
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme
+            port = parts.port or (443 if scheme == "https" else 80)
+            path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+            redirects += 1
+            continue
+        if resp.status not in cfg.get("retry_statuses", RETRY_STATUSES) or attempt >= cfg["retries"]:
+            raise _http_error(url, resp)
+        delay = _retry_after(resp.headers)
+        if delay is None:
+            delay = _backoff(attempt)
+        delay = min(delay, BACKOFF_MAX)
+        print(f"⚠️ HTTP {resp.status}（{endpoint}） → {delay:.1f}s後に再試行（{attempt + 1}/{cfg['retries']}）")
+        time.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, headers: dict = None, endpoint: str = "default") -> Response:
+    return request("GET", url, headers=headers, endpoint=endpoint)
+
+
+def post_json(url: str, payload: dict, endpoint: str = "default", stream: bool = False,
+              headers: dict = None) -> Response:
+    data = json.dumps(payload).encode("utf-8")
+    return request("POST", url, body=data, headers={"Content-Type": "application/json", **(headers or {})},
+                   endpoint=endpoint, stream=stream)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+The Jury - アイコンアセットパイプライン
+キャラクターアイコンを表示サイズごとに縮小し、AVIF/WebP/PNGの各形式でコンテンツハッシュ付きファイルとして出力する
+全ページは同じファイルを参照するため、ブラウザ・CDNで長期キャッシュできる
+元画像のハッシュが変わらない限り再エンコードはしない（インクリメンタル）
+"""
+import hashlib
+import html as html_module
+import io
+import json
+import re
+from pathlib import Path
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillowが無い環境では縮小せずにハッシュ化だけ行う
+    Image = None
+    features = None
+
+BASE_DIR = Path(__file__).parent
+ICONS_DIR = BASE_DIR / "assets" / "icons"
+DIST_DIR = BASE_DIR / "assets" / "dist"
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+
+ICON_NAMES = ["ishibashi", "zero", "kokuji", "packet", "pure", "kitsu"]
+
+# 実際の表示サイズ（CSS px）。チャットの吹き出しアイコンとレビューカードのアイコン
+DISPLAY_SIZES = {
+    "chat": 48,
+    "card": 64,
+}
+# 1x / 2x 密度の両方を用意する
+VARIANT_WIDTHS = sorted({px * d for px in DISPLAY_SIZES.values() for d in (1, 2)})
+
+# 優先度順（<picture> の <source> もこの順で並べる）。PNGはフォールバック用
+FORMATS = [
+    ("avif", "image/avif", {"quality": 55}),
+    ("webp", "image/webp", {"quality": 80, "method": 6}),
+    ("png", "image/png", {"optimize": True}),
+]
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _supported_formats() -> list:
+    if Image is None:
+        return []
+    return [f for f in FORMATS if f[0] == "png" or features.check(f[0])]
+
+
+def _encode_variants(src: Path) -> dict:
+    """1枚の元画像から {形式: {幅: bytes}} を作る"""
+    variants = {}
+    with Image.open(src) as im:
+        im = im.convert("RGBA")
+        for width in VARIANT_WIDTHS:
+            resized = im.resize((width, width), Image.LANCZOS)
+            for fmt, _, opts in _supported_formats():
+                buf = io.BytesIO()
+                resized.save(buf, format=fmt.upper(), **opts)
+                variants.setdefault(fmt, {})[str(width)] = buf.getvalue()
+    return variants
+
+
+def _pipeline_signature() -> str:
+    """出力サイズ・形式の組み合わせ。設定やPillowの対応形式が変われば再生成する"""
+    formats = [f[0] for f in _supported_formats()] or ["copy"]
+    return f"{','.join(map(str, VARIANT_WIDTHS))}|{','.join(formats)}"
+
+
+def _load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    return {}
+
+
+def _entry_is_fresh(entry: dict, source_hash: str) -> bool:
+    if not entry or entry.get("source_hash") != source_hash:
+        return False
+    if entry.get("pipeline") != _pipeline_signature():
+        return False
+    return all(
+        (BASE_DIR / url).exists()
+        for widths in entry["variants"].values()
+        for url in widths.values()
+    )
+
+
+def _prune_stale_variants(manifest: dict) -> int:
+    """マニフェストから参照されなくなったアイコンの派生画像（元画像や設定が変わる前のもの）を削除する"""
+    referenced = {
+        url
+        for entry in manifest.values()
+        for widths in entry["variants"].values()
+        for url in widths.values()
+    }
+    removed = 0
+    for name in ICON_NAMES:
+        for path in DIST_DIR.glob(f"{name}-*.*.*"):
+            if not re.fullmatch(rf"{name}-\d+\.[0-9a-f]+\.\w+", path.name):
+                continue
+            if path.relative_to(BASE_DIR).as_posix() not in referenced:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+def build_icon_assets() -> dict:
+    """
+    全アイコンの派生画像を assets/dist/{name}-{幅}.{hash}.{形式} として出力し、マニフェストを返す
+    マニフェスト: {name: {"source_hash", "source_bytes", "variants": {形式: {幅: URL}}, "bytes": {形式: {幅: サイズ}}}}
+    """
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest()
+    changed = []
+    dropped = False
+    for name in ICON_NAMES:
+        src = ICONS_DIR / f"{name}.png"
+        if not src.exists():
+            dropped = manifest.pop(name, None) is not None or dropped
+            continue
+        source = src.read_bytes()
+        source_hash = _content_hash(source)
+        if _entry_is_fresh(manifest.get(name), source_hash):
+            continue
+
+        if Image is None:
+            # 縮小できないので元PNGをハッシュ付きでそのまま配信する
+            encoded = {"png": {str(max(VARIANT_WIDTHS)): source}}
+        else:
+            encoded = _encode_variants(src)
+
+        entry = {
+            "source_hash": source_hash,
+            "source_bytes": len(source),
+            "pipeline": _pipeline_signature(),
+            "variants": {},
+            "bytes": {},
+        }
+        for fmt, widths in encoded.items():
+            for width, data in widths.items():
+                out = DIST_DIR / f"{name}-{width}.{_content_hash(data)}.{fmt}"
+                if not out.exists():
+                    out.write_bytes(data)
+                entry["variants"].setdefault(fmt, {})[width] = out.relative_to(BASE_DIR).as_posix()
+                entry["bytes"].setdefault(fmt, {})[width] = len(data)
+        manifest[name] = entry
+        changed.append(name)
+
+    if changed or dropped:
+        MANIFEST_PATH.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    if changed:
+        print(f"🖼️  アイコンを再生成しました（{len(changed)}件）:")
+        report_savings(manifest, changed)
+    removed = _prune_stale_variants(manifest)
+    if removed:
+        print(f"🧹 使われなくなったアイコンの派生画像を削除しました（{removed}件）")
+    return manifest
+
+
+def icon_url(manifest: dict, name: str, size: str = "chat", prefix: str = "") -> str:
+    """指定表示サイズ（2x）のPNG URLを返す。OG画像やSlackなど<picture>が使えない場所向け"""
+    entry = manifest.get(name)
+    if not entry:
+        return f"{prefix}assets/icons/{name}.png"
+    widths = entry["variants"]["png"]
+    want = DISPLAY_SIZES[size] * 2
+    width = min((int(w) for w in widths), key=lambda w: (w < want, abs(w - want)))
+    return prefix + widths[str(width)]
+
+
+def icon_picture_html(manifest: dict, name: str, alt: str, css_class: str,
+                      size: str = "chat", prefix: str = "") -> str:
+    """AVIF/WebP/PNG の srcset を持つ <picture> 要素を返す"""
+    entry = manifest.get(name)
+    fallback = icon_url(manifest, name, size, prefix)
+    px = DISPLAY_SIZES[size]
+    alt = html_module.escape(alt, quote=True)
+    attrs = f'alt="{alt}" class="{css_class}" width="{px}" height="{px}" loading="lazy" decoding="async"'
+    if not entry:
+        return f'<img src="{fallback}" {attrs}>'
+
+    def srcset(widths: dict) -> str:
+        return ", ".join(f"{prefix}{url} {w}w" for w, url in sorted(widths.items(), key=lambda kv: int(kv[0])))
+
+    sizes = f"{px}px"
+    sources = "".join(
+        f'<source type="{mime}" srcset="{srcset(entry["variants"][fmt])}" sizes="{sizes}">'
+        for fmt, mime, _ in FORMATS
+        if fmt != "png" and fmt in entry["variants"]
+    )
+    img = f'<img src="{fallback}" srcset="{srcset(entry["variants"]["png"])}" sizes="{sizes}" {attrs}>'
+    return f"<picture>{sources}{img}</picture>"
+
+
+def rewrite_icon_tags(html: str, manifest: dict, size: str = "card", prefix: str = "") -> str:
+    """テンプレート内の <img src="assets/icons/{name}.png" ...> をレスポンシブな <picture> に置き換える"""
+    def _replace(m):
+        tag, name = m.group(0), m.group(1)
+        alt = re.search(r'alt="([^"]*)"', tag)
+        cls = re.search(r'class="([^"]*)"', tag)
+        return icon_picture_html(
+            manifest, name,
+            html_module.unescape(alt.group(1)) if alt else name,
+            cls.group(1) if cls else "",
+            size, prefix,
+        )
+    return re.sub(r'<img\b[^>]*\bsrc="assets/icons/([a-z]+)\.png"[^>]*>', _replace, html)
+
+
+def report_savings(manifest: dict, names: list = None):
+    """アセットごとに元PNGと各形式（表示サイズ2x）のバイト数を比較して表示する"""
+    want = str(DISPLAY_SIZES["chat"] * 2)
+    total_before = total_after = 0
+    for name in names or ICON_NAMES:
+        entry = manifest.get(name)
+        if not entry:
+            continue
+        before = entry["source_bytes"]
+        sizes = {fmt: widths.get(want) for fmt, widths in entry["bytes"].items() if widths.get(want)}
+        if not sizes:
+            sizes = {fmt: max(widths.values()) for fmt, widths in entry["bytes"].items()}
+        best = min(sizes.values())
+        total_before += before
+        total_after += best
+        detail = " / ".join(f"{fmt} {b:,}" for fmt, b in sizes.items())
+        print(f"   {name}: {before:,} → {best:,} bytes (-{100 - best * 100 // before}%)  [{detail}]")
+    if total_before:
+        print(f"   合計: {total_before:,} → {total_after:,} bytes (-{100 - total_after * 100 // total_before}%)")
+
+
+if __name__ == "__main__":
+    if Image is None:
+        print("⚠️ Pillow が未インストールのため縮小せずに出力します（pip install pillow）")
+    manifest = build_icon_assets()
+    print("🖼️  アイコン最適化結果（チャット表示2xサイズ）:")
+    report_savings(manifest)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+The Jury - インクリメンタルJSONパーサ
+ストリーミングで届くJSONテキストを少しずつ受け取り、
+- 監視対象の配列・オブジェクトの要素が完結するたびにコールバックを呼ぶ
+- 途中で切れた場合は、最後に完結した要素までを有効なJSONとして復元する
+"""
+import json
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSON:
+    """
+    watch: {パス: コールバック}
+      パスはルートからのキーのタプル（例: ("chat_log",) / ("reviews",)）
+      配列なら callback(インデックス, 値)、オブジェクトなら callback(キー, 値) で呼ばれる
+    """
+
+    def __init__(self, watch: dict = None):
+        self.watch = watch or {}
+        self.text = ""
+        self.pos = 0
+        self.stack = []           # 開いているコンテナのフレーム
+        self.in_string = False
+        self.escape = False
+        self.key_start = None
+        self.safe = None          # (切り詰め位置, 閉じ括弧) 最後に完結した要素の直後
+        self.done = False
+
+    # ----- 入力 -----
+    def feed(self, chunk: str):
+        self.text += chunk
+        text = self.text
+        for i in range(self.pos, len(text)):
+            self._step(text, i, text[i])
+        self.pos = len(text)
+
+    def _step(self, text: str, i: int, ch: str):
+        top = self.stack[-1] if self.stack else None
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif ch == "\\":
+                self.escape = True
+            elif ch == '"':
+                self.in_string = False
+                if top is not None and top["type"] == "{" and top["expect_key"]:
+                    top["key"] = json.loads(text[self.key_start:i + 1])
+            return
+
+        if ch == '"':
+            self.in_string = True
+            if top is not None and top["type"] == "{" and top["expect_key"]:
+                self.key_start = i
+            elif top is not None and top["start"] is None:
+                top["start"] = i
+        elif ch in "{[":
+            if top is not None and top["start"] is None:
+                top["start"] = i
+            path = () if top is None else top["path"] + (top["key"],)
+            self.stack.append({
+                "type": ch, "path": path, "start": None, "emitted": False,
+                "key": 0 if ch == "[" else None, "expect_key": ch == "{",
+            })
+            self._mark_safe(i + 1)
+        elif ch in "}]":
+            if top is None:
+                return
+            self._complete(top, text, i)
+            self.stack.pop()
+            parent = self.stack[-1] if self.stack else None
+            if parent is None:
+                self.done = True
+                self._mark_safe(i + 1)
+                return
+            self._emit(parent, text, i + 1)
+            parent["emitted"] = True
+            self._mark_safe(i + 1)
+        elif ch == ",":
+            if top is None:
+                return
+            self._complete(top, text, i)
+            self._mark_safe(i)
+            top["start"] = None
+            top["emitted"] = False
+            if top["type"] == "[":
+                top["key"] += 1
+            else:
+                top["key"] = None
+                top["expect_key"] = True
+        elif ch == ":":
+            if top is not None and top["type"] == "{":
+                top["expect_key"] = False
+        elif not ch.isspace():
+            if top is not None and top["start"] is None and not top["expect_key"]:
+                top["start"] = i
+
+    def _complete(self, frame: dict, text: str, end: int):
+        """区切り文字の手前で完結したスカラー要素を通知する"""
+        if frame["start"] is not None and not frame["emitted"]:
+            frame["emitted"] = True
+            self._emit(frame, text, end)
+
+    def _emit(self, frame: dict, text: str, end: int):
+        """監視対象のパスなら完結した要素をデコードしてコールバックに渡す"""
+        callback = self.watch.get(frame["path"])
+        if callback is not None:
+            callback(frame["key"], json.loads(text[frame["start"]:end]))
+
+    def _mark_safe(self, pos: int):
+        # 監視対象がある場合は、ルート直下か監視対象コンテナの要素境界でだけ切り詰める
+        # （チャットの1発言 ["id", "side"] のような要素の内側で切ると下流が壊れるため）
+        if self.watch and len(self.stack) > 1 and self.stack[-1]["path"] not in self.watch:
+            return
+        closers = "".join(_CLOSERS[f["type"]] for f in reversed(self.stack))
+        self.safe = (pos, closers)
+
+    # ----- 出力 -----
+    def salvage(self):
+        """最後に完結した要素までを復元して返す。何も復元できなければ None"""
+        if self.safe is None:
+            return None
+        pos, closers = self.safe
+        head = self.text[:pos].rstrip()
+        if head.endswith(","):
+            head = head[:-1]
+        try:
+            return json.loads(head + closers)
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+The Jury - 記事ページの遅延セクション（座談会）
+ページの下の方にある座談会は、最初のHTMLに全部を入れず、画面に近づいてから読み込む（IntersectionObserver。assets/lazy.js）
+（レーダーチャートはJSを使わず svg_charts がSVGでページに入れる）
+
+- 最初の CHAT_LEAD_TURNS 発言だけをページに入れ、残りは fragments/volXXX.chat.html に分ける
+- テンプレートは描画前に1回だけ書き換える（votes と同じ）
+  {{CHAT_LOG_HTML}} → 先頭の発言 + 残りを読み込む目印（<template data-lazy="chat">）
+- 分割ファイルはそれだけで読める完全なページ（記事と同じスタイルシート・<base> でサイトルートを指す）にする
+  JSが動かない環境ではページから分割ファイルへのリンクを出し、lazy.js は本文（data-lazy-fragment）だけを差し込む
+LAZY_SECTIONS=0 で書き換えない（全部を最初のHTMLに入れる。前後の計測用）
+"""
+import os
+import re
+from pathlib import Path
+
+import site_output
+
+BASE_DIR = Path(__file__).parent
+LAZY_JS_PATH = BASE_DIR / "assets" / "lazy.js"
+FRAGMENTS_DIRNAME = "fragments"
+
+LAZY_ENABLED = os.environ.get("LAZY_SECTIONS", "1") != "0"
+CHAT_LEAD_TURNS = 4         # ページに最初から入れる座談会の発言数
+ROOT_MARGIN = "400px 0px"   # 画面のこれだけ手前に来たら読み込みを始める
+
+_CHAT_SLOT = "{{CHAT_LOG_HTML}}"
+_HEAD_RE = re.compile(r"<head\b[^>]*>(.*?)</head\s*>", re.S | re.I)
+_TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.S | re.I)
+_PAGE_STYLE_RE = re.compile(r"<link\b[^>]*\brel=[\"']?stylesheet[^>]*>|<style\b[^>]*>.*?</style\s*>", re.S | re.I)
+FRAGMENT_TITLES = {"chat": "座談会の続き"}
+
+
+# ===== 分割したファイル =====
+def fragment_url(article_id: str, kind: str) -> str:
+    """ページから見た分割ファイルのURL（kind: "chat"）"""
+    return f"{FRAGMENTS_DIRNAME}/{article_id}.{kind}.html"
+
+
+def fragment_path(page_path: Path, article_id: str, kind: str) -> Path:
+    """ページと同じディレクトリの fragments/ に置く"""
+    return page_path.parent / fragment_url(article_id, kind)
+
+
+def fragment_page(content: str, kind: str, page_path: Path, page_html: str = "") -> str:
+    """分割ファイルの中身を、それだけで表示できるページにする（スタイルとタイトルは記事ページから取る）
+    <base> をサイトルートにするので、中身の相対URL（アイコンなど）は記事ページに差し込んだときと同じ先を指す"""
+    head = _HEAD_RE.search(page_html)
+    head = head.group(1) if head else ""
+    title = _TITLE_RE.search(head)
+    label = FRAGMENT_TITLES.get(kind, kind)
+    title = f"{title.group(1).strip()}（{label}）" if title else label
+    styles = "".join(_PAGE_STYLE_RE.findall(head))
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<meta name="robots" content="noindex">
+<base href="../">
+<title>{title}</title>
+{styles}
+</head>
+<body>
+<main data-lazy-fragment="{kind}">
+{content}
+</main>
+<p><a href="{page_path.name}">記事に戻る</a></p>
+</body>
+</html>
+"""
+
+
+def write_fragments(page_path: Path, article_id: str, fragments: dict, report: site_output.SizeReport = None,
+                    page_html: str = ""):
+    """{kind: HTML} を分割ファイルとして書き出す（page_html: 書き出した記事ページ。スタイルとタイトルに使う）"""
+    for kind, content in fragments.items():
+        content = fragment_page(content, kind, page_path, page_html)
+        source_bytes = len(content.encode("utf-8"))
+        if site_output.MINIFY:
+            content = site_output.minify_html(content)
+        site_output.write_output(fragment_path(page_path, article_id, kind), content, report, source_bytes)
+
+
+def has_fragments(page_path: Path, article_id: str, kinds) -> bool:
+    return all(fragment_path(page_path, article_id, kind).exists() for kind in kinds)
+
+
+# ===== テンプレートの書き換え =====
+def _defer_chat(html: str) -> str:
+    return html.replace(_CHAT_SLOT, '{{CHAT_LOG_LEAD_HTML}}<template data-lazy="chat" data-src="{{CHAT_FRAGMENT_URL}}">'
+                                    '</template><noscript><a href="{{CHAT_FRAGMENT_URL}}">座談会の続きを読む</a></noscript>')
+
+
+def lazy_script_html(script_url: str) -> str:
+    return (f'<script>window.JURY_LAZY = {{rootMargin: "{ROOT_MARGIN}"}};</script>\n'
+            f'<script src="{script_url}" defer></script>\n')
+
+
+def inject_lazy_sections(html: str) -> str:
+    """テンプレートの座談会を遅延読み込みに書き換え、assets/lazy.js を組み込む"""
+    if not LAZY_ENABLED or "window.JURY_LAZY" in html:
+        return html
+    rewritten = _defer_chat(html)
+    if rewritten == html:
+        return html
+    tag = lazy_script_html(site_output.build_script(LAZY_JS_PATH))
+    for marker in ("</head>", "</body>"):
+        head, sep, tail = rewritten.partition(marker)
+        if sep:
+            return head + tag + sep + tail
+    return tag + rewritten
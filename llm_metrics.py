@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+The Jury - LLM呼び出しの計測
+Gemini呼び出しごとに、ステージ・待ち時間・応答時間・トークン数（usageMetadata）・finishReason・
+再試行回数・推定コストを JSONL に1行ずつ追記し、実行の最後にステージ別の集計表を出す
+
+  .cache/metrics/llm_calls.jsonl  （LLM_METRICS_PATH で変更可）
+  1行 = 1呼び出し。run_id で実行ごとに区別できるので、プロンプト変更前後の比較に使える
+"""
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from pipeline import current_stage, stage_log
+
+METRICS_PATH = Path(os.environ.get("LLM_METRICS_PATH", Path(__file__).parent / ".cache" / "metrics" / "llm_calls.jsonl"))
+
+# 100万トークンあたりの料金（USD）。一覧に無いモデルは "default"
+# cached_input はGemini側のキャッシュから読まれた入力トークン（usageMetadata.cachedContentTokenCount）の料金
+PRICES = {
+    "gemini-2.0-flash": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    "gemini-2.0-flash-lite": {"input": 0.075, "cached_input": 0.01875, "output": 0.30},
+    "gemini-2.5-flash": {"input": 0.30, "cached_input": 0.075, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "cached_input": 0.31, "output": 10.00},
+    "default": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+}
+
+RUN_ID = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+_lock = threading.Lock()
+_calls = []  # この実行の記録
+
+
+def estimate_cost(model: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """入力トークンのうち cached_tokens 分はキャッシュ料金で計算する"""
+    price = PRICES.get(model, PRICES["default"])
+    return ((prompt_tokens - cached_tokens) * price["input"] + cached_tokens * price["cached_input"]
+            + output_tokens * price["output"]) / 1_000_000
+
+
+def usage_tokens(usage: dict) -> tuple:
+    """usageMetadata から (入力トークン, 出力トークン, 合計, うちキャッシュ分の入力トークン) を取り出す"""
+    usage = usage or {}
+    prompt = usage.get("promptTokenCount", 0)
+    output = usage.get("candidatesTokenCount", 0) + usage.get("thoughtsTokenCount", 0)
+    return prompt, output, usage.get("totalTokenCount", prompt + output), usage.get("cachedContentTokenCount", 0)
+
+
+def record_call(model: str, *, latency: float, wait: float = 0.0, usage: dict = None,
+                finish: str = None, attempts: int = 1, cached: bool = False, streamed: bool = False,
+                prompt_chars: int = 0, output_chars: int = 0):
+    """1回のGemini呼び出しを記録する（キャッシュヒットもコスト0として記録する）"""
+    prompt_tokens, output_tokens, total_tokens, cached_tokens = usage_tokens(usage)
+    entry = {
+        "ts": time.time(),
+        "run_id": RUN_ID,
+        "stage": current_stage(),
+        "model": model,
+        "cached": cached,
+        "streamed": streamed,
+        "wait_s": round(wait, 3),
+        "latency_s": round(latency, 3),
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": total_tokens,
+        "cached_tokens": cached_tokens,
+        "finish": finish,
+        "retries": max(0, attempts - 1),
+        "cost_usd": 0.0 if cached else round(estimate_cost(model, prompt_tokens, output_tokens, cached_tokens), 6),
+        "prompt_chars": prompt_chars,
+        "output_chars": output_chars,
+    }
+    with _lock:
+        _calls.append(entry)
+        try:
+            METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ 計測ログを書き込めません: {e}")
+    return entry
+
+
+def calls() -> list:
+    with _lock:
+        return list(_calls)
+
+
+def summarize() -> dict:
+    """ステージ別の集計 {stage: {...}}。ステージの実時間は pipeline のステージ記録から取る"""
+    rows = {}
+    for c in calls():
+        row = rows.setdefault(c["stage"], {"calls": 0, "cached": 0, "latency_s": 0.0, "prompt_tokens": 0,
+                                           "cached_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+                                           "retries": 0, "wall_s": 0.0})
+        row["calls"] += 1
+        row["cached"] += c["cached"]
+        row["latency_s"] += c["latency_s"]
+        row["prompt_tokens"] += c["prompt_tokens"]
+        row["cached_tokens"] += c.get("cached_tokens", 0)
+        row["output_tokens"] += c["output_tokens"]
+        row["cost_usd"] += c["cost_usd"]
+        row["retries"] += c["retries"]
+    for s in stage_log():
+        if s["stage"] in rows:
+            rows[s["stage"]]["wall_s"] += s["seconds"]
+    return rows
+
+
+def print_summary():
+    """この実行のLLM呼び出しをステージ別に表で出す"""
+    rows = summarize()
+    if not rows:
+        return
+    print("\n📈 LLM呼び出しの集計（ステージ別）")
+    print(f"   {'ステージ':<12}{'呼出':>5}{'hit':>7}{'実時間':>9}{'応答計':>9}{'入力tok':>10}{'うちcache':>10}"
+          f"{'出力tok':>10}{'再試行':>7}{'推定USD':>11}")
+    total = {"calls": 0, "cached": 0, "wall_s": 0.0, "latency_s": 0.0, "prompt_tokens": 0,
+             "cached_tokens": 0, "output_tokens": 0, "retries": 0, "cost_usd": 0.0}
+    for stage, r in sorted(rows.items(), key=lambda kv: kv[1]["latency_s"], reverse=True):
+        print(f"   {stage:<12}{r['calls']:>5}{r['cached']:>7}{r['wall_s']:>8.1f}s{r['latency_s']:>8.1f}s"
+              f"{r['prompt_tokens']:>10,}{r['cached_tokens']:>10,}{r['output_tokens']:>10,}{r['retries']:>7}"
+              f"{r['cost_usd']:>11.5f}")
+        for k in total:
+            total[k] += r[k]
+    print(f"   {'合計':<12}{total['calls']:>5}{total['cached']:>7}{total['wall_s']:>8.1f}s{total['latency_s']:>8.1f}s"
+          f"{total['prompt_tokens']:>10,}{total['cached_tokens']:>10,}{total['output_tokens']:>10,}{total['retries']:>7}"
+          f"{total['cost_usd']:>11.5f}")
+    print(f"   （記録: {METRICS_PATH} / run_id: {RUN_ID}）")
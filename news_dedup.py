@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+The Jury - 既出ニュースの重複判定インデックス
+タイトルを正規化して文字bigramの集合（シングル）にし、MinHash署名 + LSH（バンド分割）で索引する
+問い合わせは同じバケットに入った過去タイトルだけをJaccard係数で照合するので、
+履歴がいくら増えても全件を線形に比べることはない
+
+「国産生成AI、精度で苦戦」と「国産生成AI苦戦、精度に差」のような言い換えも既出として扱う
+短いタイトルでは別のニュースでもbigramが多く重なる（「AI投資を拡大」と「AI投資を縮小」、GPT-5 と GPT-6）ため、
+しきい値を超えた候補は、タイトルの語（英数字・カタカナ語・漢字語・数値）でも確かめる
+  - 数値を含む語（GPT-5 と GPT-6・2.5 と 3.0）が互いに食い違えば別のニュース
+  - 語の少ない方のタイトルの語が半分以上（TERM_OVERLAP）他方に含まれれば既出
+    （「LLM限界説、研究者で意見分かれる」と「LLM限界説は本当か？研究者で分かれる見解」のような言い換え）
+  - 語が STRICT_TERMS 個以下の短いタイトルは1語の違いで意味が変わるので、一方の語がすべて他方に含まれるときだけ既出
+インデックスは news_index.json に全履歴を保存する（used_news.json の直近50件だけではない）
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+INDEX_PATH = BASE_DIR / "news_index.json"
+INDEX_VERSION = 1
+
+SHINGLE_SIZE = 2     # 日本語の短いタイトルでは文字bigramが最も言い換えに強い
+BANDS = 20           # LSHのバンド数
+ROWS = 3             # 1バンドあたりの行数（しきい値の目安は (1/BANDS)^(1/ROWS) ≒ 0.37）
+NUM_PERM = BANDS * ROWS
+THRESHOLD = 0.45     # これ以上のJaccard係数なら既出の候補（same_story で確かめる）
+TERM_OVERLAP = 0.5   # 語の少ない方のタイトルの語がこの割合以上他方に含まれれば同じニュース
+STRICT_TERMS = 3     # 語がこれ以下のタイトルはすべての語が含まれることを求める
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# 再現性のため固定の係数でハッシュ関数族を作る（保存済みの署名と互換を保つ）
+_PERMS = [((i * 0x9E3779B1 + 0x7F4A7C15) % _PRIME | 1, (i * 0x85EBCA77 + 0xC2B2AE3D) % _PRIME)
+          for i in range(1, NUM_PERM + 1)]
+
+# Google News のタイトル末尾に付く「 - 媒体名」
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-－–—|｜]\s+[^-－–—|｜]+$")
+_NOISE_RE = re.compile(r"[\W_]+", re.UNICODE)
+# タイトルの語: 英数字（GPT-5・2.5 など記号を含む）/ カタカナ語 / 漢字語（2文字以上）
+_TERM_RE = re.compile(r"[a-z0-9](?:[a-z0-9.+\-]*[a-z0-9+])?|[\u30a1-\u30faー]{2,}|[\u4e00-\u9fff々]{2,}")
+
+
+def normalize_title(title: str) -> str:
+    """全角半角・大文字小文字・記号・空白・媒体名の違いを吸収する"""
+    title = unicodedata.normalize("NFKC", title)
+    title = _SOURCE_SUFFIX_RE.sub("", title)
+    return _NOISE_RE.sub("", title.lower())
+
+
+def _plain_title(title: str) -> str:
+    return _SOURCE_SUFFIX_RE.sub("", unicodedata.normalize("NFKC", title)).lower()
+
+
+def key_terms(title: str) -> set:
+    """固有名詞・数値・内容語の手がかりになる語の集合"""
+    return set(_TERM_RE.findall(_plain_title(title)))
+
+
+def same_story(a: str, b: str) -> bool:
+    """bigramの似ている2つのタイトルが同じニュースか（数値が食い違えば別。語の少ない方の語が半分以上他方にあれば同じ）"""
+    text_a, text_b = _plain_title(a), _plain_title(b)
+    terms_a, terms_b = key_terms(a), key_terms(b)
+    missing_a = {t for t in terms_a if t not in text_b}
+    missing_b = {t for t in terms_b if t not in text_a}
+    if not missing_a or not missing_b:
+        return True
+    if any(c.isdigit() for t in missing_a for c in t) and any(c.isdigit() for t in missing_b for c in t):
+        return False
+    terms, missing = min((terms_a, missing_a), (terms_b, missing_b), key=lambda tm: len(tm[0]))
+    if len(terms) <= STRICT_TERMS:
+        return False
+    return (len(terms) - len(missing)) / len(terms) >= TERM_OVERLAP
+
+
+def shingles(title: str) -> set:
+    norm = normalize_title(title)
+    if len(norm) <= SHINGLE_SIZE:
+        return {norm} if norm else set()
+    return {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: set) -> list:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMS]
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NewsIndex:
+    """既出タイトルのMinHash-LSHインデックス"""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self.entries = []     # [{"title": str, "sig": [int, ...]}]
+        self.buckets = {}     # (バンド番号, 署名の一部) -> [エントリ番号]
+        self.norms = set()    # 登録済みタイトルの正規化結果（完全一致の重複登録を防ぐ）
+        self.lock = threading.Lock()
+        self._load()
+
+    # ----- 永続化 -----
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._seed()
+            return
+        if data.get("version") != INDEX_VERSION or data.get("num_perm") != NUM_PERM:
+            # パラメータが変わった場合は保存済みのタイトルから署名を作り直す
+            for e in data.get("entries", []):
+                self._insert(e["title"], minhash(shingles(e["title"])))
+            return
+        for e in data["entries"]:
+            self._insert(e["title"], e["sig"])
+
+    def _seed(self):
+        """インデックスが無い場合は used_news.json と記事一覧の全タイトルから作る"""
+        titles = []
+        used_file = BASE_DIR / "used_news.json"
+        if used_file.exists():
+            titles += json.loads(used_file.read_text(encoding="utf-8"))
+        try:
+            from site_index import index_entries
+            titles += [e["title"] for e in index_entries()]
+        except (OSError, json.JSONDecodeError):
+            pass
+        self.add(*titles)
+
+    def save(self):
+        with self.lock:
+            data = {"version": INDEX_VERSION, "num_perm": NUM_PERM, "entries": self.entries}
+            tmp = self.path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    # ----- 索引 -----
+    def _insert(self, title: str, sig: list):
+        idx = len(self.entries)
+        self.entries.append({"title": title, "sig": sig})
+        self.norms.add(normalize_title(title))
+        for band in range(BANDS):
+            key = (band, tuple(sig[band * ROWS:(band + 1) * ROWS]))
+            self.buckets.setdefault(key, []).append(idx)
+
+    def _similar(self, title: str) -> list:
+        """LSHで同じバケットに入った既出タイトルを [(タイトル, 類似度)] で類似度の高い順に返す"""
+        sh = shingles(title)
+        sig = minhash(sh)
+        with self.lock:
+            candidates = set()
+            for band in range(BANDS):
+                candidates.update(self.buckets.get((band, tuple(sig[band * ROWS:(band + 1) * ROWS])), ()))
+            others = [self.entries[idx]["title"] for idx in candidates]
+        return sorted(((other, jaccard(sh, shingles(other))) for other in others), key=lambda m: m[1], reverse=True)
+
+    def nearest(self, title: str):
+        """LSHで同じバケットに入った既出タイトルのうち最も似ているものを (タイトル, 類似度) で返す。無ければ None"""
+        similar = self._similar(title)
+        return similar[0] if similar else None
+
+    def find(self, title: str):
+        """同じニュースと確かめられた既出タイトルのうち最も似ているものを (タイトル, 類似度) で返す。無ければ None"""
+        for other, score in self._similar(title):
+            if score < THRESHOLD:
+                break
+            if same_story(title, other):
+                return other, score
+        return None
+
+    def is_duplicate(self, title: str) -> bool:
+        return self.find(title) is not None
+
+    def add(self, *titles: str):
+        """タイトルを既出として登録する（完全に同じ正規化結果のものは登録しない）"""
+        with self.lock:
+            for title in titles:
+                if title and normalize_title(title) not in self.norms:
+                    self._insert(title, minhash(shingles(title)))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> NewsIndex:
+    """プロセス内で共有するインデックス（初回だけ読み込む）"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NewsIndex()
+        return _index
+
+
+def filter_new(candidates: list, key: str = "title") -> list:
+    """既出ニュースと似ている候補、および候補同士で同じニュースの別媒体版を除いて返す（除いた候補はログに出す）"""
+    index = get_index()
+    fresh = []
+    accepted = []  # 採用済み候補のシングル（候補は高々数十件なので線形に比べる）
+    for c in candidates:
+        sh = shingles(c[key])
+        match = index.find(c[key])
+        if match is None:
+            for other, other_sh in accepted:
+                score = jaccard(sh, other_sh)
+                if score >= THRESHOLD and same_story(c[key], other):
+                    match = (other, score)
+                    break
+        if match:
+            print(f"   ♻️ 既出のため除外: {c[key]}（≒ {match[0]} / {match[1]:.2f}）")
+            continue
+        near = index.nearest(c[key])
+        if near is not None and near[1] >= THRESHOLD:
+            # 似ているが語が食い違う（別のニュース）。誤判定を後から確かめられるようにログに残す
+            print(f"   🔎 似ているが別のニュースとして残す: {c[key]}（≒ {near[0]} / {near[1]:.2f}）")
+        fresh.append(c)
+        accepted.append((c[key], sh))
+    return fresh
+
+
+if __name__ == "__main__":
+    import sys
+    index = get_index()
+    print(f"📚 既出タイトル: {len(index.entries)}件 / バケット: {len(index.buckets)}")
+    for t in sys.argv[1:]:
+        print(f"  {t} → {index.find(t)}")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+The Jury - ニュースフィード取り込み
+feeds.json に並べたRSS/Atomフィードを並列に取得し、候補ニュースの「プール」に蓄積する
+
+- ETag / Last-Modified を保存して条件付きGETを送る（304なら本文は転送されず、前回の候補はプールにある）
+- フィードは iterparse で逐次解析し、処理済みの要素はすぐ捨てる
+- URLを正規化（utm_* などの計測パラメータ・フラグメントを除去）して同じ記事をまとめる
+- プールは .cache/feeds/pool.json に保存し、最初に見つけてから POOL_MAX_AGE を過ぎた候補は捨てる
+  （1回の取得に失敗しても直近に集めた候補から選べる）
+"""
+import datetime
+import email.utils
+import html
+import io
+import json
+import os
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import gemini_cache
+import http_client
+
+BASE_DIR = Path(__file__).parent
+FEEDS_PATH = Path(os.environ.get("NEWS_FEEDS", BASE_DIR / "feeds.json"))
+FEED_CACHE_DIR = BASE_DIR / ".cache" / "feeds"
+STATE_PATH = FEED_CACHE_DIR / "state.json"
+POOL_PATH = FEED_CACHE_DIR / "pool.json"
+
+MAX_ITEMS_PER_FEED = 30            # 1フィードから取り込む最大件数
+POOL_MAX_AGE = 3 * 24 * 3600       # 秒。最初に見つけてからこれを過ぎた候補はプールから捨てる
+POOL_MAX_SIZE = 300
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_KEYS = {"fbclid", "gclid", "ref", "oc"}
+
+_lock = threading.Lock()
+
+
+def load_feeds() -> list:
+    """[{"name", "url", "weight"}]"""
+    return json.loads(FEEDS_PATH.read_text(encoding="utf-8"))
+
+
+def _read_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ===== 正規化 =====
+def canonical_url(url: str) -> str:
+    """同じ記事のURL表記ゆれ（スキーム・ホストの大文字・計測パラメータ・末尾スラッシュ・フラグメント）をそろえる"""
+    parts = urllib.parse.urlsplit(url.strip())
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(_TRACKING_PREFIXES) and k.lower() not in _TRACKING_KEYS]
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                                    parts.netloc.lower(), path, urllib.parse.urlencode(query), ""))
+
+
+def _parse_date(text: str) -> float:
+    """RSSの pubDate（RFC 822）とAtomの日時（ISO 8601）をUNIX時刻にする。読めなければ None"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        dt = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+# ===== 解析 =====
+def parse_feed(content: bytes, feed: dict) -> list:
+    """RSS 2.0 / Atom を iterparse で逐次解析して候補のリストを返す"""
+    items = []
+    for _, el in ET.iterparse(io.BytesIO(content), events=("end",)):
+        if el.tag == "item":
+            source_el = el.find("source")
+            link = el.findtext("link", "").strip()
+            pub = el.findtext("pubDate", "")
+            source = source_el.text if source_el is not None and source_el.text else feed["name"]
+            source_url = source_el.get("url", "") if source_el is not None else ""
+        elif el.tag == f"{_ATOM}entry":
+            link_el = el.find(f"{_ATOM}link[@rel='alternate']")
+            if link_el is None:
+                link_el = el.find(f"{_ATOM}link")
+            link = link_el.get("href", "").strip() if link_el is not None else ""
+            pub = el.findtext(f"{_ATOM}published") or el.findtext(f"{_ATOM}updated") or ""
+            source, source_url = feed["name"], ""
+        else:
+            continue
+        title = html.unescape(el.findtext("title") or el.findtext(f"{_ATOM}title") or "").strip()
+        el.clear()  # 解析済みの要素は保持しない
+        if not title or not link:
+            continue
+        items.append({
+            "title": title,
+            "link": link,
+            "pub": pub.strip(),
+            "published": _parse_date(pub),
+            "source": source,
+            "source_url": source_url,
+            "feed": feed["name"],
+            "url": canonical_url(link),
+        })
+        if len(items) >= MAX_ITEMS_PER_FEED:
+            break
+    return items
+
+
+# ===== 取得 =====
+def fetch_feed(feed: dict, state: dict) -> tuple:
+    """1フィードを条件付きGETで取得して (候補リスト, 新しい状態, 未更新なら True) を返す"""
+    prev = state.get(feed["url"], {})
+    headers = {}
+    if prev.get("etag"):
+        headers["If-None-Match"] = prev["etag"]
+    if prev.get("last_modified"):
+        headers["If-Modified-Since"] = prev["last_modified"]
+    resp = http_client.get(feed["url"], headers=headers, endpoint="rss")
+    if resp.status == http_client.NOT_MODIFIED:
+        return [], prev, True  # 前回の候補はプールに入っている
+    new_state = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "fetched": time.time(),
+    }
+    return parse_feed(resp.body, feed), new_state, False
+
+
+def refresh_pool(feeds: list = None) -> list:
+    """
+    全フィードを並列に取得してプールに取り込み、プールの候補を新しい順に返す
+    取得に失敗したフィードは前回までの候補をそのまま使う
+    """
+    feeds = feeds if feeds is not None else load_feeds()
+    with _lock:
+        pool = {c["url"]: c for c in _read_json(POOL_PATH, [])}
+        # プールが失われていたら条件付きGETはしない（304では中身が返らないため）
+        state = _read_json(STATE_PATH, {}) if pool else {}
+
+        def fetch(feed):
+            try:
+                return feed, fetch_feed(feed, state), None
+            except gemini_cache.CacheMiss:
+                raise  # リプレイ中のキャッシュ切れは取得の失敗として扱わない
+            except Exception as e:  # 1フィードの失敗で全体を止めない
+                return feed, None, e
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(feeds))) as executor:
+            results = list(executor.map(fetch, feeds))
+
+        now = time.time()
+        for feed, result, error in results:
+            if error is not None:
+                print(f"⚠️ フィード取得失敗 [{feed['name']}]: {error}")
+                continue
+            items, new_state, not_modified = result
+            state[feed["url"]] = new_state
+            added = 0
+            for item in items:
+                if item["url"] not in pool:
+                    pool[item["url"]] = {**item, "first_seen": now}
+                    added += 1
+            status = "未更新（304）" if not_modified else f"{len(items)}件"
+            print(f"   📰 [{feed['name']}] {status} / 新規 {added}件")
+
+        # 最初に見つけてから POOL_MAX_AGE を過ぎた候補を捨て、公開日時の新しい順に上限まで残す
+        fresh = [c for c in pool.values() if now - c.get("first_seen", 0) <= POOL_MAX_AGE]
+        fresh.sort(key=lambda c: c.get("published") or c.get("first_seen", 0), reverse=True)
+        fresh = fresh[:POOL_MAX_SIZE]
+        _write_json(STATE_PATH, state)
+        _write_json(POOL_PATH, fresh)
+        print(f"✅ フィード取得完了: {len(feeds)}件を {time.perf_counter() - started:.1f}s で並列取得 / プール {len(fresh)}件")
+        return fresh
+
+
+if __name__ == "__main__":
+    for c in refresh_pool()[:20]:
+        print(f"  [{c['feed']}] {c['title']} ({c['pub'][:16]})")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+The Jury - ニュース候補のローカル事前ランキング
+Geminiに選抜させる前に、候補を手元のヒューリスティックで採点して上位 TOP_K 件だけを渡す
+
+  新しさ        公開日時からの経過時間（半減期 RECENCY_HALF_LIFE）
+  媒体の重み    feeds.json の weight × SOURCE_WEIGHTS（媒体名の部分一致）
+  議論性        賛否が分かれやすいキーワードの出現
+  目新しさ      既出ニュース（news_dedup のインデックス）との類似度の低さ
+
+スコア = (新しさ×0.4 + 議論性×0.3 + 目新しさ×0.3) × 媒体の重み
+"""
+import os
+import time
+
+import news_dedup
+import news_feeds
+
+TOP_K = int(os.environ.get("NEWS_TOP_K", 8))
+RECENCY_HALF_LIFE = 24 * 3600  # 秒
+
+WEIGHTS = {"recency": 0.4, "controversy": 0.3, "novelty": 0.3}
+
+# 媒体名（RSSの source）に含まれる文字列 → 重み
+SOURCE_WEIGHTS = {
+    "日本経済新聞": 1.2,
+    "日経": 1.2,
+    "ITmedia": 1.2,
+    "Publickey": 1.1,
+    "ZDNET": 1.1,
+    "Impress": 1.1,
+    "CNET": 1.1,
+    "NHK": 1.1,
+    "PR TIMES": 0.6,
+    "プレスリリース": 0.6,
+}
+
+# 賛否が分かれやすい話題のキーワード → 加点（合計は1.0で頭打ち）
+CONTROVERSY_KEYWORDS = {
+    "規制": 0.35, "法案": 0.3, "著作権": 0.35, "訴訟": 0.4, "提訴": 0.4, "違法": 0.35,
+    "禁止": 0.3, "反発": 0.3, "批判": 0.3, "懸念": 0.25, "炎上": 0.4, "論争": 0.35,
+    "雇用": 0.25, "失業": 0.35, "解雇": 0.35, "リストラ": 0.35, "代替": 0.2,
+    "漏洩": 0.3, "流出": 0.3, "脆弱性": 0.25, "セキュリティ": 0.2, "ハルシネーション": 0.25,
+    "倫理": 0.25, "偽情報": 0.3, "ディープフェイク": 0.35, "独占": 0.3, "買収": 0.25,
+    "巨額": 0.2, "撤退": 0.25, "苦戦": 0.2, "限界": 0.25, "中国": 0.15, "米国": 0.1,
+    "openai": 0.15, "google": 0.1, "anthropic": 0.1, "meta": 0.1, "nvidia": 0.1,
+}
+
+
+def recency_score(candidate: dict, now: float) -> float:
+    published = candidate.get("published") or candidate.get("first_seen")
+    if not published:
+        return 0.3  # 日時が分からない候補は中程度として扱う
+    age = max(0.0, now - published)
+    return 0.5 ** (age / RECENCY_HALF_LIFE)
+
+
+def source_weight(candidate: dict, feed_weights: dict) -> float:
+    weight = feed_weights.get(candidate.get("feed"), 1.0)
+    source = candidate.get("source", "")
+    for name, w in SOURCE_WEIGHTS.items():
+        if name.lower() in source.lower():
+            weight *= w
+            break
+    return weight
+
+
+def controversy_score(candidate: dict) -> tuple:
+    """(スコア, 一致したキーワード)"""
+    title = candidate["title"].lower()
+    hits = [kw for kw in CONTROVERSY_KEYWORDS if kw in title]
+    return min(1.0, sum(CONTROVERSY_KEYWORDS[kw] for kw in hits)), hits
+
+
+def novelty_score(candidate: dict, index) -> float:
+    nearest = index.nearest(candidate["title"])
+    return 1.0 - (nearest[1] if nearest else 0.0)
+
+
+def rank_candidates(candidates: list, now: float = None) -> list:
+    """候補を採点して高い順に並べ、各候補に "rank_score" と内訳 "rank_detail" を付けて返す"""
+    now = now or time.time()
+    try:
+        feed_weights = {f["name"]: f.get("weight", 1.0) for f in news_feeds.load_feeds()}
+    except (OSError, ValueError):
+        feed_weights = {}
+    index = news_dedup.get_index()
+    ranked = []
+    for c in candidates:
+        controversy, keywords = controversy_score(c)
+        detail = {
+            "recency": round(recency_score(c, now), 3),
+            "controversy": round(controversy, 3),
+            "novelty": round(novelty_score(c, index), 3),
+            "source_weight": round(source_weight(c, feed_weights), 3),
+            "keywords": keywords,
+        }
+        score = sum(WEIGHTS[k] * detail[k] for k in WEIGHTS) * detail["source_weight"]
+        ranked.append({**c, "rank_score": round(score, 4), "rank_detail": detail})
+    ranked.sort(key=lambda c: c["rank_score"], reverse=True)
+    return ranked
+
+
+def log_ranking(ranked: list, top_k: int = TOP_K):
+    """上位の採点結果をログに出す（なぜその候補がGeminiに渡ったかを後から確認できるように）"""
+    print(f"📊 候補ランキング（{len(ranked)}件中 上位{min(top_k, len(ranked))}件をGeminiに渡す）")
+    print("    #  スコア  新しさ 議論性 目新しさ 媒体  タイトル")
+    for i, c in enumerate(ranked[:top_k], 1):
+        d = c["rank_detail"]
+        kw = f"  [{', '.join(d['keywords'])}]" if d["keywords"] else ""
+        print(f"   {i:>2}  {c['rank_score']:.3f}  {d['recency']:.2f}   {d['controversy']:.2f}   "
+              f"{d['novelty']:.2f}     {d['source_weight']:.2f}  [{c['source']}] {c['title'][:40]}{kw}")
+
+
+def top_candidates(candidates: list, top_k: int = TOP_K) -> list:
+    """採点して上位 top_k 件を返し、ランキングをログに出す"""
+    ranked = rank_candidates(candidates)
+    log_ranking(ranked, top_k)
+    return ranked[:top_k]
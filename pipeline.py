@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+The Jury - パイプラインスケジューラ
+ステージ間の依存関係に従い、互いに独立したステージ（LLM呼び出しなど）をスレッドプールで並列実行する
+チェックポイント用ディレクトリを渡すと各ステージの結果をJSONで保存し、再実行時は完了済みステージを読み込んで再開する
+（ファイルを書き出すステージは always_run に指定して毎回実行する）
+"""
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+# チェックポイントの形式が変わったら上げる（古い成果物は読み込まずに再実行する）
+ARTIFACT_VERSION = 1
+
+_local = threading.local()
+_stage_log = []   # このプロセスで実行・再開したステージの記録
+_stage_log_lock = threading.Lock()
+
+
+def current_stage() -> str:
+    """実行中のステージ名（ステージ外から呼ばれた場合は "main"）"""
+    return getattr(_local, "stage", "main")
+
+
+def stage_log() -> list:
+    """このプロセスで実行したステージの [{"stage", "seconds", "resumed"}, ...]（実行順）"""
+    with _stage_log_lock:
+        return list(_stage_log)
+
+
+def _log_stage(name: str, seconds: float, resumed: bool):
+    with _stage_log_lock:
+        _stage_log.append({"stage": name, "seconds": seconds, "resumed": resumed})
+
+
+def load_artifact(checkpoint_dir: Path, name: str):
+    """完了済みステージの成果物を (True, データ) で返す。無い・形式が古い場合は (False, None)"""
+    path = checkpoint_dir / f"{name}.json"
+    try:
+        artifact = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False, None
+    if artifact.get("version") != ARTIFACT_VERSION or artifact.get("stage") != name:
+        return False, None
+    return True, artifact["data"]
+
+
+def save_artifact(checkpoint_dir: Path, name: str, data):
+    """ステージの結果をバージョン付きJSONとして書き出す（書き込み途中で落ちても壊れないよう置き換えで保存）"""
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "stage": name,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "data": data,
+    }
+    path = checkpoint_dir / f"{name}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(artifact, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_stages(stages: list, max_workers: int = 4, checkpoint_dir: Path = None, always_run=()) -> dict:
+    """
+    stages: [(名前, 関数, [依存ステージ名, ...]), ...]
+    各関数は依存ステージの結果を依存リストの順に引数として受け取る
+    全ステージの結果を {名前: 結果} で返す。いずれかが失敗したら未着手のステージは実行せずに例外を再送出する
+    checkpoint_dir を指定すると完了したステージの結果を保存し、保存済みのステージは実行せずに読み込む
+    （その場合、ステージの結果はJSONにできる値であること）
+    always_run: 作業ツリーにファイルを書き出すステージなど、チェックポイントを使わず毎回実行するステージ名
+    （成果物のファイルは再実行の環境に残っているとは限らない。これらに依存するステージも読み込まない）
+    """
+    deps = {name: list(requires) for name, _, requires in stages}
+    funcs = {name: func for name, func, _ in stages}
+    for name, requires in deps.items():
+        unknown = [r for r in requires if r not in funcs]
+        if unknown:
+            raise ValueError(f"ステージ {name} の依存先が未定義です: {unknown}")
+
+    results = {}
+    timings = {}
+    started = time.perf_counter()
+
+    if checkpoint_dir is not None:
+        # 依存先がすべて完了済みのステージだけ読み込む（上流をやり直すなら下流もやり直す）
+        loaded = True
+        while loaded:
+            loaded = False
+            for name, requires in deps.items():
+                if name in results or name in always_run or not all(r in results for r in requires):
+                    continue
+                done, data = load_artifact(checkpoint_dir, name)
+                if done:
+                    results[name] = data
+                    loaded = True
+                    _log_stage(name, 0.0, True)
+                    print(f"⏭️  [{name}] チェックポイントから再開")
+
+    def _timed(name, args):
+        t0 = time.perf_counter()
+        print(f"▶️  [{name}] 開始")
+        _local.stage = name
+        try:
+            result = funcs[name](*args)
+            if checkpoint_dir is not None and name not in always_run:
+                save_artifact(checkpoint_dir, name, result)
+            return result
+        finally:
+            _local.stage = "main"
+            timings[name] = time.perf_counter() - t0
+            _log_stage(name, timings[name], False)
+            print(f"⏱️  [{name}] {timings[name]:.1f}s")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        pending = {n: req for n, req in deps.items() if n not in results}
+        while pending or running:
+            ready = [n for n, req in pending.items() if all(r in results for r in req)]
+            for name in ready:
+                del pending[name]
+                args = [results[r] for r in deps[name]]
+                running[pool.submit(_timed, name, args)] = name
+            if not running:
+                raise ValueError(f"依存関係が循環しています: {sorted(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException:
+                    for f in running:
+                        f.cancel()
+                    raise
+
+    total = time.perf_counter() - started
+    serial = sum(timings.values())
+    print(f"\n⏱️  ステージ合計 {serial:.1f}s → 実時間 {total:.1f}s（並列化で {max(0.0, serial - total):.1f}s 短縮）")
+    return results
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+The Jury - プロンプト構築
+キャラクター設定と座談会のルールは全記事で共通なので、記事ごとのプロンプトには載せず
+Gemini の systemInstruction（SHARED_SYSTEM）として送る。記事ごとのプロンプトはニュース・レビュー抜粋・
+出力形式など、その回にしか無い部分だけにする
+
+PromptBuilder はプロンプトを見出し付きのセクションで組み立て、セクションごとの推定トークン数をログに出す
+（推定は文字種からの目安。実際のトークン数は llm_metrics の記録（usageMetadata）を見る）
+"""
+import math
+
+# (ID, 名前, 読み, 座談会での位置, 設定, レビューの視点)
+CHARACTERS = [
+    ("ishibashi", "石橋 叩", "いしばし たたく", "left",
+     "守旧派PM/50代。「昔はよかった」が口癖。新技術に懐疑的だが、現場視点では一理ある意見を言う。", "辛口"),
+    ("zero", "コード・ゼロ", "", "right",
+     "天才ハッカー/20代。技術オタク。「技術は止まらない」。石橋を老害と思っている。", "技術的"),
+    ("kokuji", "黒字 策", "くろじ はかる", "right",
+     "冷徹コンサル/30代。「金になるか？」が判断基準。市場・ROI視点。", "ビジネス視点"),
+    ("packet", "パケット守", "ぱけっと まもる", "left",
+     "NW職人/40代。インフラ・現場実装の観点。「インフラが死んだら全部終わり」。", "インフラ視点"),
+    ("pure", "ピュア", "", "right",
+     "新人社員/20代女性。直感的に反応。「怖い」「便利そう」。読者の素朴な疑問を代弁。", "素朴な疑問"),
+    ("kitsu", "規律 正", "きりつ ただし", "left",
+     "コンプラ担当/40代。法的リスクに敏感。「著作権」「情報漏洩」「GDPR/AI Act」。", "法的視点"),
+]
+CHAR_NAMES = {cid: name for cid, name, *_ in CHARACTERS}
+
+# 非ASCII文字（日本語）1文字あたりのトークン数の目安。ASCIIは4文字で1トークンとみなす
+NON_ASCII_TOKENS_PER_CHAR = 0.7
+
+
+def estimate_tokens(text: str) -> int:
+    """文字種からトークン数を概算する（APIを呼ばずにセクションの大きさを比べるための目安）"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) * NON_ASCII_TOKENS_PER_CHAR)
+
+
+class PromptBuilder:
+    """セクション単位でプロンプトを組み立てる
+    各セクションは「【見出し】」で始まる（heading に文字列を渡すとそれを見出しに、False なら見出しなし）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sections = []  # [(ラベル, 本文)]
+
+    def add(self, label: str, text: str, heading=True) -> "PromptBuilder":
+        text = text.strip()
+        if heading:
+            text = f"【{label if heading is True else heading}】\n{text}"
+        self.sections.append((label, text))
+        return self
+
+    def text(self) -> str:
+        return "\n\n".join(text for _, text in self.sections)
+
+    def sizes(self) -> list:
+        """[(ラベル, 推定トークン数)]"""
+        return [(label, estimate_tokens(text)) for label, text in self.sections]
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.text())
+
+
+def log_sizes(prompt: PromptBuilder, system: PromptBuilder = None):
+    """プロンプトのセクション別の推定トークン数を1行で出す（system は共有部分として別に表示）"""
+    parts = " + ".join(f"{label} {tokens:,}" for label, tokens in prompt.sizes())
+    shared = f" / 共有system {system.tokens():,}" if system is not None else ""
+    print(f"   🧮 プロンプト[{prompt.name}] {parts} = {prompt.tokens():,}tok{shared}（推定）")
+
+
+# ===== 共有のシステム指示（キャラクター・バイブル） =====
+def _character_lines() -> str:
+    lines = []
+    for i, (cid, name, reading, side, profile, _) in enumerate(CHARACTERS, 1):
+        label = f"{name}（{reading}）" if reading else name
+        lines.append(f"{i}. {label} [ID: {cid} / 座談会: {side}]: {profile}")
+    return "\n".join(lines)
+
+
+def _review_style_lines() -> str:
+    styles = "、".join(f"{name}は{focus}" for _, name, _, _, _, focus in CHARACTERS)
+    return f"""
+- 各キャラクターのレビューは350〜400文字、口語体
+- {styles}
+- スコアは1〜10の整数で、そのキャラクターの立場からの評価にする
+"""
+
+
+SHARED_SYSTEM = (
+    PromptBuilder("system")
+    .add("役割", """
+あなたは「The Jury」というAIニュースレビューブログの編集AIです。
+下記の6名のキャラクターを演じ分けて、AIニュースのレビューと座談会を書きます。
+JSON形式での回答を指示された場合は、JSONのみを返してください。
+""", heading=False)
+    .add("キャラクター設定", _character_lines())
+    .add("レビューの書き方", _review_style_lines())
+    .add("座談会のルール", """
+- 16ターン以上
+- 各キャラクターがレビューで表明した立場を座談会でも必ず引き継ぐこと（レビューと矛盾しない）
+- 意見の対立構造を作ること（特に「石橋 vs ゼロ」「黒字 vs 規律」）
+- 石橋（老害）の意見は一見理不尽だが現場視点では一理ある内容にすること
+- 最後はコンサル（黒字）かハッカー（ゼロ）が未来への示唆で強引に締めること
+- 口語体で感情的に
+- 各発言の位置はキャラクター設定の「座談会」の値（left / right）に従う
+""")
+)
+
+
+# ===== 記事ごとのプロンプト =====
+def reviews_prompt(news: dict) -> PromptBuilder:
+    return (
+        PromptBuilder("reviews")
+        .add("指示", "以下のAIニュースについて、6名のキャラクターそれぞれの視点でレビューを生成してください。", heading=False)
+        .add("ニュース", f"タイトル: {news['title']}\n要約: {' '.join(news['summary_items'])}")
+        .add("出力形式", """
+以下のJSON形式のみで回答してください：
+{"scores": {"ishibashi": 点数, "zero": 点数, "kokuji": 点数, "packet": 点数, "pure": 点数, "kitsu": 点数},
+ "reviews": {"ishibashi": "レビュー", "zero": "レビュー", "kokuji": "レビュー", "packet": "レビュー", "pure": "レビュー", "kitsu": "レビュー"}}
+""")
+    )
+
+
+def stance_summary(reviews: dict, excerpt_chars: int = 100) -> str:
+    """各キャラクターのスコアとレビュー冒頭（座談会で立場を引き継がせるための要約）"""
+    scores = reviews.get("scores", {})
+    review_texts = reviews.get("reviews", {})
+    lines = []
+    for cid, name, *_ in CHARACTERS:
+        review = review_texts.get(cid, "").replace("\n", "")
+        summary = review[:excerpt_chars] + "…" if len(review) > excerpt_chars else review
+        lines.append(f"- {name}（スコア{scores.get(cid, '?')}/10）: {summary}")
+    return "\n".join(lines)
+
+
+def roundtable_prompt(news: dict, reviews: dict) -> PromptBuilder:
+    return (
+        PromptBuilder("roundtable")
+        .add("指示", "以下のニュースについて、6名による激論座談会（チャット形式）と格言を生成してください。", heading=False)
+        .add("ニュース", news["title"])
+        .add("立場", stance_summary(reviews),
+             heading="各キャラクターがレビューで表明した立場（必ずこの姿勢を座談会でも一貫させること）")
+        .add("出力形式", """
+JSON形式のみで回答：
+{"chat_log": [["キャラID", "left または right", "発言内容"], ...],
+ "quote": "本日の格言（読者の行動を促す一言、HTMLの<br>タグ使用可）"}
+""")
+    )
+
+
+# ===== 構造化生成モード（1回の呼び出しで記事全体） =====
+SECTION_GUIDES = {
+    "news": """
+- title: ニュースタイトル（日本語、30文字以内）
+- title_html: title のキーワードを <span class="highlight">…</span> で強調したもの
+- hero_lead: リード文（2〜3行、HTMLの<br>タグ使用可）
+- summary_items: 要点3つ（各1〜2文）
+- tags: [クラス, タグ名] を3つ（クラスは tag-hot / tag-tech / tag-biz などから選ぶ）
+- news_summary_short: Slack通知用の短い説明（50文字以内）
+""",
+    "overview": "- 読者が内容を十分に理解できるよう、ニュースの背景・詳細を3〜5文で説明する",
+    "reviews": "- 6名それぞれのスコアとレビュー（書き方はシステム指示のとおり）",
+    "roundtable": """
+- chat_log: 座談会の発言 [キャラID, "left" または "right", 発言内容] の配列（ルールはシステム指示のとおり）
+- 各キャラクターは reviews で書いた自分の立場を座談会でも引き継ぐこと
+- quote: 本日の格言（読者の行動を促す一言、HTMLの<br>タグ使用可）
+""",
+}
+
+
+def article_prompt(candidate: dict = None, sections: list = None, used_titles: list = None) -> PromptBuilder:
+    """
+    記事の各セクションを1回の呼び出しでまとめて生成するプロンプト（出力形式は responseSchema で指定する）
+    candidate が無い場合は、Gemini自身にニュースを1件選ばせる（used_titles は選ばせないタイトル）
+    """
+    sections = sections or list(SECTION_GUIDES)
+    prompt = PromptBuilder("article")
+    if candidate is not None:
+        prompt.add("指示", "以下のAIニュースについて、ブログ記事の各セクションを生成してください。", heading=False)
+        prompt.add("ニュース", f"[{candidate['source']}] {candidate['title']} ({candidate.get('pub', '')[:16]})")
+    else:
+        used = "\n".join(f"- {t}" for t in (used_titles or [])[-10:]) or "なし"
+        prompt.add("指示", """
+今日時点で最もホットなAI関連ニュースを1件選び、ブログ記事の各セクションを生成してください。
+条件：直近1週間以内、日本のエンジニア・パーソンマネージャーが関心を持つ話題、議論を呼ぶトピック。
+news には source_name（情報源メディア名）と source_url（情報源URL）も入れてください。
+""", heading=False)
+        prompt.add("使用済み", used, heading="下記は過去に使用済みなので選ばないでください")
+    prompt.add("各セクション", "\n".join(f"{name}:\n{SECTION_GUIDES[name].strip()}" for name in sections))
+    return prompt
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+The Jury - 記事レンダラー
+build_article.py（手動ビルド）と generate_article.py（自動生成）が共有する描画ライブラリ
+
+記事は1つの辞書（記事データ）で表し、article_store が articles/volXXX.json に保存する
+HTMLはいつでもこのJSONから再生成できる（Geminiを呼び直す必要はない）
+rebuild() は記事データかレンダリング条件（テンプレート・レンダラー・アイコン・出力ステージ）が変わった記事だけを書き直す
+書き出しは site_output を通す（縮小・共有スタイルシート・.gz / .br）
+レーダーチャートは svg_charts がSVGで描いてページに入れる（グラフのJSは使わない。OG画像のカードも svg_charts）
+座談会の残りは fragments/ に分けて書き出し、ページからは遅延読み込みする（lazy_sections）
+
+記事データのキー:
+  vol_num, article_id, publish_date, title, title_html, hero_lead, news_summary_short,
+  tags [[class, label], ...], scores {char: int}, reviews {char: str}, overview,
+  summary_items [str], chat_log [[char, side, text], ...], quote,
+  sources [[name, url], ...], radar [{name, color, data}, ...]
+"""
+import datetime
+import functools
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import article_store
+import lazy_sections
+import site_output
+import svg_charts
+from article_store import article_slug
+from icon_assets import build_icon_assets, icon_picture_html, rewrite_icon_tags
+from lazy_sections import CHAT_LEAD_TURNS, LAZY_JS_PATH, fragment_url, inject_lazy_sections
+from template_engine import load_template
+from votes import SUPABASE_ANON_KEY, SUPABASE_URL, VOTES_JS_PATH, article_votes, inject_vote_script
+
+BASE_DIR = Path(__file__).parent
+TEMPLATE_PATH = BASE_DIR / "template.html"
+
+# キャラクターID（テンプレートのスロット名・スコア・レビューの並び順）
+CHAR_IDS = ["ishibashi", "zero", "kokuji", "packet", "pure", "kitsu"]
+CHAR_NAMES = {
+    "ishibashi": "石橋 叩",
+    "zero": "コード・ゼロ",
+    "kokuji": "黒字 策",
+    "packet": "パケット守",
+    "pure": "ピュア",
+    "kitsu": "規律 正",
+}
+
+
+# ===== 記事データ =====
+def vol_label(vol_num: int) -> str:
+    return f"Vol.{vol_num:03d}"
+
+
+def make_article(vol_num: int, news: dict, overview: str, reviews: dict, roundtable: dict,
+                 publish_date: str = None) -> dict:
+    """自動生成の各ステージの結果を記事データにまとめる"""
+    return {
+        "vol_num": vol_num,
+        "article_id": article_slug(vol_num),
+        "publish_date": publish_date or datetime.date.today().strftime("%Y年%m月%d日"),
+        "title": news["title"],
+        "title_html": news.get("title_html", news["title"]),
+        "hero_lead": news.get("hero_lead", ""),
+        "news_summary_short": news.get("news_summary_short", ""),
+        "tags": [list(t) for t in news.get("tags", [])],
+        "scores": reviews["scores"],
+        "reviews": reviews["reviews"],
+        "overview": overview,
+        "summary_items": news.get("summary_items", []),
+        "chat_log": [list(t) for t in roundtable.get("chat_log", [])],
+        "quote": roundtable.get("quote", ""),
+        "sources": [[news.get("source_name", "参考記事"), news.get("source_url", "#")]],
+        "radar": reviews.get("radar", []),
+    }
+
+
+def total_score(scores: dict) -> float:
+    """6名のスコアの平均（小数1桁）"""
+    return round(sum(scores.values()) / len(scores), 1)
+
+
+# ===== テンプレート =====
+@functools.lru_cache(maxsize=None)
+def icon_manifest() -> dict:
+    """アイコンは表示サイズ別・形式別に最適化した共有ファイルを<picture>で参照する（Base64埋め込みはしない）"""
+    return build_icon_assets()
+
+
+def _preprocess_template(template: str) -> str:
+    return inject_lazy_sections(svg_charts.inline_charts(inject_vote_script(rewrite_icon_tags(template, icon_manifest()))))
+
+
+def load_render_context() -> tuple:
+    """解析済みテンプレートとアイコンマニフェストを返す（1プロセスにつき1回だけ準備し、全記事で共有する）"""
+    return load_template(TEMPLATE_PATH, preprocess=_preprocess_template), icon_manifest()
+
+
+# ===== HTMLパーツ =====
+def _pct(v) -> int:
+    return int(v / 10 * 100)
+
+
+def tags_html(tags: list) -> str:
+    return "\n    ".join(f'<span class="tag {cls}">{label}</span>' for cls, label in tags)
+
+
+def summary_html(items: list) -> str:
+    return "\n      ".join(f"<li>{item}</li>" for item in items)
+
+
+def chat_html(chat_log: list, manifest: dict) -> str:
+    parts = []
+    for char, side, text in chat_log:
+        name = CHAR_NAMES.get(char, char)
+        icon_html = icon_picture_html(manifest, char, name, "chat-icon")
+        parts.append(f"""      <div class="chat-msg {char} {side}">
+        {icon_html}
+        <div class="chat-bubble-wrap">
+          <span class="chat-name">{name}</span>
+          <div class="chat-bubble">{text}</div>
+        </div>
+      </div>""")
+    return "\n".join(parts)
+
+
+def radar_datasets(radar: list) -> list:
+    """Chart.js のレーダーチャート用データセット"""
+    return [{
+        "label": r["name"],
+        "data": r["data"],
+        "borderColor": r["color"],
+        "backgroundColor": r["color"] + "22",
+        "borderWidth": 2,
+        "pointBackgroundColor": r["color"],
+        "pointRadius": 3,
+    } for r in radar]
+
+
+def chart_data(article: dict) -> dict:
+    """svg_charts に渡すグラフのデータ（スコアバーの割合はテンプレートの SCORE_*_PCT と同じ）"""
+    scores = article["scores"]
+    return {
+        "title": article["title"],
+        "vol": vol_label(article["vol_num"]),
+        "total": total_score(scores),
+        "radar": article.get("radar", []),
+        "bars": [[cid, CHAR_NAMES[cid], scores.get(cid, 5), _pct(scores.get(cid, 5))] for cid in CHAR_IDS],
+    }
+
+
+def source_links_html(sources: list) -> str:
+    return " / ".join(
+        f'<a href="{url}" target="_blank" rel="noopener">{name}</a>' for name, url in sources
+    )
+
+
+# ===== レンダリング =====
+def template_values(article: dict, manifest: dict) -> dict:
+    """記事データからテンプレートに埋め込む値（スロット名: 値）を作る"""
+    scores = article["scores"]
+    reviews = article["reviews"]
+    chat_log = article.get("chat_log", [])
+    charts = svg_charts.article_charts(chart_data(article))
+    source_links = source_links_html(article.get("sources", []))
+    values = {
+        "ARTICLE_TITLE": article["title"],
+        "ARTICLE_TITLE_HTML": article.get("title_html", article["title"]),
+        "ARTICLE_ID": article["article_id"],
+        "VOL_NUMBER": vol_label(article["vol_num"]),
+        "PUBLISH_DATE": article["publish_date"],
+        "NEWS_SUMMARY_SHORT": article.get("news_summary_short", ""),
+        "HERO_LEAD": article.get("hero_lead", ""),
+        "TAGS_HTML": tags_html(article.get("tags", [])),
+        "TOTAL_SCORE": str(total_score(scores)),
+        "OVERVIEW": article.get("overview", ""),
+        "SUMMARY_ITEMS": summary_html(article.get("summary_items", [])),
+        "CHAT_LOG_HTML": chat_html(chat_log, manifest),
+        "RADAR_DATA_JSON": json.dumps(radar_datasets(article.get("radar", [])), ensure_ascii=False),
+        # SVGのグラフ（svg_charts がテンプレートのチャートを置き換えたときに使う）
+        "RADAR_SVG": charts["radar"],
+        "CHART_META": svg_charts.chart_meta_html(charts),
+        # 座談会の遅延読み込み（lazy_sections がテンプレートを書き換えたときに使う）
+        "CHAT_LOG_LEAD_HTML": chat_html(chat_log[:CHAT_LEAD_TURNS], manifest),
+        "CHAT_FRAGMENT_URL": fragment_url(article["article_id"], "chat"),
+        "QUOTE_TEXT": article.get("quote", ""),
+        "SOURCE_LINKS": source_links,
+        "SOURCE_BADGE": source_links,
+        "SUPABASE_URL": SUPABASE_URL,
+        "SUPABASE_ANON_KEY": SUPABASE_ANON_KEY,
+        # 書き出した時点の票数（ブラウザはこれを先に表示し、後から votes.json で更新する）
+        "VOTE_SNAPSHOT_JSON": json.dumps(article_votes(article["article_id"])).replace("</", "<\\/"),
+    }
+    for char in CHAR_IDS:
+        slot = char.upper()
+        score = scores.get(char, 5)
+        values[f"SCORE_{slot}"] = str(score)
+        values[f"SCORE_{slot}_PCT"] = str(_pct(score))
+        values[f"REVIEW_{slot}"] = reviews.get(char, "")
+    return values
+
+
+def render_article(article: dict) -> str:
+    """記事データからHTML文字列を生成する"""
+    template, manifest = load_render_context()
+    return template.render(template_values(article, manifest))
+
+
+def fragment_kinds() -> list:
+    """書き換えたテンプレートが遅延読み込みするセクション（"chat"）"""
+    template, _ = load_render_context()
+    return ["chat"] if "CHAT_FRAGMENT_URL" in template.names else []
+
+
+def article_fragments(article: dict) -> dict:
+    """ページから分けて遅延読み込みする中身 {"chat": 座談会の残りのHTML}"""
+    _, manifest = load_render_context()
+    return {kind: chat_html(article.get("chat_log", [])[CHAT_LEAD_TURNS:], manifest) for kind in fragment_kinds()}
+
+
+def render_signature() -> str:
+    """レンダリング条件のハッシュ
+    （テンプレート・このレンダラー・アイコンのURL・投票スクリプト・遅延読み込み・SVGのグラフ・Supabase設定・出力ステージ）
+    これが変わったら全記事の再ビルドが必要になる"""
+    _, manifest = load_render_context()
+    h = hashlib.sha256()
+    h.update(TEMPLATE_PATH.read_bytes())
+    h.update(Path(__file__).read_bytes())
+    h.update(json.dumps({name: entry["variants"] for name, entry in manifest.items()}, sort_keys=True).encode("utf-8"))
+    h.update(VOTES_JS_PATH.read_bytes())
+    h.update(LAZY_JS_PATH.read_bytes())
+    h.update(Path(lazy_sections.__file__).read_bytes())
+    h.update(svg_charts.signature().encode("utf-8"))
+    h.update(f"lazy={lazy_sections.LAZY_ENABLED}\n".encode("utf-8"))
+    h.update(site_output.signature().encode("utf-8"))
+    h.update(f"{SUPABASE_URL}\n{SUPABASE_ANON_KEY}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _card_is_fresh(article: dict) -> bool:
+    """OG画像のカードを作る環境（cairosvg あり）ならPNGが書き出し済みか"""
+    png = svg_charts.card_image_path(chart_data(article))
+    return png is None or png.exists()
+
+
+def _out_path(article: dict, out_dir: Path = None) -> Path:
+    return (out_dir or BASE_DIR) / f"{article_slug(article['vol_num'])}.html"
+
+
+def _write_page(article: dict, out_path: Path, report: site_output.SizeReport = None):
+    html = render_article(article)
+    page = site_output.optimize_page(html)
+    site_output.write_output(out_path, page, report, len(html.encode("utf-8")))
+    lazy_sections.write_fragments(out_path, article["article_id"], article_fragments(article), report, page)
+
+
+def write_article(article: dict, out_dir: Path = None) -> Path:
+    """記事HTMLを volXXX.html として書き出す
+    サイト本体（out_dir 未指定）に書き出した場合はビルドマニフェストに記録する"""
+    out_path = _out_path(article, out_dir)
+    report = site_output.SizeReport()
+    _write_page(article, out_path, report)
+    report.print("記事HTML")
+    if out_dir is None:
+        article_store.record_builds([(article, render_signature(), out_path)])
+    return out_path
+
+
+def rebuild(vol_nums: list = None, force: bool = False) -> tuple:
+    """
+    記事データから記事HTMLを再生成する（既定では保存済みの全記事が対象）
+    記事データのハッシュとレンダリング条件のハッシュがマニフェストと一致する記事は書き直さない
+    (書き直した記事番号のリスト, スキップした件数) を返す
+    """
+    started = time.perf_counter()
+    signature = render_signature()
+    manifest = article_store.load_build_manifest()
+    built, skipped = [], 0
+    report = site_output.SizeReport()
+    kinds = fragment_kinds()
+    for vol_num in (vol_nums if vol_nums is not None else article_store.list_articles()):
+        article = article_store.load_article(vol_num)
+        out_path = _out_path(article)
+        if (not force and article_store.is_fresh(manifest, article, signature, out_path)
+                and site_output.has_compressed(out_path)
+                and lazy_sections.has_fragments(out_path, article["article_id"], kinds)
+                and _card_is_fresh(article)):
+            skipped += 1
+            continue
+        _write_page(article, out_path, report)
+        built.append((article, signature, out_path))
+    if built:
+        article_store.record_builds(built)
+    print(f"🔁 再ビルド: {len(built)}件を書き出し / {skipped}件は変更なし（{time.perf_counter() - started:.2f}s）")
+    report.print("記事HTML")
+    return [a["vol_num"] for a, _, _ in built], skipped
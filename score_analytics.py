@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+The Jury - スコアの集計
+- レーダーチャートの値: 6名のスコア × 係数行列（キャラクター × 評価軸）を記事1本でも全記事でも1回の行列演算で求める
+- サイト全体の集計: 全記事のスコアからキャラクターごとの分布・推移・キャラクター間の相関を1回の走査で計算し、
+  ブラウザ側で再計算せずにそのままグラフにできる scores.json を書き出す
+
+numpy があれば numpy で、無ければ同じ計算を純Pythonで行う（結果は同じ）
+"""
+import json
+import math
+import re
+from pathlib import Path
+
+import article_store
+import site_output
+from article_schema import CHAR_IDS
+from prompts import CHAR_NAMES
+
+try:
+    import numpy as np
+except ImportError:  # numpyが無い環境では純Pythonで計算する
+    np = None
+
+BASE_DIR = Path(__file__).parent
+SCORES_JSON_PATH = BASE_DIR / "scores.json"
+
+RADAR_AXES = ["技術革新性", "ビジネス影響", "リスク度", "社会的影響", "現場実用性", "倫理・法的問題"]
+# 係数行列。行はキャラクター（CHAR_IDS の順）、列は RADAR_AXES。各キャラクターの視点でスコアを軸ごとに強弱づける
+RADAR_FACTORS = [
+    [0.6, 0.8, 1.2, 0.9, 1.1, 0.8],  # 石橋 叩
+    [1.3, 0.9, 0.7, 0.8, 1.1, 0.6],  # コード・ゼロ
+    [0.8, 1.3, 0.9, 0.9, 0.9, 0.7],  # 黒字 策
+    [1.0, 0.7, 1.1, 0.8, 1.3, 0.9],  # パケット守
+    [1.0, 1.0, 1.0, 1.1, 1.0, 0.9],  # ピュア
+    [0.7, 0.8, 1.3, 1.0, 0.8, 1.4],  # 規律 正
+]
+CHAR_COLORS = {
+    "ishibashi": "#a1887f",
+    "zero": "#00d4ff",
+    "kokuji": "#ffd166",
+    "packet": "#06d6a0",
+    "pure": "#c77dff",
+    "kitsu": "#4361ee",
+}
+DEFAULT_SCORE = 5       # スコアが欠けているキャラクターの扱い
+TREND_WINDOW = 5        # 推移の移動平均の幅（記事数）
+
+_DATE_RE = re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日")
+
+
+# ===== レーダーチャート =====
+def score_rows(score_dicts: list) -> list:
+    """[{キャラID: スコア}, ...] を CHAR_IDS の順に並べた行列（記事数 × 6）にする"""
+    return [[scores.get(cid, DEFAULT_SCORE) for cid in CHAR_IDS] for scores in score_dicts]
+
+
+def radar_values(rows: list) -> list:
+    """スコア行列（記事数 × キャラクター）からレーダー値（記事数 × キャラクター × 評価軸、1〜10の整数）を求める"""
+    if np is not None:
+        radar = np.rint(np.asarray(rows, dtype=float)[:, :, None] * np.asarray(RADAR_FACTORS)[None, :, :])
+        return np.clip(radar, 1, 10).astype(int).tolist()
+    return [[[min(10, max(1, round(score * f))) for f in factors] for score, factors in zip(row, RADAR_FACTORS)]
+            for row in rows]
+
+
+def radar_from_scores(scores: dict) -> list:
+    """記事1本分のレーダーチャート用データ [{"name", "color", "data"}]"""
+    values = radar_values(score_rows([scores]))[0]
+    return [{"name": CHAR_NAMES[cid], "color": CHAR_COLORS[cid], "data": data} for cid, data in zip(CHAR_IDS, values)]
+
+
+# ===== 集計（numpy / 純Python） =====
+def _columns_stats(rows: list) -> list:
+    """列ごとの (平均, 中央値, 標準偏差, 最小, 最大)"""
+    if np is not None:
+        m = np.asarray(rows, dtype=float)
+        return list(zip(m.mean(0).tolist(), np.median(m, 0).tolist(), m.std(0).tolist(),
+                        m.min(0).tolist(), m.max(0).tolist()))
+    stats = []
+    for col in zip(*rows):
+        n = len(col)
+        mean = sum(col) / n
+        ordered = sorted(col)
+        median = (ordered[(n - 1) // 2] + ordered[n // 2]) / 2
+        std = math.sqrt(sum((x - mean) ** 2 for x in col) / n)
+        stats.append((mean, median, std, min(col), max(col)))
+    return stats
+
+
+def _histograms(rows: list) -> list:
+    """列ごとの1〜10点の件数"""
+    if np is not None:
+        m = np.clip(np.rint(np.asarray(rows, dtype=float)), 1, 10).astype(int)
+        return [np.bincount(m[:, j], minlength=11)[1:].tolist() for j in range(m.shape[1])]
+    hists = []
+    for col in zip(*rows):
+        counts = [0] * 10
+        for x in col:
+            counts[min(10, max(1, round(x))) - 1] += 1
+        hists.append(counts)
+    return hists
+
+
+def _correlations(rows: list) -> list:
+    """列どうしのピアソン相関行列（ばらつきが無い列との相関は None）"""
+    k = len(rows[0])
+    if np is not None:
+        m = np.asarray(rows, dtype=float)
+        centered = m - m.mean(0)
+        norms = np.sqrt((centered ** 2).sum(0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (centered.T @ centered) / np.outer(norms, norms)
+        return [[None if not np.isfinite(corr[i, j]) else float(corr[i, j]) for j in range(k)] for i in range(k)]
+    cols = list(zip(*rows))
+    centered = [[x - sum(col) / len(col) for x in col] for col in cols]
+    norms = [math.sqrt(sum(x * x for x in col)) for col in centered]
+    return [[None if not (norms[i] and norms[j]) else sum(a * b for a, b in zip(centered[i], centered[j])) / (norms[i] * norms[j])
+             for j in range(k)] for i in range(k)]
+
+
+def _rolling_means(rows: list, window: int) -> list:
+    """行方向（記事の並び）の移動平均。先頭の window-1 件はそれまでの平均"""
+    if np is not None:
+        m = np.asarray(rows, dtype=float)
+        cum = np.vstack([np.zeros((1, m.shape[1])), np.cumsum(m, 0)])
+        idx = np.arange(1, len(m) + 1)
+        start = np.maximum(idx - window, 0)
+        return ((cum[idx] - cum[start]) / (idx - start)[:, None]).tolist()
+    out = []
+    for i in range(len(rows)):
+        chunk = rows[max(0, i + 1 - window):i + 1]
+        out.append([sum(col) / len(chunk) for col in zip(*chunk)])
+    return out
+
+
+def _column_means(rows: list) -> list:
+    if np is not None:
+        return np.asarray(rows, dtype=float).mean(0).tolist()
+    return [sum(col) / len(rows) for col in zip(*rows)]
+
+
+def _r(value, digits: int = 2):
+    return None if value is None else round(value, digits)
+
+
+def _date(publish_date: str) -> str:
+    m = _DATE_RE.search(publish_date or "")
+    return f"{int(m.group(1)):04d}-{int(m.group(2)):02d}-{int(m.group(3)):02d}" if m else None
+
+
+# ===== サイト全体の集計 =====
+def analyze(articles: list) -> dict:
+    """全記事のスコアをキャラクター別の分布・推移・相関・月別平均・平均レーダーにまとめる"""
+    articles = sorted(articles, key=lambda a: a["vol_num"])
+    result = {
+        "volumes": len(articles),
+        "characters": [{"id": cid, "name": CHAR_NAMES[cid], "color": CHAR_COLORS[cid]} for cid in CHAR_IDS],
+        "axes": RADAR_AXES,
+    }
+    if not articles:
+        return result
+    rows = score_rows([a["scores"] for a in articles])
+    radar = radar_values(rows)
+
+    stats = _columns_stats(rows)
+    hists = _histograms(rows)
+    result["distribution"] = {
+        cid: {"mean": _r(mean), "median": _r(median), "stdev": _r(std), "min": lo, "max": hi, "histogram": hist}
+        for cid, (mean, median, std, lo, hi), hist in zip(CHAR_IDS, stats, hists)
+    }
+    result["correlation"] = [[_r(v, 3) for v in row] for row in _correlations(rows)]
+
+    rolling = _rolling_means(rows, TREND_WINDOW)
+    totals = [sum(row) / len(row) for row in rows]
+    result["trend"] = {
+        "window": TREND_WINDOW,
+        "vol": [a["vol_num"] for a in articles],
+        "date": [_date(a.get("publish_date")) for a in articles],
+        "total": [_r(t, 1) for t in totals],
+        "scores": {cid: [row[j] for row in rows] for j, cid in enumerate(CHAR_IDS)},
+        "rolling": {cid: [_r(row[j]) for row in rolling] for j, cid in enumerate(CHAR_IDS)},
+    }
+
+    months = {}
+    for article, row in zip(articles, rows):
+        date = _date(article.get("publish_date"))
+        if date:
+            months.setdefault(date[:7], []).append(row)
+    result["monthly"] = {
+        month: {"count": len(month_rows), **{cid: _r(v) for cid, v in zip(CHAR_IDS, _column_means(month_rows))}}
+        for month, month_rows in sorted(months.items())
+    }
+
+    # 平均レーダー: (記事数 × キャラクター × 軸) をキャラクター × 軸ごとに平均する
+    flat = [[value for char in article_radar for value in char] for article_radar in radar]
+    means = _column_means(flat)
+    result["radar_mean"] = {
+        cid: [_r(v) for v in means[j * len(RADAR_AXES):(j + 1) * len(RADAR_AXES)]] for j, cid in enumerate(CHAR_IDS)
+    }
+    return result
+
+
+def build_scores_json(path: Path = SCORES_JSON_PATH) -> bool:
+    """全記事を集計して scores.json を書き出す。内容が変わらなければ書き出さずに False を返す"""
+    content = json.dumps(analyze(list(article_store.iter_articles())), ensure_ascii=False, indent=1) + "\n"
+    if path.exists() and path.read_text(encoding="utf-8") == content and site_output.has_compressed(path):
+        return False
+    site_output.write_output(path, content)
+    return True
+
+
+def print_report(analytics: dict):
+    """集計結果の要約をターミナルに出す"""
+    print(f"📊 スコア集計: {analytics['volumes']}記事（{'numpy' if np is not None else '純Python'}で計算）")
+    if not analytics["volumes"]:
+        return
+    print(f"   {'キャラクター':<10}{'平均':>6}{'中央値':>7}{'標準偏差':>8}{'最小':>5}{'最大':>5}  分布(1〜10)")
+    for char in analytics["characters"]:
+        d = analytics["distribution"][char["id"]]
+        print(f"   {char['name']:<10}{d['mean']:>6.2f}{d['median']:>7.1f}{d['stdev']:>8.2f}{d['min']:>5}{d['max']:>5}"
+              f"  {' '.join(str(c) for c in d['histogram'])}")
+    # 最も強い相関・逆相関の組
+    ids = [c["id"] for c in analytics["characters"]]
+    pairs = [(analytics["correlation"][i][j], ids[i], ids[j])
+             for i in range(len(ids)) for j in range(i + 1, len(ids)) if analytics["correlation"][i][j] is not None]
+    if pairs:
+        hi, lo = max(pairs), min(pairs)
+        print(f"   相関が最も強い組: {CHAR_NAMES[hi[1]]} × {CHAR_NAMES[hi[2]]}（{hi[0]:+.2f}）"
+              f" / 最も逆: {CHAR_NAMES[lo[1]]} × {CHAR_NAMES[lo[2]]}（{lo[0]:+.2f}）")
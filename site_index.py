@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+The Jury - 記事一覧ページの生成
+記事データストアから index.html とアーカイブを毎回まるごと生成する（既存HTMLの文字列置換はしない）
+
+  index.html              最新 PAGE_SIZE 件だけ（アーカイブが増えてもトップページの重さは一定）
+  archive/page-N.html     2ページ目以降（JavaScriptなしで辿れる）
+  archive/page-N.json     「もっと読む」でトップページに追記するカードHTMLと次ページのURL
+  archive/index.html      月別・タグ別アーカイブの一覧
+  archive/YYYY-MM.html    月別アーカイブ / archive/tag-xxxxxxxx.html  タグ別アーカイブ
+  feed.json               最新 FEED_SIZE 件の JSON Feed
+
+各カードの票数はトップページだけビルド時のスナップショット（votes.vote_snapshot）を埋め込み、
+どのページも表示後に votes.json で更新する（アーカイブページの内容は票数が動いても変わらない）
+
+内容が変わったファイルだけを書き出し、不要になったアーカイブページは削除する
+書き出しは site_output を通す（HTMLの縮小・共有スタイルシート・.gz / .br）
+"""
+import datetime
+import hashlib
+import html
+import json
+import re
+from pathlib import Path
+
+import article_store
+import site_output
+from article_store import article_slug
+from renderer import total_score
+from site_output import SITE_URL
+from template_engine import load_template
+from votes import VOTES_JSON_PATH, vote_snapshot
+
+BASE_DIR = Path(__file__).parent
+INDEX_TEMPLATE_PATH = BASE_DIR / "index_template.html"
+ARCHIVE_DIR = BASE_DIR / "archive"
+LEGACY_INDEX_PATH = article_store.ARTICLES_DIR / "legacy_index.json"
+
+PAGE_SIZE = 10   # 1ページあたりの記事カード数
+FEED_SIZE = 20   # feed.json に載せる記事数
+
+_DATE_RE = re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日")
+
+_LOAD_MORE_SCRIPT = """<script>
+  // 「もっと読む」: 次ページのカードをJSONで取得してトップページに追記する（JSなしではページ送りのリンクを使う）
+  (function () {
+    var btn = document.getElementById('load-more');
+    if (!btn || !window.fetch) return;
+    var list = document.querySelector('.articles');
+    var pager = document.querySelector('.pagination');
+    if (pager) pager.hidden = true;
+    btn.hidden = false;
+    btn.addEventListener('click', function () {
+      btn.disabled = true;
+      fetch(btn.dataset.next).then(function (r) { return r.json(); }).then(function (page) {
+        list.insertAdjacentHTML('beforeend', page.html);
+        if (page.next) {
+          btn.dataset.next = page.next;
+          btn.disabled = false;
+        } else {
+          btn.remove();
+        }
+      }).catch(function () { location.href = btn.dataset.fallback; });
+    });
+  })();
+</script>"""
+
+_VOTES_SCRIPT = """<script>
+  // 票数: 埋め込みのスナップショットをすぐ表示し、votes.json（ビルドごとに更新される静的ファイル）で後から更新する
+  (function () {
+    var votes = %s;
+    function fill() {
+      var els = document.querySelectorAll('.card-votes[data-article]');
+      for (var i = 0; i < els.length; i++) {
+        var counts = votes[els[i].dataset.article];
+        if (!counts) continue;
+        var total = 0;
+        for (var c in counts) total += counts[c];
+        els[i].textContent = '🗳️ ' + total + '票';
+        els[i].hidden = false;
+      }
+    }
+    function refresh() {
+      if (!window.fetch) return;
+      fetch('%s', {cache: 'no-cache'}).then(function (r) { return r.ok ? r.json() : null; }).then(function (data) {
+        if (data && data.votes) {
+          votes = data.votes;
+          fill();
+        }
+      }).catch(function () {});
+    }
+    fill();
+    // 「もっと読む」で追記されたカードにも入れる
+    var list = document.querySelector('.articles');
+    if (list && window.MutationObserver) new MutationObserver(fill).observe(list, {childList: true});
+    if (window.requestIdleCallback) {
+      window.requestIdleCallback(refresh);
+    } else {
+      setTimeout(refresh, 1);
+    }
+  })();
+</script>"""
+
+
+# ===== 一覧用のエントリ =====
+def entry_from_article(article: dict) -> dict:
+    """記事データから一覧表示に必要な項目だけを取り出す"""
+    return {
+        "vol_num": article["vol_num"],
+        "article_id": article["article_id"],
+        "title": article["title"],
+        "summary": article.get("news_summary_short", ""),
+        "publish_date": article["publish_date"],
+        "total_score": total_score(article["scores"]),
+        "tags": [label for _, label in article.get("tags", [])],
+    }
+
+
+def import_legacy_index(index_path: Path = BASE_DIR / "index.html") -> list:
+    """記事データが無い過去記事のカードを旧 index.html から取り出して legacy_index.json に保存する（移行用）"""
+    content = index_path.read_text(encoding="utf-8")
+    entries = []
+    for card in re.findall(r'<article class="article-card[^"]*">(.*?)</article>', content, re.S):
+        def field(cls):
+            m = re.search(rf'class="{cls}">(.*?)</', card, re.S)
+            return html.unescape(m.group(1).strip()) if m else ""
+        entries.append({
+            "vol_num": int(re.search(r'href="vol(\d+)\.html"', card).group(1)),
+            "title": field("card-title"),
+            "summary": field("card-summary"),
+            "publish_date": field("card-date"),
+            "total_score": float(field("card-score-num") or 0),
+            "tags": [],
+        })
+    entries.sort(key=lambda e: e["vol_num"])
+    LEGACY_INDEX_PATH.write_text(json.dumps(entries, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return entries
+
+
+def index_entries() -> list:
+    """全記事のエントリを新しい順に返す（記事データがある記事は旧カードより記事データを優先）"""
+    entries = {}
+    if LEGACY_INDEX_PATH.exists():
+        for e in json.loads(LEGACY_INDEX_PATH.read_text(encoding="utf-8")):
+            entries[e["vol_num"]] = e
+    for article in article_store.iter_articles():
+        entries[article["vol_num"]] = entry_from_article(article)
+    return sorted(entries.values(), key=lambda e: e["vol_num"], reverse=True)
+
+
+def entry_article_id(entry: dict) -> str:
+    """票数のキーになる記事ID（記事データの article_id。旧カードには無いのでファイル名の volXXX）"""
+    return entry.get("article_id") or article_slug(entry["vol_num"])
+
+
+def _month_key(entry: dict):
+    """(YYYY-MM, 表示名)。日付が読めなければ None"""
+    m = _DATE_RE.search(entry["publish_date"])
+    if not m:
+        return None
+    year, month = int(m.group(1)), int(m.group(2))
+    return f"{year:04d}-{month:02d}", f"{year}年{month}月"
+
+
+def _iso_date(entry: dict) -> str:
+    m = _DATE_RE.search(entry["publish_date"])
+    if not m:
+        return None
+    date = datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    return f"{date.isoformat()}T00:00:00+09:00"
+
+
+def _tag_slug(label: str) -> str:
+    return "tag-" + hashlib.sha1(label.encode("utf-8")).hexdigest()[:8]
+
+
+# ===== HTMLパーツ =====
+def card_html(entry: dict, latest: bool, base: str = "") -> str:
+    esc = html.escape
+    return f"""      <article class="article-card{' latest' if latest else ''}">
+        <a href="{base}{article_slug(entry['vol_num'])}.html">
+          <div class="card-top">
+            <span class="card-vol">Vol.{entry['vol_num']:03d}</span>
+            {'<span class="badge-latest">LATEST</span>' if latest else ''}
+            <span class="card-date">{esc(entry['publish_date'])}</span>
+          </div>
+          <h2 class="card-title">{esc(entry['title'])}</h2>
+          <p class="card-summary">{esc(entry['summary'])}</p>
+          <div class="card-score-block">
+            <div class="card-score-num">{entry['total_score']}</div>
+            <div class="card-score-denom">/ 10</div>
+            <div class="card-score-label">総合スコア</div>
+            <div class="card-votes" data-article="{esc(entry_article_id(entry))}" hidden></div>
+          </div>
+        </a>
+      </article>"""
+
+
+def _cards(entries: list, latest_vol: int, base: str) -> str:
+    return "\n".join(card_html(e, e["vol_num"] == latest_vol, base) for e in entries)
+
+
+def _pagination(prev_href: str, next_href: str, page: int, pages: int) -> str:
+    if pages <= 1:
+        return ""
+    prev_link = f'<a href="{prev_href}">← 新しい記事</a>' if prev_href else ""
+    next_link = f'<a href="{next_href}">過去の記事 →</a>' if next_href else ""
+    return f"""    <nav class="pagination">
+      {prev_link}
+      <span>{page} / {pages}</span>
+      {next_link}
+    </nav>"""
+
+
+def _archive_list(items: list) -> str:
+    """items: [(href, 表示名, 件数), ...]"""
+    lis = "\n".join(
+        f'      <li><a href="{href}">{html.escape(label)}<span class="count">({count})</span></a></li>'
+        for href, label, count in items
+    )
+    return f'    <ul class="archive-list">\n{lis}\n    </ul>'
+
+
+# ===== ページ生成 =====
+def _votes_script(base: str, votes: dict = None) -> str:
+    """カードの票数を入れるスクリプト（votes: 埋め込むスナップショット {記事ID: {キャラID: 票数}}）"""
+    embedded = json.dumps(votes or {}, sort_keys=True, separators=(",", ":")).replace("</", "<\\/")
+    return _VOTES_SCRIPT % (embedded, f"{base}{VOTES_JSON_PATH.name}")
+
+
+def _render_page(title: str, label: str, body: str, base: str, script: str = "") -> str:
+    template = load_template(INDEX_TEMPLATE_PATH)
+    return template.render({
+        "PAGE_TITLE": html.escape(title),
+        "SECTION_LABEL": html.escape(label),
+        "PAGE_BODY": body,
+        "BASE": base,
+        "PAGE_SCRIPT": script,
+    })
+
+
+def _listing_pages(entries: list, stem: str, title: str, latest_vol: int) -> dict:
+    """アーカイブ内の一覧ページ（stem.html, stem-2.html, ...）を {ファイル名: HTML} で返す"""
+    pages = {}
+    chunks = [entries[i:i + PAGE_SIZE] for i in range(0, len(entries), PAGE_SIZE)] or [[]]
+
+    def name(n):
+        return f"{stem}.html" if n == 1 else f"{stem}-{n}.html"
+
+    for n, chunk in enumerate(chunks, 1):
+        body = f'    <div class="articles">\n{_cards(chunk, latest_vol, "../")}\n    </div>\n'
+        body += _pagination(name(n - 1) if n > 1 else None,
+                            name(n + 1) if n < len(chunks) else None, n, len(chunks))
+        body += '\n    <p class="archive-links"><a href="index.html">月別・タグ別アーカイブ</a></p>'
+        pages[name(n)] = _render_page(title if n == 1 else f"{title}（{n}ページ目）", title, body, "../",
+                                      _votes_script("../"))
+    return pages
+
+
+def build_site_pages(entries: list, votes: dict = None) -> dict:
+    """全ページの {サイトルートからの相対パス: 内容} を返す（votes: 票数のスナップショット {記事ID: {キャラID: 票数}}）"""
+    files = {}
+    latest_vol = entries[0]["vol_num"] if entries else None
+    chunks = [entries[i:i + PAGE_SIZE] for i in range(0, len(entries), PAGE_SIZE)] or [[]]
+    total = len(chunks)
+
+    # トップページ（1ページ目）: 2ページ目以降は JSON で追記するか、ページ送りで辿る
+    has_next = total > 1
+    body = f'    <div class="articles">\n{_cards(chunks[0], latest_vol, "")}\n    </div>\n'
+    if has_next:
+        body += ('    <button class="load-more" id="load-more" hidden '
+                 'data-next="archive/page-2.json" data-fallback="archive/page-2.html">もっと読む</button>\n')
+        body += _pagination(None, "archive/page-2.html", 1, total)
+    body += '\n    <p class="archive-links"><a href="archive/index.html">月別・タグ別アーカイブ</a></p>'
+    votes = votes or {}
+    top_ids = [entry_article_id(e) for e in chunks[0]]
+    top_votes = {aid: votes[aid] for aid in top_ids if aid in votes}
+    script = (_LOAD_MORE_SCRIPT + "\n" if has_next else "") + _votes_script("", top_votes)
+    files["index.html"] = _render_page("バックナンバー", "バックナンバー", body, "", script)
+
+    # 2ページ目以降（HTMLとJSON）
+    for n in range(2, total + 1):
+        prev_href = "../index.html" if n == 2 else f"page-{n - 1}.html"
+        next_href = f"page-{n + 1}.html" if n < total else None
+        body = f'    <div class="articles">\n{_cards(chunks[n - 1], latest_vol, "../")}\n    </div>\n'
+        body += _pagination(prev_href, next_href, n, total)
+        body += '\n    <p class="archive-links"><a href="index.html">月別・タグ別アーカイブ</a></p>'
+        files[f"archive/page-{n}.html"] = _render_page(f"バックナンバー（{n}ページ目）", "バックナンバー", body, "../",
+                                                       _votes_script("../"))
+        files[f"archive/page-{n}.json"] = json.dumps({
+            "html": site_output.optimize_page(_cards(chunks[n - 1], latest_vol, "")),
+            "next": f"archive/page-{n + 1}.json" if n < total else None,
+        }, ensure_ascii=False)
+
+    # 月別・タグ別アーカイブ
+    months, tags = {}, {}
+    for e in entries:
+        key = _month_key(e)
+        if key:
+            months.setdefault(key, []).append(e)
+        for label in e.get("tags", []):
+            tags.setdefault(label, []).append(e)
+    for (key, label), items in months.items():
+        for name, page in _listing_pages(items, key, f"{label}の記事", latest_vol).items():
+            files[f"archive/{name}"] = page
+    for label, items in tags.items():
+        for name, page in _listing_pages(items, _tag_slug(label), f"タグ: {label}", latest_vol).items():
+            files[f"archive/{name}"] = page
+
+    month_items = [(f"{key}.html", label, len(items)) for (key, label), items in sorted(months.items(), reverse=True)]
+    tag_items = [(f"{_tag_slug(label)}.html", label, len(items))
+                 for label, items in sorted(tags.items(), key=lambda t: (-len(t[1]), t[0]))]
+    body = _archive_list(month_items)
+    if tag_items:
+        body += '\n    <div class="section-label">タグ別</div>\n' + _archive_list(tag_items)
+    files["archive/index.html"] = _render_page("アーカイブ", "月別", body, "../")
+
+    # JSON Feed（https://www.jsonfeed.org/version/1.1/）
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": 'AI News Cross-Review "The Jury"',
+        "home_page_url": SITE_URL,
+        "feed_url": SITE_URL + "feed.json",
+        "items": [],
+    }
+    for e in entries[:FEED_SIZE]:
+        url = f"{SITE_URL}{article_slug(e['vol_num'])}.html"
+        item = {"id": url, "url": url, "title": e["title"], "summary": e["summary"],
+                "tags": e.get("tags", []), "_jury": {"vol": e["vol_num"], "total_score": e["total_score"]}}
+        date = _iso_date(e)
+        if date:
+            item["date_published"] = date
+        feed["items"].append(item)
+    files["feed.json"] = json.dumps(feed, ensure_ascii=False, indent=1)
+    return files
+
+
+def build_index() -> dict:
+    """記事データストアからトップページ・アーカイブ・フィードを生成する
+    内容が変わったファイルだけ書き出し、{"written": n, "unchanged": n, "removed": n} を返す"""
+    files = build_site_pages(index_entries(), vote_snapshot()["votes"])
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    report = site_output.SizeReport()
+    for rel, content in files.items():
+        path = BASE_DIR / rel
+        source_bytes = len(content.encode("utf-8"))
+        if rel.endswith(".html"):
+            content = site_output.optimize_page(content, "../" if rel.startswith("archive/") else "")
+        if (path.exists() and path.read_text(encoding="utf-8") == content
+                and site_output.has_compressed(path)):
+            stats["unchanged"] += 1
+            continue
+        site_output.write_output(path, content, report, source_bytes)
+        stats["written"] += 1
+    # 記事の移動などで不要になったアーカイブページを消す（archive/ は全ファイルが生成物。.gz / .br は元のファイルに従う）
+    compressed = tuple(site_output.COMPRESSED_SUFFIXES)
+    for path in ARCHIVE_DIR.glob("*"):
+        name = path.name[:-len(path.suffix)] if path.name.endswith(compressed) else path.name
+        if path.is_file() and f"archive/{name}" not in files:
+            path.unlink()
+            stats["removed"] += path.name == name
+    stats["removed"] += site_output.prune_stylesheets()
+    report.print("一覧ページ")
+    return stats
+
+
+if __name__ == "__main__":
+    stats = build_index()
+    print(f"✅ 記事一覧を生成: {stats['written']}件を書き出し / {stats['unchanged']}件は変更なし / {stats['removed']}件を削除")
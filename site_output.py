@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+The Jury - 出力ステージ（縮小・スタイルシートの共有・事前圧縮）
+描画したページを書き出す前に通す最後の段。記事ページ（renderer）と一覧ページ（site_index）の両方で使う
+
+- HTML: コメントと、ブロック要素の前後の改行・インデントを取り除く（<pre> / <textarea> の中は触らない）
+- <style>: 縮小して assets/dist/site.<hash>.css に出し、<link> に置き換える。
+  記事テンプレートと一覧テンプレートで先頭から同じ並びのルールは共通のファイルにまとめ、全ページで1つを共有する
+- インラインの <script>: コメント・インデント・空行を取り除く（文字列・テンプレート・正規表現の中は触らず、行の区切りは残す）
+- 圧縮: 書き出したファイルの隣に .gz（と brotli があれば .br）を置く（事前圧縮したファイルを返せるホスト・CDN向け）
+
+SITE_MINIFY=0 で縮小とスタイルシートの切り出しを、SITE_PRECOMPRESS=0 で .gz / .br の出力をしない
+"""
+import functools
+import gzip
+import hashlib
+import os
+import re
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # brotliが無い環境では .gz だけを出す
+    brotli = None
+
+BASE_DIR = Path(__file__).parent
+DIST_DIR = BASE_DIR / "assets" / "dist"
+TEMPLATE_PATHS = [BASE_DIR / "template.html", BASE_DIR / "index_template.html"]
+SITE_URL = "https://siitake-man.github.io/the-jury/"   # 公開URL（フィード・OG画像などの絶対URL）
+
+MINIFY = os.environ.get("SITE_MINIFY", "1") != "0"
+PRECOMPRESS = os.environ.get("SITE_PRECOMPRESS", "1") != "0"
+COMPRESSED_SUFFIXES = [".gz", ".br"] if brotli is not None else [".gz"]
+MIN_COMPRESS_BYTES = 1024   # これより小さいファイルは圧縮しない
+REPORT_FILES = 10           # 書き出しのログに1件ずつ出すファイル数（残りは合計だけ）
+
+# 前後の空白を取り除いてよいタグ（表示に影響しないブロック要素・head内の要素）
+_BLOCK_TAGS = frozenset("""
+html head body meta link title style script noscript base
+div section article aside header footer main nav figure figcaption picture source
+p h1 h2 h3 h4 h5 h6 ul ol li dl dt dd table thead tbody tfoot tr td th caption
+form fieldset legend hr br canvas svg template button
+""".split())
+
+# ページを「タグ」「生のまま扱う要素（<pre> 等）」「コメント」の列として読む（間のテキストは別に扱う）
+_TOKEN_RE = re.compile(
+    r"(?P<raw><(?P<raw_name>pre|textarea|script|style)\b(?P<raw_attrs>[^>]*)>(?P<raw_body>.*?)</(?P=raw_name)\s*>)"
+    r"|(?P<comment><!--(?!\[if).*?-->)"
+    r"|(?P<tag></?(?P<name>[a-zA-Z][\w-]*)[^<>]*>)",
+    re.S | re.I,
+)
+_INDENT_RE = re.compile(r"\n\s+")
+_STYLE_RE = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.S | re.I)
+
+_CSS_TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|/)""", re.S)
+# 前後の空白を取り除ける記号（":" の前は「.a :hover」と区別できないので残す）
+_CSS_TIGHT = set("{}:;,>")
+_JS_WORD_RE = re.compile(r"[\w$]+")
+# この後の "/" は正規表現リテラルの始まり（それ以外の値・閉じ括弧の後は割り算）
+_JS_REGEX_PUNCT = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_AFTER = frozenset("return typeof instanceof in of new delete void throw case do else yield await".split())
+
+
+# ===== 縮小 =====
+def minify_css(css: str) -> str:
+    """コメント・余分な空白・閉じ括弧の直前の ; を取り除く（文字列の中は触らない）"""
+    out = []
+    pending_space = False
+    for string, comment, space, other in _CSS_TOKEN_RE.findall(css):
+        if comment:
+            continue
+        if space:
+            pending_space = True
+            continue
+        token = string or other
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT and (token[0] not in _CSS_TIGHT or token[0] == ":"):
+            out.append(" ")
+        pending_space = False
+        if token.startswith("}") and out and out[-1] == ";":
+            out.pop()
+        out.append(token)
+    return "".join(out).replace(";}", "}")
+
+
+def _skip_quoted(js: str, i: int, quote: str) -> int:
+    """文字列 / 正規表現リテラルの終わりの次の位置（i は開始の引用符。改行で終わっていなければそこまで）"""
+    in_class = False
+    j = i + 1
+    while j < len(js):
+        ch = js[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "\n":
+            return j
+        if quote == "/" and ch == "[":
+            in_class = True
+        elif quote == "/" and ch == "]":
+            in_class = False
+        elif ch == quote and not in_class:
+            return j + 1
+        j += 1
+    return j
+
+
+def _skip_template(js: str, i: int) -> int:
+    """テンプレートリテラルの終わりの次の位置（${...} の中の文字列・入れ子のテンプレートも読み飛ばす）"""
+    j = i + 1
+    while j < len(js):
+        ch = js[j]
+        if ch == "\\":
+            j += 2
+        elif ch == "`":
+            return j + 1
+        elif js.startswith("${", j):
+            j = _skip_braces(js, j + 2)
+        else:
+            j += 1
+    return j
+
+
+def _skip_braces(js: str, i: int) -> int:
+    """${ の直後から対応する } の次の位置"""
+    depth = 0
+    j = i
+    while j < len(js):
+        ch = js[j]
+        if ch in "'\"":
+            j = _skip_quoted(js, j, ch)
+            continue
+        if ch == "`":
+            j = _skip_template(js, j)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            if depth == 0:
+                return j + 1
+            depth -= 1
+        j += 1
+    return j
+
+
+def minify_js(js: str) -> str:
+    """コメント・行頭と行末の空白・空行を取り除き、連続する空白を1つにする
+    文字列・テンプレートリテラル・正規表現リテラルの中はそのまま残す
+    改行は残すので自動セミコロン挿入は変わらない（改行を含むブロックコメントは改行1つにする）"""
+    out = []
+    prev = ""        # 直前のトークン（"/" が割り算か正規表現の始まりかの判定用）
+    space = False    # 出力を保留している空白
+    i = 0
+    while i < len(js):
+        ch = js[i]
+        if ch in " \t\r\f\v":
+            space = True
+            i += 1
+            continue
+        if ch == "\n" or js.startswith("/*", i):
+            if ch == "\n":
+                newline, i = True, i + 1
+            else:
+                end = js.find("*/", i + 2)
+                end = len(js) if end < 0 else end + 2
+                newline, i = "\n" in js[i:end], end
+            if newline:
+                if out and out[-1] != "\n":
+                    out.append("\n")
+                space = False
+            else:
+                space = True
+            continue
+        if js.startswith("//", i):
+            end = js.find("\n", i)
+            i = len(js) if end < 0 else end
+            continue
+        if space and out and out[-1] != "\n":
+            out.append(" ")
+        space = False
+        word = _JS_WORD_RE.match(js, i)
+        if word:
+            end, prev = word.end(), word.group(0)
+        elif ch in "'\"" or (ch == "/" and (not prev or prev in _JS_REGEX_AFTER or prev[-1] in _JS_REGEX_PUNCT)):
+            end, prev = _skip_quoted(js, i, ch), "a"
+        elif ch == "`":
+            end, prev = _skip_template(js, i), "a"
+        elif js.startswith(("++", "--"), i):
+            # 後置の a++ / a-- は値で終わる（前置なら後に "/" は来ない）ので、続く "/" は割り算
+            end, prev = i + 2, ")"
+        else:
+            end, prev = i + 1, ch
+        out.append(js[i:end])
+        i = end
+    return "".join(out).strip()
+
+
+def _minify_raw(m) -> str:
+    name, attrs, body = m.group("raw_name").lower(), m.group("raw_attrs"), m.group("raw_body")
+    if name == "style":
+        body = minify_css(body)
+    elif name == "script" and "src=" not in attrs and "json" not in attrs:
+        body = minify_js(body)
+    else:
+        return m.group(0)
+    return f"<{m.group('raw_name')}{attrs}>{body}</{m.group('raw_name')}>"
+
+
+def minify_html(html: str) -> str:
+    """HTML全体を縮小する
+    - コメントを消す
+    - タグとタグの間が空白だけなら、どちらかがブロック要素のとき詰め、そうでなければ空白1つにする
+    - テキストの改行後のインデントを消し、ブロック要素に接する側の前後の空白を消す
+    - インラインの <style> / <script> も縮小し、<pre> / <textarea> の中はそのまま残す"""
+    out = []
+    prev_block = True   # 直前のタグがブロック要素か（文書の先頭はブロック扱い）
+    text = ""           # 直前のタグから次のタグまでのテキスト（コメントは除く）
+    pos = 0
+    for m in _TOKEN_RE.finditer(html):
+        text += html[pos:m.start()]
+        pos = m.end()
+        if m.group("comment"):
+            continue
+        name = (m.group("raw_name") or m.group("name")).lower()
+        block = name in _BLOCK_TAGS or name == "pre"
+        if text.strip():
+            text = _INDENT_RE.sub("\n", text)
+            out.append(text.lstrip() if prev_block else text)
+            if block:
+                out[-1] = out[-1].rstrip()
+        elif text and not (prev_block or block):
+            out.append(" ")
+        text = ""
+        out.append(_minify_raw(m) if m.group("raw") else m.group(0))
+        prev_block = block
+    out.append(_INDENT_RE.sub("\n", text + html[pos:]))
+    return "".join(out).strip()
+
+
+# ===== 共有スタイルシート =====
+def _css_rules(css: str) -> list:
+    """縮小済みCSSをトップレベルのルール（@media などのブロックは丸ごと1つ）に分ける"""
+    rules, depth, start = [], 0, 0
+    for i, ch in enumerate(css):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:i + 1])
+                start = i + 1
+        elif ch == ";" and depth == 0:
+            rules.append(css[start:i + 1])  # @import / @charset
+            start = i + 1
+    if css[start:].strip():
+        rules.append(css[start:])
+    return rules
+
+
+@functools.lru_cache(maxsize=None)
+def common_rules() -> tuple:
+    """記事テンプレートと一覧テンプレートの <style> で、先頭から同じ並びのルール
+    （先頭の共通部分だけを切り出すので、カスケードの順序は元のページと変わらない）"""
+    sheets = []
+    for path in TEMPLATE_PATHS:
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return ()
+        m = _STYLE_RE.search(text)
+        if not m or "{{" in m.group(1):
+            return ()
+        sheets.append(_css_rules(minify_css(m.group(1))))
+    common = []
+    for a, b in zip(*sheets):
+        if a != b:
+            break
+        common.append(a)
+    return tuple(common)
+
+
+@functools.lru_cache(maxsize=None)
+def _stylesheet(css: str) -> str:
+    """CSSを assets/dist/site.<hash>.css に書き出し、ファイル名を返す（同じ内容は1つのファイルを共有する）
+    同じハッシュのファイルが圧縮版と揃っていれば書き直さない"""
+    name = f"site.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+    out = DIST_DIR / name
+    if not out.exists() or not has_compressed(out):
+        write_output(out, css)
+    return name
+
+
+@functools.lru_cache(maxsize=None)
+def _stylesheet_names(css: str) -> tuple:
+    rules = _css_rules(minify_css(css))
+    common = common_rules()
+    if common and tuple(rules[:len(common)]) == common:
+        parts = ["".join(common), "".join(rules[len(common):])]
+    else:
+        parts = ["".join(rules)]
+    return tuple(_stylesheet(part) for part in parts if part)
+
+
+def extract_styles(html: str, base: str = "") -> str:
+    """<style> を共有スタイルシートへの <link> に置き換える（base: ページからサイトルートへの相対パス）"""
+    def link(m):
+        return "".join(f'<link rel="stylesheet" href="{base}assets/dist/{name}">'
+                       for name in _stylesheet_names(m.group(1)))
+    return _STYLE_RE.sub(link, html)
+
+
+def prune_stylesheets() -> int:
+    """テンプレートの <style> から作られなくなった古い site.<hash>.css を消し、消した数を返す
+    （テンプレートが揃っていない・<style> にプレースホルダがあって作られる名前が分からない場合は何も消さない）"""
+    if not MINIFY:
+        return 0
+    keep = set()
+    for path in TEMPLATE_PATHS:
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return 0
+        for css in _STYLE_RE.findall(text):
+            if "{{" in css:
+                return 0
+            keep.update(_stylesheet_names(css))
+    removed = 0
+    for path in DIST_DIR.glob("site.*.css"):
+        if path.name not in keep:
+            remove_output(path)
+            removed += 1
+    return removed
+
+
+# ===== 配信用スクリプト =====
+def build_script(path: Path) -> str:
+    """assets/ のスクリプトを（縮小して）assets/dist/<名前>.<hash>.js に置き、サイトルートからのURLを返す（古い版は消す）"""
+    script = path.read_text(encoding="utf-8")
+    if MINIFY:
+        script = minify_js(script) + "\n"
+    name = f"{path.stem}.{hashlib.sha256(script.encode('utf-8')).hexdigest()[:10]}{path.suffix}"
+    out = DIST_DIR / name
+    if not out.exists() or not has_compressed(out):
+        for old in DIST_DIR.glob(f"{path.stem}.*{path.suffix}"):
+            remove_output(old)
+        write_output(out, script)
+    return f"assets/dist/{name}"
+
+
+def optimize_page(html: str, base: str = "") -> str:
+    """描画したページに出力ステージの変換（スタイルシートの切り出し・縮小）をかける"""
+    if not MINIFY:
+        return html
+    return minify_html(extract_styles(html, base))
+
+
+def signature() -> str:
+    """出力ステージの設定（変わったら全ページの書き直しが必要）"""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(f"{MINIFY}:{PRECOMPRESS}:{brotli is not None}\n".encode("utf-8"))
+    h.update("".join(common_rules()).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+# ===== 書き出しと事前圧縮 =====
+def compressed_paths(path: Path) -> list:
+    return [path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES]
+
+
+def write_output(path: Path, content, report: "SizeReport" = None, source_bytes: int = None) -> Path:
+    """ファイルを書き出し、隣に .gz / .br を置く
+    report があればサイズ（source_bytes: 縮小前のバイト数 → 書き出したバイト数 → 圧縮後）を記録する"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    sizes = {"raw": len(data)}
+    for out in compressed_paths(path):
+        if not PRECOMPRESS or len(data) < MIN_COMPRESS_BYTES:
+            out.unlink(missing_ok=True)
+            continue
+        if out.suffix == ".gz":
+            packed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            packed = brotli.compress(data, quality=11)
+        out.write_bytes(packed)
+        sizes[out.suffix[1:]] = len(packed)
+    if report is not None:
+        report.add(path, sizes, source_bytes)
+    return path
+
+
+def has_compressed(path: Path) -> bool:
+    """事前圧縮したファイルが揃っているか（小さいファイル・無効時は圧縮しないので揃っているとみなす）"""
+    if not PRECOMPRESS or path.stat().st_size < MIN_COMPRESS_BYTES:
+        return True
+    return all(p.exists() for p in compressed_paths(path))
+
+
+def remove_output(path: Path):
+    path.unlink(missing_ok=True)
+    for out in compressed_paths(path):
+        out.unlink(missing_ok=True)
+
+
+class SizeReport:
+    """書き出したファイルごとの サイズ（縮小前 → 縮小後 → gzip / brotli）をまとめてログに出す"""
+
+    def __init__(self):
+        self.entries = []  # (パス, 縮小前のバイト数, {"raw": 縮小後, "gz": .., "br": ..})
+
+    def add(self, path: Path, sizes: dict, source_bytes: int = None):
+        self.entries.append((path, sizes["raw"] if source_bytes is None else source_bytes, sizes))
+
+    def print(self, label: str = "出力"):
+        if not self.entries:
+            return
+        ordered = sorted(self.entries, key=lambda e: e[1] - e[2]["raw"], reverse=True)
+        for path, source, sizes in ordered[:REPORT_FILES]:
+            print(f"   📦 {_rel(path)}: {_fmt_sizes(source, sizes)}")
+        if len(ordered) > REPORT_FILES:
+            print(f"   📦 …ほか {len(ordered) - REPORT_FILES}件")
+        total_source = sum(e[1] for e in self.entries)
+        total = {"raw": sum(e[2]["raw"] for e in self.entries)}
+        for key in ("gz", "br"):
+            if any(key in e[2] for e in self.entries):
+                total[key] = sum(e[2].get(key, e[2]["raw"]) for e in self.entries)
+        print(f"📦 {label} {len(self.entries)}件: {_fmt_sizes(total_source, total)}")
+
+
+def _rel(path: Path) -> str:
+    try:
+        return str(path.relative_to(BASE_DIR))
+    except ValueError:
+        return str(path)
+
+
+def _fmt_sizes(source: int, sizes: dict) -> str:
+    text = f"{source:,}B"
+    if sizes["raw"] != source:
+        text += f" → 縮小 {sizes['raw']:,}B（{(sizes['raw'] - source) / source * 100:+.0f}%）" if source else ""
+    for key, name in (("gz", "gzip"), ("br", "brotli")):
+        if key in sizes:
+            text += f" / {name} {sizes[key]:,}B"
+    return text
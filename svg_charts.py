@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+The Jury - SVGのグラフ
+記事のグラフをブラウザのグラフライブラリを使わずに Python でSVGとして描く（記事ページはグラフのJSなしで表示できる）
+
+- レーダーチャート: 6軸 × 6名（score_analytics.radar_from_scores の値）。ページに埋め込む
+- カード: レーダーチャートとスコアバー（テンプレートの SCORE_*_PCT と同じ割合）を1枚にまとめた 1200×630 の画像
+  （OG画像。Slack のリンクのプレビューにも使われる）。ページのスコアバーはテンプレートのHTML/CSSのまま
+
+描いたものはデータのハッシュを名前にして assets/dist/charts/<種類>.<hash>.<svg|png> に保存し、同じデータなら描き直さずに読む
+OG画像はSVGに対応していないので、カードは cairosvg があるときだけPNGとして書き出す（無ければ何も書かず、OG画像も付けない）
+
+テンプレートのレーダーチャート（グラフライブラリの <script src> + <canvas> + RADAR_DATA_JSON を使う描画スクリプト）は
+描画前に1回だけ {{RADAR_SVG}} に置き換える。描画スクリプトに他の処理も入っている場合はそのまま残す
+SVG_CHARTS=0 でテンプレートのチャートを置き換えない（前後の計測用）
+色はキャラクターの色、目盛り・文字は currentColor（ページの文字色に合わせる）
+"""
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+from html import escape
+from pathlib import Path
+
+import site_output
+from score_analytics import CHAR_COLORS, RADAR_AXES
+
+try:
+    import cairosvg
+except ImportError:  # cairosvgが無い環境ではカードのPNG（OG画像）を作らない
+    cairosvg = None
+
+SVG_CHARTS = os.environ.get("SVG_CHARTS", "1") != "0"
+CHARTS_DIR = site_output.DIST_DIR / "charts"
+CHARTS_URL = "assets/dist/charts/"
+
+WIDTH = 400
+HEIGHT = 360
+CENTER = (200, 150)
+RADIUS = 110
+RINGS = [2, 4, 6, 8, 10]    # 目盛りの値（最大10）
+LEGEND_Y = 300              # 凡例の1行目
+LEGEND_COLUMNS = 3
+
+BAR_ROW = 28                # スコアバー1行の高さ
+BAR_LABEL = 100             # 名前の幅
+BAR_WIDTH = 260             # スコア10のときのバーの長さ
+
+CARD_SIZE = (1200, 630)
+CARD_BACKGROUND = "#14141f"
+CARD_COLOR = "#e8e8f0"
+
+_RADAR_SLOT = "{{RADAR_DATA_JSON}}"
+_SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.S | re.I)
+_CHART_LIB_RE = re.compile(r"""<script\b[^>]*\bsrc=(["'])([^"']*chart[^"']*\.js[^"']*)\1[^>]*>\s*</script\s*>\s*""", re.I)
+_CANVAS_RE = re.compile(r"<canvas\b[^>]*>.*?</canvas\s*>", re.S | re.I)
+_ID_RE = re.compile(r"""\bid=(["'])([^"']+)\1""")
+# 描画スクリプトに入っていたら残す処理（投票・他のスロットを使う処理）
+_EAGER_MARKERS = ("JuryVotes", "increment_vote", "supabase", "from('votes')", 'from("votes")')
+
+
+# ===== 描画 =====
+def _point(axis: int, value: float, axes: int) -> tuple:
+    angle = -math.pi / 2 + 2 * math.pi * axis / axes
+    r = RADIUS * value / 10
+    return CENTER[0] + r * math.cos(angle), CENTER[1] + r * math.sin(angle)
+
+
+def _points(values: list) -> str:
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in (_point(i, v, len(values)) for i, v in enumerate(values)))
+
+
+def _svg(width: int, height: int, body: str, label: str, attrs: str = "") -> str:
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" role="img" '
+            f'aria-label="{escape(label)}" style="width:100%;height:auto;max-width:{width}px;display:block;margin:0 auto"'
+            f'{attrs}>{body}</svg>')
+
+
+def _radar_body(radar: list, axes: list = RADAR_AXES) -> str:
+    n = len(axes)
+    # 目盛りと軸
+    parts = ['<g fill="none" stroke="currentColor" stroke-opacity="0.2">']
+    parts += [f'<polygon points="{_points([ring] * n)}"/>' for ring in RINGS]
+    parts += [f'<line x1="{CENTER[0]}" y1="{CENTER[1]}" x2="{x:.1f}" y2="{y:.1f}"/>'
+              for x, y in (_point(i, 10, n) for i in range(n))]
+    parts.append('</g><g fill="currentColor" font-size="11">')
+    for i, label in enumerate(axes):
+        x, y = _point(i, 11.6, n)
+        anchor = "middle" if abs(x - CENTER[0]) < 1 else ("start" if x > CENTER[0] else "end")
+        parts.append(f'<text x="{x:.1f}" y="{y + 4:.1f}" text-anchor="{anchor}">{escape(label)}</text>')
+    parts.append("</g>")
+    # キャラクターごとの多角形と頂点
+    for series in radar:
+        color = escape(series["color"])
+        parts.append(f'<g><title>{escape(series["name"])}: '
+                     f'{escape(" / ".join(f"{a} {v}" for a, v in zip(axes, series["data"])))}</title>'
+                     f'<polygon points="{_points(series["data"])}" fill="{color}" fill-opacity="0.13" '
+                     f'stroke="{color}" stroke-width="2"/>')
+        parts += [f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{color}"/>'
+                  for x, y in (_point(i, v, n) for i, v in enumerate(series["data"]))]
+        parts.append("</g>")
+    # 凡例
+    column = WIDTH // LEGEND_COLUMNS
+    parts.append('<g font-size="11" fill="currentColor">')
+    for i, series in enumerate(radar):
+        x = column * (i % LEGEND_COLUMNS) + 16
+        y = LEGEND_Y + 22 * (i // LEGEND_COLUMNS)
+        parts.append(f'<rect x="{x}" y="{y - 9}" width="10" height="10" fill="{escape(series["color"])}"/>'
+                     f'<text x="{x + 15}" y="{y}">{escape(series["name"])}</text>')
+    parts.append("</g>")
+    return "".join(parts)
+
+
+def radar_svg(radar: list, axes: list = RADAR_AXES, attrs: str = "") -> str:
+    """レーダーチャートのSVG（radar: [{"name", "color", "data"}]。attrs は <svg> に足す属性）"""
+    if not radar:
+        return ""
+    return _svg(WIDTH, HEIGHT, _radar_body(radar, axes), "レーダーチャート: " + " / ".join(axes), attrs)
+
+
+def _bars_height(bars: list) -> int:
+    return BAR_ROW * len(bars) + 4
+
+
+def _bars_body(bars: list) -> str:
+    parts = ['<g font-size="13" fill="currentColor">']
+    for i, (cid, name, score, pct) in enumerate(bars):
+        y = BAR_ROW * i + 4
+        color = escape(CHAR_COLORS.get(cid, "#888888"))
+        parts.append(f'<text x="0" y="{y + 15}">{escape(name)}</text>'
+                     f'<rect x="{BAR_LABEL}" y="{y + 3}" width="{BAR_WIDTH}" height="14" rx="7" '
+                     f'fill="currentColor" fill-opacity="0.12"/>'
+                     f'<rect x="{BAR_LABEL}" y="{y + 3}" width="{BAR_WIDTH * pct / 100:.1f}" height="14" rx="7" '
+                     f'fill="{color}"/>'
+                     f'<text x="{WIDTH}" y="{y + 15}" text-anchor="end">{escape(str(score))}</text>')
+    parts.append("</g>")
+    return "".join(parts)
+
+
+def card_svg(card: dict) -> str:
+    """OG画像用のカード（card: {"title", "vol", "total", "radar", "bars"}）。背景と文字色を持つ単独のSVG"""
+    w, h = CARD_SIZE
+    bars_h = _bars_height(card["bars"])
+    bars_w = 520
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="{w}" height="{h}" '
+            f'style="color:{CARD_COLOR}" role="img" aria-label="{escape(card["title"])}">'
+            f'<rect width="{w}" height="{h}" fill="{CARD_BACKGROUND}"/>'
+            f'<g fill="currentColor"><text x="56" y="80" font-size="34" font-weight="bold">The Jury {escape(card["vol"])}</text>'
+            f'<text x="{w - 56}" y="80" font-size="34" text-anchor="end">総合 {escape(str(card["total"]))} / 10</text></g>'
+            f'<svg x="40" y="110" width="500" height="500" viewBox="0 0 {WIDTH} {HEIGHT}">{_radar_body(card["radar"])}</svg>'
+            f'<svg x="{w - bars_w - 56}" y="{110 + (500 - bars_w * bars_h / WIDTH) / 2:.0f}" width="{bars_w}" '
+            f'height="{bars_w * bars_h / WIDTH:.0f}" viewBox="0 0 {WIDTH} {bars_h}">{_bars_body(card["bars"])}</svg>'
+            f'</svg>')
+
+
+# ===== データのハッシュによるキャッシュ =====
+@functools.lru_cache(maxsize=None)
+def signature() -> str:
+    """描画方法のハッシュ（このファイルとPNGを作るか。変わったらキャッシュを使わずに描き直す）"""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(f"png={cairosvg is not None}:inline={SVG_CHARTS}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def chart_path(kind: str, data, suffix: str = ".svg") -> Path:
+    key = json.dumps([kind, data, signature()], ensure_ascii=False, sort_keys=True)
+    return CHARTS_DIR / f"{kind}.{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}{suffix}"
+
+
+def cached_chart(kind: str, data, render) -> tuple:
+    """(SVG, 保存したパス)。同じ種類・同じデータのSVGが保存済みなら描き直さずに読む"""
+    path = chart_path(kind, data)
+    try:
+        return path.read_text(encoding="utf-8"), path
+    except FileNotFoundError:
+        pass
+    svg = render(data)
+    site_output.write_output(path, svg)
+    return svg, path
+
+
+def card_image_path(card: dict) -> Path:
+    """カードのPNGのパス（cairosvg が無ければ作らないので None）"""
+    return chart_path("card", card, ".png") if cairosvg is not None else None
+
+
+def card_image(card: dict) -> Path:
+    """カードのPNGを（無ければ描いて）返す。cairosvg が無ければ None"""
+    png = card_image_path(card)
+    if png is not None and not png.exists():
+        png.parent.mkdir(parents=True, exist_ok=True)
+        cairosvg.svg2png(bytestring=card_svg(card).encode("utf-8"), write_to=str(png),
+                         output_width=CARD_SIZE[0], output_height=CARD_SIZE[1])
+    return png
+
+
+def article_charts(card: dict) -> dict:
+    """記事1本分のグラフ {"radar": レーダーチャートのSVG, "image": カードのPNGのパス または None}
+    card: {"title", "vol", "total", "radar": レーダー値, "bars": スコアバーの値}"""
+    return {"radar": cached_chart("radar", card["radar"], radar_svg)[0] if card["radar"] else "",
+            "image": card_image(card)}
+
+
+def chart_meta_html(charts: dict) -> str:
+    """OG画像の <meta>（PNGが無ければ空）"""
+    if charts["image"] is None:
+        return ""
+    url = site_output.SITE_URL + CHARTS_URL + charts["image"].name
+    return (f'<meta property="og:image" content="{url}">'
+            f'<meta property="og:image:width" content="{CARD_SIZE[0]}">'
+            f'<meta property="og:image:height" content="{CARD_SIZE[1]}">'
+            f'<meta name="twitter:card" content="summary_large_image">')
+
+
+# ===== テンプレートの書き換え =====
+def _is_radar_only(body: str) -> bool:
+    rest = body.replace(_RADAR_SLOT, "")
+    return "{{" not in rest and not any(marker in rest for marker in _EAGER_MARKERS)
+
+
+def _inline_radar(html: str) -> str:
+    script = next((m for m in _SCRIPT_RE.finditer(html) if _RADAR_SLOT in m.group(2) and "src=" not in m.group(1)), None)
+    if script is None:
+        return html
+    body = script.group(2)
+    if not _is_radar_only(body):
+        print("⚠️ レーダーチャートのスクリプトに他の処理も含まれるため、SVGに置き換えません")
+        return html
+    canvases = list(_CANVAS_RE.finditer(html))
+    canvas = next((c for c in canvases if (i := _ID_RE.search(c.group(0))) and i.group(2) in body), None)
+    canvas = canvas or (canvases[0] if canvases else None)
+    if canvas is None:
+        return html
+
+    edits = [(script.start(), script.end(), ""), (canvas.start(), canvas.end(), "{{RADAR_SVG}}")]
+    # グラフライブラリは、残りのスクリプトが使っていなければ読み込まない
+    rest = html[:script.start()] + html[script.end():]
+    lib = _CHART_LIB_RE.search(html)
+    if lib and not any(re.search(r"\bChart\b", b) for _, b in _SCRIPT_RE.findall(rest)):
+        edits.append((lib.start(), lib.end(), ""))
+    # 後ろから置き換える（前の位置がずれないように）
+    for start, end, text in sorted(edits, reverse=True):
+        html = html[:start] + text + html[end:]
+    return html
+
+
+def inline_charts(html: str) -> str:
+    """テンプレートのレーダーチャートをSVGのスロットに置き換え、OG画像が無ければ <head> に足す"""
+    if SVG_CHARTS:
+        html = _inline_radar(html)
+    if "og:image" not in html and "{{CHART_META}}" not in html:
+        head, sep, tail = html.partition("</head>")
+        if sep:
+            html = head + "{{CHART_META}}" + sep + tail
+    return html
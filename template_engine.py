@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+The Jury - テンプレートエンジン
+template.html を一度だけ解析して「固定文字列」と「{{NAME}}スロット」の列に分解し、
+レンダリング時は全スロットの値を1回のjoinで埋め込む（プレースホルダごとの全文置換をしない）
+"""
+import re
+import threading
+from pathlib import Path
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class MissingPlaceholderError(KeyError):
+    """テンプレートのスロットに対応する値が渡されていない"""
+
+
+class CompiledTemplate:
+    """解析済みテンプレート。chunks は固定文字列、slots は各固定文字列の直後に入るスロット名"""
+
+    def __init__(self, text: str):
+        self.chunks = []
+        self.slots = []
+        pos = 0
+        for m in PLACEHOLDER_RE.finditer(text):
+            self.chunks.append(text[pos:m.start()])
+            self.slots.append(m.group(1))
+            pos = m.end()
+        self.chunks.append(text[pos:])
+        self.names = frozenset(self.slots)
+
+    def render(self, values: dict) -> str:
+        """全スロットを埋めた文字列を返す。値が足りなければ MissingPlaceholderError"""
+        missing = self.names - values.keys()
+        if missing:
+            raise MissingPlaceholderError(f"テンプレートの値が不足しています: {', '.join(sorted(missing))}")
+        parts = [None] * (len(self.chunks) + len(self.slots))
+        parts[::2] = self.chunks
+        parts[1::2] = [str(values[name]) for name in self.slots]
+        return "".join(parts)
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    return CompiledTemplate(text)
+
+
+def load_template(path: Path, preprocess=None) -> CompiledTemplate:
+    """
+    テンプレートファイルを解析してキャッシュする（ファイルが更新されたら解析し直す）
+    preprocess: 解析前にテンプレート全体へ1回だけ適用する変換（アイコンタグの書き換えなど）
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size, preprocess)
+    with _cache_lock:
+        compiled = _cache.get(key)
+    if compiled is None:
+        text = path.read_text(encoding="utf-8")
+        if preprocess is not None:
+            text = preprocess(text)
+        compiled = compile_template(text)
+        with _cache_lock:
+            _cache[key] = compiled
+    return compiled
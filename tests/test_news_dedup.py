@@ -0,0 +1,43 @@
+"""news_dedup の既出判定（used_news.json に実際にある言い換えと、別のニュースの組）"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import news_dedup  # noqa: E402
+
+SAME = [
+    ("LLM限界説、研究者で意見分かれる", "LLM限界説は本当か？研究者で分かれる見解"),
+    ("LM StudioでローカルLLM環境", "ローカルLLM構築「LM Studio」"),
+    ("LM StudioでローカルLLM環境", "ローカルLLM環境構築「LM Studio」"),
+    ("国産生成AI、精度で苦戦", "国産生成AI苦戦、精度に差"),
+]
+DIFFERENT = [
+    ("AI投資を拡大", "AI投資を縮小"),
+    ("OpenAI、GPT-5を発表", "OpenAI、GPT-6を発表"),
+]
+
+
+@pytest.mark.parametrize("a, b", SAME)
+def test_paraphrase_is_same_story(a, b):
+    assert news_dedup.jaccard(news_dedup.shingles(a), news_dedup.shingles(b)) >= news_dedup.THRESHOLD
+    assert news_dedup.same_story(a, b)
+    assert news_dedup.same_story(b, a)
+
+
+@pytest.mark.parametrize("a, b", DIFFERENT)
+def test_different_story(a, b):
+    assert not news_dedup.same_story(a, b)
+    assert not news_dedup.same_story(b, a)
+
+
+def test_index_finds_paraphrase(tmp_path):
+    path = tmp_path / "news_index.json"
+    path.write_text('{"version": %d, "num_perm": %d, "entries": []}' % (news_dedup.INDEX_VERSION, news_dedup.NUM_PERM))
+    index = news_dedup.NewsIndex(path)
+    index.add(*(b for _, b in SAME))
+    for a, b in SAME:
+        assert index.find(a) is not None, a
+    assert index.find("AI投資を縮小") is None
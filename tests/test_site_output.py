@@ -0,0 +1,21 @@
+"""site_output.minify_js の割り算と正規表現リテラルの見分け"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import site_output  # noqa: E402
+
+
+@pytest.mark.parametrize("source, expected", [
+    # 後置の ++ / -- の後の "/" は割り算（正規表現として丸ごと残さず、空白も詰める）
+    ("x = a++  /  2;   y = b--  /  c;  // /x/", "x = a++ / 2; y = b-- / c;"),
+    ("x = ++i  /  2", "x = ++i / 2"),
+    # 演算子の後の "/" は正規表現リテラル（中の空白と // はそのまま）
+    ("ok = a +  /a  b\\/\\/c/g.test(q)", "ok = a + /a  b\\/\\/c/g.test(q)"),
+    ("if (x) {\n    return  /[/]  x/.test(y);\n}", "if (x) {\nreturn /[/]  x/.test(y);\n}"),
+])
+def test_minify_js(source, expected):
+    assert site_output.minify_js(source) == expected
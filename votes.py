@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+The Jury - 投票（Supabase）
+記事ページの投票はクリックごとに increment_vote を呼ばず、assets/votes.js がブラウザ側で票をまとめて
+increment_votes（一括RPC）に送る。サーバー側は (記事, キャラクター) をシャードに分けた行に加算し、
+読み出し時に vote_totals ビューで合算する（SQLは supabase_setup_guide.md の Step 4・5）
+
+票数の表示はページを開くたびにDBを読まず、ビルド時のスナップショットを使う
+- ビルドごとに vote_snapshot（全記事の票数を1回で返すRPC）を1回だけ呼び、votes.json に保存する
+- 記事ページとトップページには書き出した時点の票数を埋め込み、ブラウザは後から votes.json（静的ファイル）で更新する
+- DBを読むのは、投票したユーザーが自分の票の反映を確かめるときだけ（投票の送信後に記事1本分）
+- 取得できなかった場合は前回の votes.json を使う。VOTE_SNAPSHOT=0 で取得しない（オフラインのビルド）
+
+- votes.js はアイコンと同じくコンテンツハッシュ付きのファイル（assets/dist/votes.<hash>.js）として配信する
+- テンプレート内の旧方式の呼び出し（rpc('increment_vote', ...) / from('votes')）は描画前に1回だけ書き換える
+"""
+import datetime
+import functools
+import json
+import os
+import re
+from pathlib import Path
+
+import http_client
+import site_output
+
+BASE_DIR = Path(__file__).parent
+VOTES_JS_PATH = BASE_DIR / "assets" / "votes.js"
+VOTES_JSON_PATH = BASE_DIR / "votes.json"
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://jyikdveqhvimtyovkgbs.supabase.co")
+SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY", "sb_publishable_LQ-cUMnaam3q1muTdmqtVg_18H23SHM")
+SNAPSHOT_ENABLED = os.environ.get("VOTE_SNAPSHOT", "1") != "0"
+
+BATCH_RPC = "increment_votes"
+SNAPSHOT_RPC = "vote_snapshot"
+TOTALS_VIEW = "vote_totals"
+FLUSH_MS = 2000     # 票をまとめて送る間隔
+MAX_ITEMS = 64      # 1回の送信の最大件数（increment_votes 側の上限と同じ）
+
+_LEGACY_RPC_RE = re.compile(
+    r"""(?<![\w.$])[\w.$]+\.rpc\(\s*(['"])increment_vote\1\s*,\s*\{\s*p_article_id\s*:\s*([^,{}]+?)\s*,"""
+    r"""\s*p_character\s*:\s*([^,{}]+?)\s*,?\s*\}\s*\)"""
+)
+# 記事1本分の票数の読み出し（from('votes').select(...).eq('article_id', X)）
+_LEGACY_SELECT_RE = re.compile(
+    r"""(?<![\w.$])[\w.$]+\.from\(\s*(['"])votes\1\s*\)\s*\.select\([^()]*\)\s*"""
+    r"""\.eq\(\s*(['"])article_id\2\s*,\s*([^()]+?)\s*\)"""
+)
+_LEGACY_TABLE_RE = re.compile(r"""\.from\(\s*(['"])votes\1\s*\)""")
+
+
+# ===== 票数のスナップショット =====
+def _headers() -> dict:
+    return {"apikey": SUPABASE_ANON_KEY, "Authorization": f"Bearer {SUPABASE_ANON_KEY}"}
+
+
+def fetch_vote_snapshot() -> dict:
+    """全記事の票数 {記事ID: {キャラID: 票数}} を1回の呼び出しで取得する"""
+    resp = http_client.post_json(f"{SUPABASE_URL}/rest/v1/rpc/{SNAPSHOT_RPC}", {},
+                                 endpoint="supabase", headers=_headers())
+    votes = resp.json() or {}
+    return {article_id: {cid: int(n) for cid, n in counts.items()} for article_id, counts in votes.items()}
+
+
+def _load_votes_json() -> dict:
+    try:
+        return json.loads(VOTES_JSON_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"generated_at": None, "votes": {}}
+
+
+@functools.lru_cache(maxsize=None)
+def vote_snapshot() -> dict:
+    """このビルドで使うスナップショット {"generated_at": ISO時刻, "votes": {...}}（1プロセスにつき1回だけ取得する）"""
+    saved = _load_votes_json()
+    if not SNAPSHOT_ENABLED:
+        return saved
+    try:
+        votes = fetch_vote_snapshot()
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️ 票数のスナップショットを取得できません（前回の votes.json を使います）: {e}")
+        return saved
+    if votes == saved["votes"]:
+        return saved  # 票が動いていなければ時刻も据え置く（votes.json を書き換えない）
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    return {"generated_at": now.isoformat().replace("+00:00", "Z"), "votes": votes}
+
+
+def article_votes(article_id: str) -> dict:
+    """記事ページに埋め込むスナップショット（その記事の分だけ）"""
+    snapshot = vote_snapshot()
+    return {"generated_at": snapshot["generated_at"],
+            "votes": {article_id: snapshot["votes"][article_id]} if article_id in snapshot["votes"] else {}}
+
+
+def build_votes_json(path: Path = VOTES_JSON_PATH) -> bool:
+    """スナップショットを votes.json に書き出す。内容が変わらなければ書き出さずに False を返す"""
+    content = json.dumps(vote_snapshot(), ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n"
+    if path.exists() and path.read_text(encoding="utf-8") == content and site_output.has_compressed(path):
+        return False
+    site_output.write_output(path, content)
+    return True
+
+
+# ===== ページへの組み込み =====
+def build_vote_script() -> str:
+    """votes.js をハッシュ付きのファイル名で assets/dist に置き、ページから参照するURLを返す"""
+    return site_output.build_script(VOTES_JS_PATH)
+
+
+def vote_script_html(script_url: str) -> str:
+    """votes.js の設定と読み込みタグ（接続先と票数はテンプレートのスロットのまま残し、描画時に埋める）
+    テンプレート側の読み込み時の処理から JuryVotes を呼べるよう、defer にせず <head> で読み込む"""
+    return (
+        '<script>window.JURY_VOTES = {url: "{{SUPABASE_URL}}", key: "{{SUPABASE_ANON_KEY}}", '
+        'articleId: "{{ARTICLE_ID}}", '
+        f'rpc: "{BATCH_RPC}", view: "{TOTALS_VIEW}", snapshotUrl: "{VOTES_JSON_PATH.name}", '
+        f'flushMs: {FLUSH_MS}, maxItems: {MAX_ITEMS}, snapshot: {{{{VOTE_SNAPSHOT_JSON}}}}}};</script>\n'
+        f'<script src="{script_url}"></script>\n'
+    )
+
+
+def rewrite_vote_calls(html: str) -> str:
+    """1票ごとのRPC呼び出しを JuryVotes.vote() に、記事1本分の票数の読み出しを JuryVotes.select() に、
+    残りの votes テーブルの読み出しを合算ビューに置き換える"""
+    if "increment_vote" in html:
+        html = _LEGACY_RPC_RE.sub(lambda m: f"JuryVotes.vote({m.group(2)}, {m.group(3)})", html)
+    html = _LEGACY_SELECT_RE.sub(lambda m: f"JuryVotes.select({m.group(3)})", html)
+    return _LEGACY_TABLE_RE.sub(f".from('{TOTALS_VIEW}')", html)
+
+
+def inject_vote_script(html: str) -> str:
+    """テンプレートに votes.js を組み込む（</head> の直前。既に読み込んでいれば何もしない）"""
+    html = rewrite_vote_calls(html)
+    if "window.JURY_VOTES" in html:
+        return html
+    tag = vote_script_html(build_vote_script())
+    for marker in ("</head>", "</body>"):
+        head, sep, tail = html.partition(marker)
+        if sep:
+            return head + tag + sep + tail
+    return tag + html